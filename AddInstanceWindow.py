@@ -11,8 +11,9 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdi
 from PyQt5.QtGui import QIcon, QPixmap, QColor, QImage, QPainter
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, QTimer, QUrl
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
-import json
 from PyQt5.QtWidgets import QSplitter, QSplitterHandle
+from modrinth_client import get_client
+import meta_cache
 
 class NoResizeSplitterHandle(QSplitterHandle):
     def mousePressEvent(self, event): pass
@@ -308,6 +309,7 @@ class AddInstanceWindow(QDialog):
         self.content_layout.setContentsMargins(5, 0, 0, 0)
         self.content_layout.setSpacing(5)
         self.mod_data_map = {}
+        self.version_map = {}
 
         # Search bars
         search_layout = QHBoxLayout()
@@ -558,7 +560,7 @@ class AddInstanceWindow(QDialog):
         """Enable/disable OK button based on current selection"""
         if self.current_section == "Modrinth":
             has_modpack = self.selected_modpack is not None
-            has_version = self.version_combo.currentText() != ""
+            has_version = self.pack_file(self.version_combo.currentText()) is not None
             self.ok_btn.setEnabled(has_modpack and has_version)
             return
             
@@ -633,7 +635,6 @@ class AddInstanceWindow(QDialog):
 
         def fetch():
             try:
-                url = "https://api.modrinth.com/v2/search"
                 params = {
                     'facets': '[["project_type:modpack"]]',
                     'limit': 100,
@@ -642,13 +643,7 @@ class AddInstanceWindow(QDialog):
                 if sort_index is not None and sort_index != "downloads":
                     params['index'] = sort_index 
 
-                # Build the full URL with query parameters for debugging
-                prepared_request = requests.Request('GET', url, params=params).prepare()
-                print("Full request URL:", prepared_request.url)
-
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = get_client().search(params)
 
                 modpacks = []
                 for hit in data.get('hits', []):
@@ -688,16 +683,13 @@ class AddInstanceWindow(QDialog):
 
         def fetch():
             try:
-                url = "https://api.modrinth.com/v2/search"
                 params = {
                     'facets': '[["project_type:modpack"]]',
                     'limit': 20 if self.search_input.text() else 100,
                     'index': sort_index,
                     'query': query  
                 }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = get_client().search(params)
                 
                 modpacks = []
                 for hit in data.get('hits', []):
@@ -818,10 +810,7 @@ class AddInstanceWindow(QDialog):
         def fetch():
             try:
                 project_id = self.selected_modpack['id']
-                url = f"https://api.modrinth.com/v2/project/{project_id}/version"
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                versions = response.json()
+                versions = get_client().project_versions(project_id)
                 
                 version_list = []
                 self.version_map = {}  # Create or clear the version map
@@ -889,17 +878,12 @@ class AddInstanceWindow(QDialog):
         """Change the active section and update content"""
         from PyQt5.QtCore import QTimer
         import threading
-        import requests
 
         # Helper functions to fetch data
         def fetch_vanilla_versions():
             def fetch():
-                url = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
                 try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    releases = [v["id"] for v in data["versions"]]
+                    releases = meta_cache.minecraft_versions()
                     self.populate_versions(releases)
                     QTimer.singleShot(0, lambda: self.populate_versions(releases))
                 except Exception as e:
@@ -908,11 +892,8 @@ class AddInstanceWindow(QDialog):
 
         def fetch_fabric_versions():
             def fetch():
-                url = "https://meta.fabricmc.net/v2/versions/loader"
                 try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
+                    data = meta_cache.fabric_loaders()
                     print("Fetched fabric versions")
                     versions = [f"Fabric {entry['version']}" for entry in data]
                     self.populate_fabric_versions(versions)
@@ -985,6 +966,8 @@ class AddInstanceWindow(QDialog):
     def create_instance(self):
         data = self.get_instance_data()
         print(data)
+        if data is None:
+            return
         
         # If an image was selected, save it to the icons folder
         if self.selected_image_path:
@@ -1147,8 +1130,14 @@ class AddInstanceWindow(QDialog):
         }}
         """
     
+    def pack_file(self, version_display):
+        """The downloadable file of a modpack version, or None if it has none"""
+        version_data = self.version_map.get(version_display) or {}
+        pack_file = (version_data.get('files') or [{}])[0]
+        return pack_file if pack_file.get('url') else None
+
     def get_instance_data(self):
-        """Return the data for the new instance"""
+        """Return the data for the new instance, or None if the selected modpack version has no file"""
         if self.current_section == "Modrinth":
             instance_name = self.name_input.text() or self.selected_modpack.get('title', 'Modrinth Pack')
             selected_version_display = self.version_combo.currentText()
@@ -1163,169 +1152,26 @@ class AddInstanceWindow(QDialog):
                     "original_path": self.selected_image_path,
                     "saved_path": saved_path
                 }
-            else:
-                modpack_icon_url = self.selected_modpack.get('icon_url')
-                if modpack_icon_url:
-                    ext = os.path.splitext(modpack_icon_url.split("?")[0])[1] or ".png"
-                    filename = instance_name.lower().replace(" ", "_") + ext
-                    saved_path = os.path.join(".icons", filename)
-
-                    # Ensure directory exists
-                    os.makedirs(".icons", exist_ok=True)
-
-                    try:
-                        response = requests.get(modpack_icon_url, timeout=10)
-                        response.raise_for_status()
-                        with open(saved_path, "wb") as f:
-                            f.write(response.content)
-
-                        image_data = {
-                            "original_path": modpack_icon_url,
-                            "saved_path": saved_path
-                        }
-                    except Exception as e:
-                        print(f"Failed to download modpack icon: {e}")
-
-            def fetch():
-                try:
-                    selected_display = self.version_combo.currentText()
-                    version_data = self.version_map.get(selected_display)
-
-                    if version_data:
-                        if version_data['files']:
-                            file_url = version_data['files'][0]['url']
-                            return file_url
-                        else:
-                            print("No files found in the selected version.")
-                    else:
-                        print(f"No version found matching: {selected_display}")
-
-                except Exception as e:
-                    print(f"Failed to load modpack version: {e}")
-
-            import zipfile
-
-            def download_file(url, output_path):
-                try:
-                    response = requests.get(url, stream=True, timeout=15)
-                    response.raise_for_status()  # Raise error for bad responses
-
-                    with open(output_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:  # filter out keep-alive chunks
-                                f.write(chunk)
-
-                    print(f"Download complete: {output_path}")
-
-                    # Check if file is a zip file by extension, then unzip
-                    if output_path.lower().endswith('.zip'):
-                        unzip_dir = os.path.splitext(output_path)[0]  # remove .zip extension
-                        os.makedirs(unzip_dir, exist_ok=True)
-
-                        with zipfile.ZipFile(output_path, 'r') as zip_ref:
-                            zip_ref.extractall(unzip_dir)
-
-                        print(f"Unzipped to: {unzip_dir}")
-                        return unzip_dir
-
-                    return True
-
-                except Exception as e:
-                    print(f"Download failed: {e}")
-                    return False
-            
-            GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
-            file_url = fetch()
-            print("File URL: " + file_url)
-            unzip_dir = download_file(file_url, f"{GAME_DIR}/{instance_name}.zip")
-
-            with open(f"{unzip_dir}/modrinth.index.json") as file:
-                data = json.load(file)
-
-            if 'fabric-loader' in data['dependencies']:
-                section = "Fabric"
-                fabric_version = f"Fabric {data['dependencies']['fabric-loader']}"
-                print(fabric_version)
-            else:
-                section = "Forge"
-                print('Error: Modpack is not Fabric')
-
-            minecraft_version = data['dependencies']['minecraft']
-            print(minecraft_version)
 
             mod_data = self.mod_data_map.get(selected_version_display, {})
-            version_data = self.version_map.get(selected_version_display, {})
-
-            mod_list = mod_data['dependencies']
-            print("Modrinth mod data:", mod_list)
+            pack_file = self.pack_file(selected_version_display)
+            if pack_file is None:
+                print(f"No files found for modpack version: {selected_version_display}")
+                return None
 
-            mods_info = []
-
-            for mod in mod_list:
-                version_id = mod.get('version_id')
-                if not version_id:
-                    continue
-                
-                try:
-                    # Fetch Modrinth version data
-                    version_url = f"https://api.modrinth.com/v2/version/{version_id}"
-                    response = requests.get(version_url)
-                    response.raise_for_status()
-                    version_info = response.json()
-
-                    # Extract relevant data
-                    project_id = version_info.get('project_id')
-                    version_number = version_info.get('version_number')
-                    files = version_info.get('files', [])
-                    author = version_info.get('author', 'Unknown')
-                    enabled = True  # Assuming all are enabled by default
-
-                    file_names = [file.get('filename') for file in files]
-                    print(file_names)
-                    # Optional: get icon from project metadata
-                    project_url = f"https://api.modrinth.com/v2/project/{project_id}"
-                    project_resp = requests.get(project_url)
-                    project_resp.raise_for_status()
-                    project_info = project_resp.json()
-
-                    mod_entry = {
-                        'id': version_info.get('id'),
-                        'project_id': version_info.get('project_id'),
-                        'title': project_info.get('title'),
-                        'description': project_info.get('description'),
-                        'author': author,
-                        'downloads': project_info.get('downloads'),
-                        'version': version_number,
-                        'enabled': enabled,
-                        'icon_url': project_info.get('icon_url'),
-                        'filenames': file_names, 
-                    }
-
-                    mods_info.append(mod_entry)
-
-                except requests.RequestException as e:
-                    print(f"Error fetching data for version_id {version_id}: {e}")
-                    
+            # Downloading the pack and resolving its mods happens later in an install job
             return {
                 "type": "Modrinth",
                 "name": instance_name,
-                "section": section,
-                "selected_version": minecraft_version,
-                "selected_fabric_version": fabric_version,
                 "image": image_data,
-                "mods": data['files'],
-                "mod_data": mods_info,  # This contains the full mod list and metadata
-                "version_number": mod_data['version_number'],
-                # "modpack_metadata": {
-                #    "project_id": self.selected_modpack.get('id'),
-                #    "version_id": version_data.get('id'),
-                #    "version_number": mod_data.get('version_number'),
-                #    "title": self.selected_modpack.get('title'),
-                #    "author": self.selected_modpack.get('author'),
-                #    "description": self.selected_modpack.get('description')
-                #}
+                "icon_url": None if image_data else self.selected_modpack.get('icon_url'),
+                "pack_url": pack_file.get('url'),
+                "pack_sha1": pack_file.get('hashes', {}).get('sha1'),
+                "pack_size": pack_file.get('size'),
+                "dependencies": mod_data.get('dependencies', []),
+                "version_number": mod_data.get('version_number', ''),
             }
-        
+
         else:
             # Existing logic for Vanilla/Fabric
             instance_name = self.name_input.text() if self.name_input.text() else self.current_section + " " + self.versions_list.currentItem().text()
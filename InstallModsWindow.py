@@ -8,9 +8,11 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdi
                            QProgressBar)
 from PyQt5.QtGui import QIcon, QPixmap, QColor, QImage, QPainter
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, QTimer, QUrl
-import json
 import requests
 import threading
+from downloader import DownloadTask, get_engine
+from modrinth_client import get_client
+import install_jobs
 
 class ModWidget(QWidget):
     """Custom widget for displaying a mod in the list"""
@@ -328,7 +330,7 @@ class InstallModsWindow(QDialog):
     """Dialog window for installing mods"""
     modsInstalled = pyqtSignal()
     
-    def __init__(self, parent=None, theme_colors=None, instance_name=""):
+    def __init__(self, parent=None, theme_colors=None, instance_name="", installed_mods=None):
         super().__init__(parent)
         self.setWindowTitle("Install Mods")
         self.setMinimumSize(1000, 700)
@@ -341,6 +343,7 @@ class InstallModsWindow(QDialog):
         self.mod_data = []
         self.selected_mod = None
         self.instance_name = instance_name
+        self.installed_mods = installed_mods or []
         
         self.themes = {
             "creeper": {
@@ -663,10 +666,7 @@ class InstallModsWindow(QDialog):
         def fetch():
             try:
                 project_id = self.selected_mod['project_id']
-                url = f"https://api.modrinth.com/v2/project/{project_id}/version"
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                versions = response.json()
+                versions = get_client().project_versions(project_id)
                 
                 version_list = []
 
@@ -953,16 +953,13 @@ class InstallModsWindow(QDialog):
 
         def fetch():
             try:
-                url = "https://api.modrinth.com/v2/search"
                 params = {
                     'facets': '[["project_type:mod"]]',
                     'limit': 20 if self.search_input.text() else 100,
                     'index': sort_index,
                     'query': query  
                 }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = get_client().search(params)
                 
                 modpacks = []
                 for hit in data.get('hits', []):
@@ -992,7 +989,6 @@ class InstallModsWindow(QDialog):
 
         def fetch():
             try:
-                url = "https://api.modrinth.com/v2/search"
                 params = {
                     'facets': '[["project_type:mod"]]',
                     'limit': 100,
@@ -1001,13 +997,7 @@ class InstallModsWindow(QDialog):
                 if sort_index is not None:
                     params['index'] = sort_index 
 
-                # Build the full URL with query parameters for debugging
-                prepared_request = requests.Request('GET', url, params=params).prepare()
-                print("Full request URL:", prepared_request.url)
-
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = get_client().search(params)
 
                 modpacks = []
                 for hit in data.get('hits', []):
@@ -1079,252 +1069,35 @@ class InstallModsWindow(QDialog):
         # Update UI
         self.update_selection_ui()
 
-    def install_dependency(self, dep_project_id, mod_data_list, processed_projects, parent_version_data=None):
-        """Install a dependency by project ID, matching parent mod's version and loader"""
-        try:
-            # Fetch project info
-            project_url = f"https://api.modrinth.com/v2/project/{dep_project_id}"
-            project_response = requests.get(project_url, timeout=10)
-            project_response.raise_for_status()
-            project_data = project_response.json()
-            
-            # Fetch all versions for the dependency
-            versions_url = f"https://api.modrinth.com/v2/project/{dep_project_id}/version"
-            versions_response = requests.get(versions_url, timeout=10)
-            versions_response.raise_for_status()
-            versions_data = versions_response.json()
-            
-            if not versions_data:
-                print(f"No versions found for dependency: {dep_project_id}")
-                return False
-            
-            # Get target game versions and loaders from parent mod
-            target_game_versions = set()
-            target_loaders = set()
-            
-            if parent_version_data:
-                target_game_versions = set(parent_version_data.get("game_versions", []))
-                target_loaders = set(parent_version_data.get("loaders", []))
-            
-            # If no parent version data, try to get from instance config or use defaults
-            if not target_game_versions or not target_loaders:
-                # You might want to get this from your instance configuration
-                # For now, falling back to common defaults
-                print(f"Warning: No version constraints from parent mod, using fallback logic")
-            
-            # Find the best matching version
-            best_version = None
-            best_score = -1
-            
-            for version in versions_data:
-                version_game_versions = set(version.get("game_versions", []))
-                version_loaders = set(version.get("loaders", []))
-                
-                # Calculate compatibility score
-                score = 0
-                
-                # Check game version compatibility
-                if target_game_versions:
-                    game_version_match = len(target_game_versions.intersection(version_game_versions))
-                    if game_version_match == 0:
-                        continue  # Skip if no game version overlap
-                    score += game_version_match * 10  # Higher weight for game version matches
-                
-                # Check loader compatibility
-                if target_loaders:
-                    loader_match = len(target_loaders.intersection(version_loaders))
-                    if loader_match == 0:
-                        continue  # Skip if no loader overlap
-                    score += loader_match * 5  # Weight for loader matches
-                
-                # Prefer newer versions (higher index in sorted list means older)
-                score += (len(versions_data) - versions_data.index(version)) * 0.1
-                
-                if score > best_score:
-                    best_score = score
-                    best_version = version
-            
-            # Fallback to latest version if no compatible version found
-            if not best_version:
-                print(f"Warning: No compatible version found for dependency {dep_project_id}, using latest")
-                best_version = versions_data[0]
-            else:
-                print(f"Selected version {best_version.get('version_number', 'Unknown')} for dependency {dep_project_id}")
-                if target_game_versions:
-                    matching_game_versions = set(best_version.get("game_versions", [])).intersection(target_game_versions)
-                    print(f"  Game versions: {', '.join(matching_game_versions)}")
-                if target_loaders:
-                    matching_loaders = set(best_version.get("loaders", [])).intersection(target_loaders)
-                    print(f"  Loaders: {', '.join(matching_loaders)}")
-            
-            # Create mod object for dependency
-            dep_mod = {
-                "project_id": dep_project_id,
-                "title": project_data.get("title", "Unknown Dependency"),
-                "description": project_data.get("description", ""),
-                "author": project_data.get("team", "Unknown"),
-                "downloads": project_data.get("downloads", 0),
-                "icon_url": project_data.get("icon_url", "Default")
-            }
-            
-            # Install the dependency with the selected version
-            return self.install_single_mod(dep_mod, best_version, mod_data_list, processed_projects)
-            
-        except Exception as e:
-            print(f"Error installing dependency {dep_project_id}: {e}")
-            return False
-
     def install_mods(self):
-        """Install the selected mods - Updated to pass version data to dependencies"""
+        """Install the selected mods in a background job"""
         if not self.selected_mods:
             return
 
-        CONFIG_PATH = os.path.expanduser("~/.minecraft_launcher_config.json")
-
         print(f"Installing {len(self.selected_mods)} mods:")
 
-        # Load existing config
-        try:
-            with open(CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-        except Exception as e:
-            print(f"Failed to load config: {e}")
-            return
-
-        instance_data = config.get('instances', {}).get(self.instance_name, {})
-        if not instance_data:
-            print(f"Instance '{self.instance_name}' not found in config.")
-            return
-
-        mod_data_list = instance_data.setdefault('mod_data', [])
-        
-        # Keep track of already processed project IDs to avoid duplicates
-        processed_projects = set()
-        
-        # Add existing mods to processed set
-        for existing_mod in mod_data_list:
-            if 'project_id' in existing_mod:
-                processed_projects.add(existing_mod['project_id'])
-
-        # Process each selected mod
-        for mod in self.selected_mods:
+        # The job only gets plain data, since the dialog closes while it runs
+        selected_mods = list(self.selected_mods)
+        version_map = {}
+        for mod in selected_mods:
             version_key = mod.get('version', '') if isinstance(mod, dict) else ''
-            version_data = self.version_map.get(version_key)
-
-            if version_data and isinstance(version_data, dict):
-                # Install main mod
-                if self.install_single_mod(mod, version_data, mod_data_list, processed_projects):
-                    print(f"✓ Installed: {mod.get('title', 'Unknown')} by {mod.get('author', 'Unknown')}")
-                else:
-                    print(f"✗ Failed to install: {mod.get('title', 'Unknown')}")
-                
-                # Process dependencies with parent version info
-                dependencies = version_data.get("dependencies", [])
-                for dep in dependencies:
-                    if dep.get("dependency_type") == "required":
-                        dep_project_id = dep.get("project_id")
-                        if not dep_project_id or dep_project_id in processed_projects:
-                            continue
-                        
-                        print(f"Installing required dependency: {dep_project_id}")
-                        # Pass parent version data to dependency installer
-                        if self.install_dependency(dep_project_id, mod_data_list, processed_projects, version_data):
-                            print(f"✓ Installed dependency: {dep_project_id}")
-                        else:
-                            print(f"✗ Failed to install dependency: {dep_project_id}")
-            else:
-                print(f"No version data found for: {mod.get('title', 'Unknown')}")
-
-        # Save updated config
-        try:
-            with open(CONFIG_PATH, 'w') as f:
-                json.dump(config, f, indent=4)
-            print("Config successfully updated with downloaded mods.")
-        except Exception as e:
-            print(f"Failed to save updated config: {e}")
-
-        self.modsInstalled.emit()
+            version_map[version_key] = self.version_map.get(version_key)
+        instance_name = self.instance_name
+        installed = {mod.get('project_id') for mod in self.installed_mods if isinstance(mod, dict)}
+        project_ids = sorted(str(mod.get('project_id')) for mod in selected_mods if isinstance(mod, dict))
+        job = install_jobs.InstallJob(
+            "mods", instance_name,
+            lambda job: install_mods_job(job, instance_name, selected_mods, version_map, installed),
+            key=f"mods:{instance_name}:{','.join(project_ids)}"
+        )
+        # The launcher saves the job's mod entries; connect after submit so that runs before this refresh
+        job = install_jobs.get_manager().submit(job)
+        job.finished.connect(self.on_mods_installed)
         self.accept()  # Close dialog with accepted result
 
-    def install_single_mod(self, mod, version_data, mod_data_list, processed_projects):
-        """Install a single mod and return success status"""
-        project_id = mod.get("project_id")
-        if project_id in processed_projects:
-            print(f"Skipping {mod.get('title', 'Unknown')} - already installed")
-            return True
-        
-        files = version_data.get('files', [])
-        if not isinstance(files, list) or not files:
-            print("No files found in version data.")
-            return False
-        
-        primary_files = [file for file in files if file.get('primary') is True]
-        if not primary_files:
-            print("No primary files found for version.")
-            return False
-        
-        success_count = 0
-        filenames = []
-        
-        for file in primary_files:
-            filename = file.get('filename')
-            url = file.get('url')
-            if filename and url:
-                print(f"Downloading: {filename} from {url}")
-                success, downloaded_path = self.download_mod_file(url, filename)
-                if success:
-                    filenames.append(filename)
-                    success_count += 1
-                else:
-                    print(f"Failed to download {filename}")
-        
-        if success_count > 0:
-            mod_entry = {
-                "id": version_data.get("id", 'Unknown'),
-                "project_id": project_id,
-                "title": mod.get("title", 'Unknown'),
-                "description": mod.get("description", ''),
-                "author": mod.get("author", "Unknown"),
-                "downloads": mod.get("downloads", "Unknown"),
-                "version": version_data.get('version_number'),
-                "enabled": True,
-                "icon_url": mod.get("icon_url", "Default"),
-                "filenames": filenames
-            }
-            mod_data_list.append(mod_entry)
-            processed_projects.add(project_id)
-            return True
-        
-        return False
-
-    def download_mod_file(self, download_url, filename):
-        """Download the mod file"""
-        try:
-            GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
-            INSTANCE_DIR = os.path.join(GAME_DIR, "instances", self.instance_name)
-            MOD_DIR = os.path.join(INSTANCE_DIR, "mods")
-
-            # Ensure mods directory exists
-            os.makedirs(MOD_DIR, exist_ok=True)
-
-            # Download to temporary location first
-            temp_file_path = os.path.join(MOD_DIR, f".temp_{filename}")
-            final_file_path = os.path.join(MOD_DIR, filename)
-
-            response = requests.get(download_url, stream=True, timeout=30)
-            response.raise_for_status()
-
-            with open(temp_file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-
-            os.replace(temp_file_path, final_file_path)
-            return True, final_file_path
-
-        except Exception as e:
-            print(f"Error downloading mod file: {e}")
-            return False, None
+    def on_mods_installed(self, success, message):
+        if success:
+            self.modsInstalled.emit()
 
     def apply_theme(self, theme_name):
         """Apply the specified theme to all UI elements"""
@@ -1508,6 +1281,209 @@ class InstallModsWindow(QDialog):
             background-color: {theme['instance_bg']};
         """)
 
+def resolve_dependency(dep_project_id, parent_version_data=None):
+    """The (mod, version data) to install for a dependency, matching the parent mod's version and loader"""
+    try:
+        # Fetch project info
+        project_data = get_client().project(dep_project_id)
+
+        # Fetch all versions for the dependency
+        versions_data = get_client().project_versions(dep_project_id)
+
+        if not versions_data:
+            print(f"No versions found for dependency: {dep_project_id}")
+            return None
+
+        # Get target game versions and loaders from parent mod
+        target_game_versions = set()
+        target_loaders = set()
+
+        if parent_version_data:
+            target_game_versions = set(parent_version_data.get("game_versions", []))
+            target_loaders = set(parent_version_data.get("loaders", []))
+
+        # If no parent version data, try to get from instance config or use defaults
+        if not target_game_versions or not target_loaders:
+            # You might want to get this from your instance configuration
+            # For now, falling back to common defaults
+            print(f"Warning: No version constraints from parent mod, using fallback logic")
+
+        # Find the best matching version
+        best_version = None
+        best_score = -1
+
+        for version in versions_data:
+            version_game_versions = set(version.get("game_versions", []))
+            version_loaders = set(version.get("loaders", []))
+
+            # Calculate compatibility score
+            score = 0
+
+            # Check game version compatibility
+            if target_game_versions:
+                game_version_match = len(target_game_versions.intersection(version_game_versions))
+                if game_version_match == 0:
+                    continue  # Skip if no game version overlap
+                score += game_version_match * 10  # Higher weight for game version matches
+
+            # Check loader compatibility
+            if target_loaders:
+                loader_match = len(target_loaders.intersection(version_loaders))
+                if loader_match == 0:
+                    continue  # Skip if no loader overlap
+                score += loader_match * 5  # Weight for loader matches
+
+            # Prefer newer versions (higher index in sorted list means older)
+            score += (len(versions_data) - versions_data.index(version)) * 0.1
+
+            if score > best_score:
+                best_score = score
+                best_version = version
+
+        # Fallback to latest version if no compatible version found
+        if not best_version:
+            print(f"Warning: No compatible version found for dependency {dep_project_id}, using latest")
+            best_version = versions_data[0]
+        else:
+            print(f"Selected version {best_version.get('version_number', 'Unknown')} for dependency {dep_project_id}")
+            if target_game_versions:
+                matching_game_versions = set(best_version.get("game_versions", [])).intersection(target_game_versions)
+                print(f"  Game versions: {', '.join(matching_game_versions)}")
+            if target_loaders:
+                matching_loaders = set(best_version.get("loaders", [])).intersection(target_loaders)
+                print(f"  Loaders: {', '.join(matching_loaders)}")
+
+        # Create mod object for dependency
+        dep_mod = {
+            "project_id": dep_project_id,
+            "title": project_data.get("title", "Unknown Dependency"),
+            "description": project_data.get("description", ""),
+            "author": project_data.get("team", "Unknown"),
+            "downloads": project_data.get("downloads", 0),
+            "icon_url": project_data.get("icon_url", "Default")
+        }
+        return dep_mod, best_version
+
+    except Exception as e:
+        print(f"Error resolving dependency {dep_project_id}: {e}")
+        return None
+
+
+def plan_mod(mod, version_data, mods_dir):
+    """The config entry and download tasks for a mod's primary files, or None if it has none"""
+    files = version_data.get('files', [])
+    if not isinstance(files, list) or not files:
+        print("No files found in version data.")
+        return None
+
+    primary_files = [file for file in files if file.get('primary') is True]
+    if not primary_files:
+        print("No primary files found for version.")
+        return None
+
+    tasks = []
+    for file in primary_files:
+        filename = file.get('filename')
+        url = file.get('url')
+        if filename and url:
+            sha1 = file.get('hashes', {}).get('sha1')
+            tasks.append(DownloadTask(url, os.path.join(mods_dir, filename), sha1=sha1))
+    if not tasks:
+        return None
+
+    mod_entry = {
+        "id": version_data.get("id", 'Unknown'),
+        "project_id": mod.get("project_id"),
+        "title": mod.get("title", 'Unknown'),
+        "description": mod.get("description", ''),
+        "author": mod.get("author", "Unknown"),
+        "downloads": mod.get("downloads", "Unknown"),
+        "version": version_data.get('version_number'),
+        "enabled": True,
+        "icon_url": mod.get("icon_url", "Default"),
+        "filenames": []
+    }
+    return mod_entry, tasks
+
+
+def install_mods_job(job, instance_name, selected_mods, version_map, installed_projects=()):
+    """Install job body: resolve the mods and their required dependencies, then download all files in one batch.
+
+    Returns the mod entries that were installed. The job runs off the UI thread,
+    so the launcher adds them to the instance's mod_data and saves the config.
+    """
+    GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+    MOD_DIR = os.path.join(GAME_DIR, "instances", instance_name, "mods")
+
+    # Keep track of already processed project IDs to avoid duplicates
+    processed_projects = set(installed_projects)
+    installed_mods = []
+    planned = []
+
+    def plan(mod, version_data):
+        project_id = mod.get("project_id")
+        if project_id in processed_projects:
+            print(f"Skipping {mod.get('title', 'Unknown')} - already installed")
+            return
+        result = plan_mod(mod, version_data, MOD_DIR)
+        if result:
+            processed_projects.add(project_id)
+            planned.append(result)
+        else:
+            print(f"✗ Failed to install: {mod.get('title', 'Unknown')}")
+
+    # Resolve each selected mod and its required dependencies
+    for index, mod in enumerate(selected_mods):
+        job.check_cancelled()
+        job.progress(index, len(selected_mods), f"Resolving {mod.get('title', 'Unknown')}")
+        version_key = mod.get('version', '') if isinstance(mod, dict) else ''
+        version_data = version_map.get(version_key)
+
+        if version_data and isinstance(version_data, dict):
+            plan(mod, version_data)
+
+            # Process dependencies with parent version info
+            dependencies = version_data.get("dependencies", [])
+            for dep in dependencies:
+                if dep.get("dependency_type") == "required":
+                    dep_project_id = dep.get("project_id")
+                    if not dep_project_id or dep_project_id in processed_projects:
+                        continue
+
+                    print(f"Resolving required dependency: {dep_project_id}")
+                    resolved = resolve_dependency(dep_project_id, version_data)
+                    if resolved:
+                        plan(*resolved)
+                    else:
+                        print(f"✗ Failed to install dependency: {dep_project_id}")
+        else:
+            print(f"No version data found for: {mod.get('title', 'Unknown')}")
+
+    # Download every file in one engine batch
+    tasks = [task for _, mod_tasks in planned for task in mod_tasks]
+    downloaded = 0
+
+    def on_done(task, error):
+        nonlocal downloaded
+        downloaded += 1
+        job.progress(downloaded, len(tasks))
+        if error is not None:
+            print(f"Failed to download {os.path.basename(task.dest)}: {error}")
+
+    job.progress(0, len(tasks), "Downloading mods")
+    _, failed = get_engine().download_all(tasks, cancel=job.is_cancelled, on_done=on_done, priority=job.priority)
+    job.check_cancelled()
+    failed_tasks = {id(task) for task, _ in failed}
+
+    for mod_entry, mod_tasks in planned:
+        mod_entry["filenames"] = [os.path.basename(task.dest) for task in mod_tasks if id(task) not in failed_tasks]
+        if mod_entry["filenames"]:
+            installed_mods.append(mod_entry)
+            print(f"✓ Installed: {mod_entry['title']} by {mod_entry['author']}")
+        else:
+            print(f"✗ Failed to install: {mod_entry['title']}")
+    return installed_mods
+
 def main():
     """Main function to run the InstallModsWindow dialog"""
     app = QApplication(sys.argv)
@@ -16,6 +16,8 @@ import json
 from PyQt5.QtWidgets import QPushButton
 from PyQt5.QtCore import QSize
 from InstallModsWindow import InstallModsWindow
+from downloader import PRIORITY_BACKGROUND, DownloadCancelled, DownloadTask, get_engine
+from modrinth_client import get_client
 import threading
 import requests
 from PyQt5.QtCore import QObject, QThread, pyqtSignal, QTimer
@@ -104,18 +106,13 @@ class ModUpdater(QObject):
     def get_latest_version_info(self, project_id):
         """Get download info for the latest version"""
         try:
-            url = f"https://api.modrinth.com/v2/project/{project_id}/version"
             params = {}
             if self.mc_version:
                 params['game_versions[]'] = self.mc_version
             if self.loader:
                 params['loaders[]'] = self.loader
             
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code != 200:
-                return False, None, None, None
-            
-            versions = response.json()
+            versions = get_client().project_versions(project_id, params)
             if not versions:
                 return False, None, None, None
             
@@ -165,37 +162,16 @@ class ModUpdater(QObject):
             INSTANCE_DIR = os.path.join(GAME_DIR, "instances", self.instance_name)
             MOD_DIR = os.path.join(INSTANCE_DIR, "mods")
             
-            # Ensure mods directory exists
-            os.makedirs(MOD_DIR, exist_ok=True)
-            
             # Download to temporary location first
             temp_file_path = os.path.join(MOD_DIR, f".temp_{filename}")
             
-            response = requests.get(download_url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(temp_file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if self._should_stop:
-                        try:
-                            os.remove(temp_file_path)
-                        except:
-                            pass
-                        return False, None
-                    
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    
-                    # Update progress
-                    if total_size > 0:
-                        progress = 30 + int((downloaded / total_size) * 50)  # 30-80% range
-                        # We can't emit signals here easily, so we'll keep it simple
+            task = DownloadTask(download_url, temp_file_path, priority=PRIORITY_BACKGROUND)
+            get_engine().fetch(task, cancel=lambda: self._should_stop, skip_existing=False)
             
             return True, temp_file_path
             
+        except DownloadCancelled:
+            return False, None
         except Exception as e:
             print(f"Error downloading mod file: {e}")
             return False, None
@@ -325,8 +301,6 @@ class UpdateChecker(QObject):
                 return
                 
             # Get all versions for the project
-            url = f"https://api.modrinth.com/v2/project/{self.project_id}/version"
-            
             # Add query parameters to filter by game version and loader
             params = {}
             print(self.mc_version)
@@ -338,20 +312,17 @@ class UpdateChecker(QObject):
             if self._should_stop:
                 return
                 
-            response = requests.get(url, params=params, timeout=10)
-            print("Full request URL:", response.request.url)
+            try:
+                all_versions = get_client().project_versions(self.project_id, params)
+            except requests.HTTPError as e:
+                print(f"Failed to fetch versions: {e}")
+                self.updateCheckComplete.emit(False, "")
+                return
 
             if self._should_stop:
                 return
                 
-            if response.status_code != 200:
-                print(f"Failed to fetch versions: {response.status_code}")
-                self.updateCheckComplete.emit(False, "")
-                self.finished.emit()
-                return
-                
-            versions = response.json()
-            all_versions = response.json()
+            versions = all_versions
 
             # Strictly filter only versions matching both game version and loader
             filtered_versions = [
@@ -1531,7 +1502,8 @@ class ManageModsWindow(QDialog):
     def open_install_window(self):
         """Open the install mods window"""
         if self.install_window is None or not self.install_window.isVisible():
-            self.install_window = InstallModsWindow(theme_colors=self.current_theme, instance_name=self.selected_instance_name)
+            self.install_window = InstallModsWindow(theme_colors=self.current_theme, instance_name=self.selected_instance_name,
+                                                    installed_mods=self.mod_data)
             
             self.install_window.modsInstalled.connect(self.refresh_mods)
 
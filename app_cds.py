@@ -0,0 +1,79 @@
+"""Opt-in AppCDS (application class data sharing) archives per instance.
+
+With class data sharing, Java maps the classes of a recorded run from an
+archive instead of loading and verifying them from the jars again, which
+shortens the game's startup. The archive is stored in the instance's
+``.cache/cds`` directory. It is named after a hash of the launch plan's Java
+binary, main class and classpath (paths, sizes and mtimes), so any classpath
+change selects a new archive, and the old ones are deleted.
+
+* Java 19+: ``-XX:+AutoCreateSharedArchive`` lets the JVM record the archive
+  on the first run and refresh it itself.
+* Java 13-18: the first run records with ``-XX:ArchiveClassesAtExit``, and
+  later runs load it with ``-XX:SharedArchiveFile``.
+* Older Java has no dynamic archives, so the option is ignored.
+
+The archive is only written when the game exits normally.
+"""
+import hashlib
+import os
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+INSTANCES_DIR = os.path.join(GAME_DIR, "instances")
+ARCHIVE_SUFFIX = ".jsa"
+
+MIN_JAVA_VERSION = 13
+AUTO_CREATE_JAVA_VERSION = 19
+
+
+def cds_dir(instance_name):
+    return os.path.join(INSTANCES_DIR, instance_name, ".cache", "cds")
+
+
+def classpath_hash(plan):
+    """Hash of everything a dynamic archive depends on"""
+    digest = hashlib.sha1()
+    digest.update(f"{plan['java']}\0{plan['java_version']}\0{plan['main_class']}\0".encode())
+    for entry in plan["classpath"]:
+        try:
+            stat = os.stat(entry)
+            digest.update(f"{entry}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{entry}\0missing\n".encode())
+    return digest.hexdigest()
+
+
+def remove_stale(directory, keep):
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(ARCHIVE_SUFFIX) and name != keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def cds_args(plan, instance_name, log=print):
+    """JVM arguments that record or use the instance's archive for this plan"""
+    java_version = plan["java_version"]
+    if java_version < MIN_JAVA_VERSION:
+        log(f"Class data sharing needs Java {MIN_JAVA_VERSION}+, skipping it for Java {java_version}")
+        return []
+    directory = cds_dir(instance_name)
+    os.makedirs(directory, exist_ok=True)
+    name = classpath_hash(plan) + ARCHIVE_SUFFIX
+    remove_stale(directory, name)
+    archive = os.path.join(directory, name)
+
+    if java_version >= AUTO_CREATE_JAVA_VERSION:
+        log("Using class data sharing archive" if os.path.isfile(archive)
+            else "Recording class data sharing archive on this run")
+        return ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={archive}"]
+    if os.path.isfile(archive):
+        log("Using class data sharing archive")
+        return [f"-XX:SharedArchiveFile={archive}"]
+    log("Recording class data sharing archive on this run")
+    return [f"-XX:ArchiveClassesAtExit={archive}"]
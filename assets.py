@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Asset index download and verification shared by the vanilla and Fabric launch paths.
+
+Once every object of an asset index has been verified, a manifest is written to
+``assets/verified/<index id>-<index sha1>.json`` recording the mtime of each
+``objects/xx`` directory. Warm launches then only stat that manifest. Once it is
+older than RECHECK_INTERVAL the launch re-checks just the object directories
+whose mtime changed since the manifest was written.
+"""
+import json
+import os
+import sys
+import time
+
+import downloader
+from downloader import DownloadTask
+
+RESOURCES_URL = "https://resources.download.minecraft.net"
+RECHECK_INTERVAL = 24 * 60 * 60
+
+
+def manifest_path(assets_dir, index_id, index_sha1):
+    return os.path.join(assets_dir, "verified", f"{index_id}-{index_sha1}.json")
+
+
+def object_path(assets_dir, asset_hash):
+    return os.path.join(assets_dir, "objects", asset_hash[:2], asset_hash)
+
+
+def asset_task(asset_hash, assets_dir, size=None):
+    """Build the download task for a single asset object"""
+    asset_url = f"{RESOURCES_URL}/{asset_hash[:2]}/{asset_hash}"
+    return DownloadTask(asset_url, object_path(assets_dir, asset_hash), sha1=asset_hash, size=size)
+
+
+def read_asset_index_info(version_json_path):
+    """Return (id, url, sha1) of the asset index referenced by a version JSON"""
+    with open(version_json_path, "r") as f:
+        data = json.load(f)
+    info = data.get("assetIndex", {})
+    return info.get("id", data.get("assets", "legacy")), info.get("url"), info.get("sha1")
+
+
+def download_asset_index(asset_id, asset_url, asset_hash, assets_dir, log=print):
+    """Download the asset index file, returning its path or None"""
+    if not asset_url:
+        log(f"No asset index URL found for {asset_id}")
+        return None
+
+    index_path = os.path.join(assets_dir, "indexes", f"{asset_id}.json")
+    log(f"Downloading asset index: {asset_id}")
+    if downloader.download_file(asset_url, index_path, sha1=asset_hash):
+        log(f"Asset index downloaded successfully: {index_path}")
+        return index_path
+
+    log(f"Failed to download asset index: {asset_id}")
+    return None
+
+
+def load_objects(index_path):
+    """Map of object hash -> size grouped by their two character directory"""
+    with open(index_path, "r") as f:
+        objects = json.load(f).get("objects", {})
+
+    by_dir = {}
+    for info in objects.values():
+        asset_hash = info["hash"]
+        by_dir.setdefault(asset_hash[:2], {})[asset_hash] = info.get("size")
+    return by_dir
+
+
+def dir_mtime(assets_dir, prefix):
+    try:
+        return os.stat(os.path.join(assets_dir, "objects", prefix)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def missing_objects(assets_dir, prefix, hashes):
+    """Objects of one directory that are absent or fail verification.
+
+    Present objects go through the engine's is_valid, which answers from the
+    stat index and only hashes files that changed since they were last verified.
+    """
+    directory = os.path.join(assets_dir, "objects", prefix)
+    try:
+        present = set(os.listdir(directory))
+    except OSError:
+        present = set()
+
+    engine = downloader.get_engine()
+    missing = []
+    for asset_hash, size in hashes.items():
+        task = asset_task(asset_hash, assets_dir, size)
+        if asset_hash in present and engine.is_valid(task):
+            continue
+        missing.append(task)
+    return missing
+
+
+def download_objects(tasks, log=print, priority=downloader.PRIORITY_LAUNCH):
+    """Download asset objects through the shared engine, returning True if all succeeded"""
+    if not tasks:
+        return True
+
+    log(f"Downloading {len(tasks)} asset files...")
+    processed = [0]
+
+    def on_done(task, error):
+        processed[0] += 1
+        if error:
+            log(f"Failed to download asset: {os.path.basename(task.dest)} ({error})")
+        if processed[0] % 50 == 0 or processed[0] == len(tasks):
+            log(f"Progress: {processed[0]}/{len(tasks)} assets processed")
+
+    completed, failed = downloader.get_engine().download_all(tasks, on_done=on_done, priority=priority)
+    log(f"Asset download complete: {len(completed)} successful, {len(failed)} failed")
+    return not failed
+
+
+def write_manifest(path, index_sha1, by_dir, assets_dir):
+    manifest = {
+        "index_sha1": index_sha1,
+        "objects": sum(len(hashes) for hashes in by_dir.values()),
+        "dirs": {prefix: dir_mtime(assets_dir, prefix) for prefix in by_dir},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+    # Manifests for older revisions of the same index are now stale
+    prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith(prefix) and name.endswith(".json") and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(os.path.dirname(path), name))
+            except OSError:
+                pass
+
+
+def ensure_assets(version_json_path, assets_dir, verify=None, log=print, priority=downloader.PRIORITY_LAUNCH):
+    """Make sure every asset of a version is present. Returns (success, asset index id).
+
+    verify is "fast" (trust a fresh manifest), "incremental" (re-check changed
+    directories) or "full" (re-check everything). It defaults to the
+    RBL_VERIFY_ASSETS environment variable, then "fast".
+    """
+    verify = verify or os.environ.get("RBL_VERIFY_ASSETS", "fast")
+
+    try:
+        asset_id, asset_url, asset_hash = read_asset_index_info(version_json_path)
+    except Exception as e:
+        log(f"Error reading asset index information: {e}")
+        return False, "legacy"
+
+    if not asset_hash:
+        log("No asset index information found")
+        return False, asset_id
+
+    marker = manifest_path(assets_dir, asset_id, asset_hash)
+    manifest = None
+    if verify != "full":
+        try:
+            st = os.stat(marker)
+        except OSError:
+            st = None
+        if st is not None:
+            if verify == "fast" and time.time() - st.st_mtime < RECHECK_INTERVAL:
+                log(f"Assets for index {asset_id} already verified")
+                return True, asset_id
+            try:
+                with open(marker, "r") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = None
+
+    index_path = download_asset_index(asset_id, asset_url, asset_hash, assets_dir, log)
+    if not index_path:
+        return False, asset_id
+
+    by_dir = load_objects(index_path)
+    if manifest is not None:
+        recorded = manifest.get("dirs", {})
+        changed = [p for p in by_dir if recorded.get(p) is None or recorded.get(p) != dir_mtime(assets_dir, p)]
+        log(f"Re-checking {len(changed)} of {len(by_dir)} asset directories")
+    else:
+        changed = list(by_dir)
+        log(f"Verifying {sum(len(h) for h in by_dir.values())} asset files")
+
+    tasks = []
+    for prefix in changed:
+        tasks.extend(missing_objects(assets_dir, prefix, by_dir[prefix]))
+    # Keep the hashes computed while checking, even when nothing needs downloading
+    downloader.get_engine().save_index()
+
+    if not download_objects(tasks, log, priority):
+        return False, asset_id
+
+    write_manifest(marker, asset_hash, by_dir, assets_dir)
+    return True, asset_id
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: assets.py <version_json_path> <assets_dir> [fast|incremental|full]", file=sys.stderr)
+        return 1
+    success, asset_id = ensure_assets(argv[0], argv[1], argv[2] if len(argv) > 2 else None)
+    if success:
+        print(f"ASSET_INDEX={asset_id}")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""Shared download engine used by the launch scripts, installers and mod windows.
+
+Every download goes through one pooled ``requests`` session so connections (and
+their TLS handshakes) are reused, a bounded worker pool, and a per-host limit.
+Files are hashed while they are streamed to a temp file next to the destination
+and only renamed into place once the hash checks out. Files already on disk are
+checked against a size+mtime stat index before anything gets re-hashed.
+
+Work is scheduled by priority: queued tasks and free connections both go to
+launch-blocking downloads before installs, and installs before background mod
+updates. All downloads share one connection cap and an optional bandwidth
+limit. Requests for a file that is already being downloaded wait for that
+download instead of fetching it again.
+"""
+import atexit
+import concurrent.futures
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_WORKERS = 16
+PER_HOST_LIMIT = 8
+MAX_CONNECTIONS = 16
+DEFAULT_TIMEOUT = 30
+USER_AGENT = "ReallyBadLauncher/1.0"
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+STAT_INDEX_PATH = os.path.join(GAME_DIR, ".cache", "stat_index.json")
+
+# Lower values are served first
+PRIORITY_LAUNCH = 0
+PRIORITY_INSTALL = 10
+PRIORITY_BACKGROUND = 20
+
+# Download limit in KB/s for this process (0 or unset means unlimited)
+BANDWIDTH_ENV = "RBL_DOWNLOAD_LIMIT"
+
+
+class DownloadError(Exception):
+    """Raised when a file could not be fetched from any of its URLs"""
+
+
+class DownloadCancelled(DownloadError):
+    """Raised when a download is aborted through its cancel callback"""
+
+
+class DownloadTask:
+    """A single file to fetch, with optional hashes and fallback mirrors"""
+
+    def __init__(self, url, dest, sha1=None, sha512=None, size=None, mirrors=None, priority=PRIORITY_INSTALL):
+        self.url = url
+        self.dest = dest
+        self.sha1 = sha1.lower() if sha1 else None
+        self.sha512 = sha512.lower() if sha512 else None
+        self.size = size
+        self.mirrors = list(mirrors or [])
+        self.priority = priority
+        # (url, exception) for every URL that failed, filled in by DownloadEngine.fetch
+        self.errors = []
+
+    @property
+    def urls(self):
+        return [u for u in [self.url] + self.mirrors if u]
+
+    def __repr__(self):
+        return f"DownloadTask({self.url!r} -> {self.dest!r})"
+
+
+def hash_file(path, algorithm="sha1"):
+    """Hash a file in chunks without reading it into memory"""
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class StatIndex:
+    """Persistent path -> (size, mtime) -> hash map so unchanged files are never re-hashed"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def lookup(self, file_path, algorithm):
+        """Return the recorded hash if the file's size and mtime are unchanged"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load().get(os.path.abspath(file_path))
+        if not entry or entry.get("size") != st.st_size or entry.get("mtime") != st.st_mtime_ns:
+            return None
+        return entry.get(algorithm)
+
+    def record(self, file_path, algorithm, digest):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if not entry or entry.get("size") != st.st_size or entry.get("mtime") != st.st_mtime_ns:
+                entry = {"size": st.st_size, "mtime": st.st_mtime_ns}
+                entries[key] = entry
+            entry[algorithm] = digest
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"Failed to save stat index: {e}", file=sys.stderr)
+
+
+class PrioritySlots:
+    """Counting semaphore that hands a freed slot to the highest priority waiter"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._used = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, priority):
+        with self._lock:
+            if self._used < self.limit and not self._waiters:
+                self._used += 1
+                return
+            event = threading.Event()
+            heapq.heappush(self._waiters, (priority, next(self._seq), event))
+        event.wait()
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot passes straight to the waiter, so _used stays the same
+                heapq.heappop(self._waiters)[2].set()
+            else:
+                self._used -= 1
+
+
+class BandwidthLimiter:
+    """Token bucket shared by all downloads, allowing at most one second of burst"""
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = rate or None
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+    def consume(self, count):
+        """Account for count bytes, sleeping long enough to stay under the rate"""
+        with self._lock:
+            rate = self.rate
+            if not rate:
+                return
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate) - count
+            self._updated = now
+            deficit = -self._tokens
+        if deficit > 0:
+            time.sleep(deficit / rate)
+
+
+class PriorityExecutor:
+    """Fixed pool of daemon workers that runs queued calls lowest priority value first"""
+
+    def __init__(self, max_workers, thread_name_prefix="worker"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, priority, fn, *args):
+        future = concurrent.futures.Future()
+        self._queue.put((priority, next(self._seq), future, fn, args))
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"{self.thread_name_prefix}_{len(self._threads)}")
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            _, _, future, fn, args = self._queue.get()
+            if fn is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self):
+        with self._lock:
+            for _ in self._threads:
+                self._queue.put((float("inf"), next(self._seq), None, None, None))
+            self._threads = []
+
+
+class DownloadEngine:
+    """Bounded, connection-pooled downloader with streaming hash verification"""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, per_host=PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT, index=None,
+                 max_connections=MAX_CONNECTIONS, bandwidth=None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.index = index
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(max_workers, per_host))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = PriorityExecutor(max_workers, thread_name_prefix="download")
+        self._connections = PrioritySlots(max_connections)
+        self.limiter = BandwidthLimiter(bandwidth)
+        self._host_slots = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def set_bandwidth_limit(self, bytes_per_second):
+        """Cap the combined download rate, None or 0 to remove the cap"""
+        self.limiter.set_rate(bytes_per_second)
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+        return slot
+
+    def file_hash(self, path, algorithm="sha1"):
+        """Hash a file, answering from the stat index when it is unchanged on disk"""
+        if self.index is not None:
+            digest = self.index.lookup(path, algorithm)
+            if digest:
+                return digest
+        digest = hash_file(path, algorithm)
+        if self.index is not None:
+            self.index.record(path, algorithm, digest)
+        return digest
+
+    def is_valid(self, task):
+        """Check whether the destination already holds the expected file"""
+        try:
+            st = os.stat(task.dest)
+        except OSError:
+            return False
+        if task.size is not None and st.st_size != task.size:
+            return False
+        if task.sha1:
+            return self.file_hash(task.dest, "sha1") == task.sha1
+        if task.sha512:
+            return self.file_hash(task.dest, "sha512") == task.sha512
+        return True
+
+    def fetch(self, task, progress=None, cancel=None, skip_existing=True):
+        """Download a task, trying each of its URLs in order. Returns the destination path.
+
+        If another task is already downloading the same destination, this waits for it
+        and only downloads itself when that result does not match.
+        """
+        key = os.path.abspath(task.dest)
+        with self._lock:
+            owner = self._inflight.get(key)
+            if owner is None:
+                mine = self._inflight[key] = concurrent.futures.Future()
+
+        if owner is not None:
+            while not owner.done():
+                if cancel and cancel():
+                    raise DownloadCancelled(f"Cancelled: {task.dest}")
+                concurrent.futures.wait([owner], timeout=0.2)
+            if owner.exception() is None and (not (task.sha1 or task.sha512) or self.is_valid(task)):
+                return task.dest
+            return self.fetch(task, progress, cancel, skip_existing)
+
+        try:
+            result = self._fetch(task, progress, cancel, skip_existing)
+        except BaseException as e:
+            self._finish(key, mine, error=e)
+            raise
+        self._finish(key, mine, result=result)
+        return result
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _fetch(self, task, progress, cancel, skip_existing):
+        if skip_existing and (task.sha1 or task.sha512) and self.is_valid(task):
+            return task.dest
+
+        errors = []
+        for url in task.urls:
+            if cancel and cancel():
+                raise DownloadCancelled(f"Cancelled: {task.dest}")
+            try:
+                self._stream(url, task, progress, cancel)
+                return task.dest
+            except DownloadCancelled:
+                raise
+            except Exception as e:
+                task.errors.append((url, e))
+                errors.append(f"{url}: {e}")
+
+        raise DownloadError(f"Failed to download {os.path.basename(task.dest)} ({'; '.join(errors) or 'no URL'})")
+
+    def _stream(self, url, task, progress, cancel):
+        dest_dir = os.path.dirname(task.dest) or "."
+        os.makedirs(dest_dir, exist_ok=True)
+
+        with self._host_slot(url):
+            self._connections.acquire(task.priority)
+            try:
+                self._download(url, task, progress, cancel, dest_dir)
+            finally:
+                self._connections.release()
+
+    def _download(self, url, task, progress, cancel, dest_dir):
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+
+            sha1 = hashlib.sha1() if task.sha1 else None
+            sha512 = hashlib.sha512() if task.sha512 else None
+            written = 0
+
+            fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=f".{os.path.basename(task.dest)}.", suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        if cancel and cancel():
+                            raise DownloadCancelled(f"Cancelled: {task.dest}")
+                        self.limiter.consume(len(chunk))
+                        out.write(chunk)
+                        written += len(chunk)
+                        if sha1:
+                            sha1.update(chunk)
+                        if sha512:
+                            sha512.update(chunk)
+                        if progress:
+                            progress(len(chunk))
+
+                if task.size is not None and written != task.size:
+                    raise DownloadError(f"size mismatch (expected {task.size}, got {written})")
+                if sha1 and sha1.hexdigest() != task.sha1:
+                    raise DownloadError("sha1 mismatch")
+                if sha512 and sha512.hexdigest() != task.sha512:
+                    raise DownloadError("sha512 mismatch")
+
+                os.replace(tmp_path, task.dest)
+                if self.index is not None:
+                    if sha1:
+                        self.index.record(task.dest, "sha1", task.sha1)
+                    if sha512:
+                        self.index.record(task.dest, "sha512", task.sha512)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+    def submit(self, task, progress=None, cancel=None):
+        """Queue a task on the worker pool by its priority and return its future"""
+        return self._executor.submit(task.priority, self.fetch, task, progress, cancel)
+
+    def download_all(self, tasks, progress=None, cancel=None, on_done=None, priority=None):
+        """Download many tasks concurrently. Returns (completed, failed) where failed is [(task, error)]."""
+        if priority is not None:
+            for task in tasks:
+                task.priority = priority
+        futures = {self.submit(task, progress, cancel): task for task in tasks}
+        completed, failed = [], []
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                task = futures[future]
+                try:
+                    future.result()
+                    completed.append(task)
+                    error = None
+                except Exception as e:
+                    failed.append((task, e))
+                    error = e
+                if on_done:
+                    on_done(task, error)
+        finally:
+            for future in futures:
+                future.cancel()
+            self.save_index()
+        return completed, failed
+
+    def save_index(self):
+        if self.index is not None:
+            self.index.save()
+
+    def close(self):
+        self._executor.shutdown()
+        self.session.close()
+        self.save_index()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide download engine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = DownloadEngine(index=StatIndex(STAT_INDEX_PATH), bandwidth=bandwidth_from_env())
+            atexit.register(_engine.save_index)
+        return _engine
+
+
+def bandwidth_from_env():
+    """Bandwidth limit in bytes per second from RBL_DOWNLOAD_LIMIT (KB/s), or None"""
+    try:
+        limit = int(os.environ.get(BANDWIDTH_ENV, "0"))
+    except ValueError:
+        return None
+    return limit * 1024 if limit > 0 else None
+
+
+def download_file(url, dest, sha1=None, sha512=None, size=None, mirrors=None):
+    """Download a single file through the shared engine, returning True on success"""
+    try:
+        get_engine().fetch(DownloadTask(url, dest, sha1=sha1, sha512=sha512, size=size, mirrors=mirrors))
+        return True
+    except Exception as e:
+        print(f"Failed to download {url}: {e}", file=sys.stderr)
+        return False
+
+
+def main(argv):
+    """CLI used by the shell scripts: downloader.py DEST URL [URL...] [--sha1 HASH]"""
+    args = list(argv)
+    sha1 = None
+    if "--sha1" in args:
+        i = args.index("--sha1")
+        sha1 = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Usage: downloader.py DEST URL [URL...] [--sha1 HASH]", file=sys.stderr)
+        return 2
+
+    dest, url, mirrors = args[0], args[1], args[2:]
+    return 0 if download_file(url, dest, sha1=sha1, mirrors=mirrors) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -4,10 +4,12 @@ import shutil
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                            QPushButton, QListWidget, QListWidgetItem, QFrame, 
                            QScrollArea, QWidget, QSizePolicy, QComboBox, 
-                           QGridLayout, QCheckBox, QSpacerItem, QFileDialog)
+                           QGridLayout, QCheckBox, QSpacerItem, QFileDialog, QSpinBox)
 from PyQt5.QtGui import QIcon, QPixmap, QColor, QImage
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, QTimer
 from PyQt5.QtCore import pyqtSignal
+import meta_cache
+import jvm_profiles
 
 class EditInstanceWindow(QDialog):
     """Dialog window for editing an existing Minecraft instance"""
@@ -288,6 +290,44 @@ class EditInstanceWindow(QDialog):
         content_layout.addWidget(sidebar_frame)
         content_layout.addWidget(content_frame, 1)
         
+        # JVM profile
+        jvm_frame = QFrame()
+        jvm_frame.setFrameShape(QFrame.StyledPanel)
+        jvm_layout = QGridLayout(jvm_frame)
+        jvm_layout.setContentsMargins(0, 0, 0, 0)
+
+        jvm_layout.addWidget(QLabel("Memory:"), 0, 0)
+        self.memory_spin = QSpinBox()
+        self.memory_spin.setRange(0, 65536)
+        self.memory_spin.setSingleStep(512)
+        self.memory_spin.setSuffix(" MB")
+        self.memory_spin.setSpecialValueText("Auto")
+        jvm_layout.addWidget(self.memory_spin, 0, 1)
+        self.memory_hint = QLabel("")
+        jvm_layout.addWidget(self.memory_hint, 0, 2, 1, 2)
+
+        jvm_layout.addWidget(QLabel("Collector:"), 1, 0)
+        self.collector_combo = QComboBox()
+        self.collector_combo.addItems(["Auto", "G1", "ZGC", "Shenandoah"])
+        jvm_layout.addWidget(self.collector_combo, 1, 1)
+        jvm_layout.addWidget(QLabel("Flags:"), 1, 2)
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(["Standard", "Aikar"])
+        jvm_layout.addWidget(self.preset_combo, 1, 3)
+
+        self.gc_logging_check = QCheckBox("GC logging")
+        jvm_layout.addWidget(self.gc_logging_check, 2, 0)
+        self.debug_check = QCheckBox("LWJGL debug")
+        jvm_layout.addWidget(self.debug_check, 2, 1)
+        self.cds_check = QCheckBox("Class data sharing (faster startup)")
+        self.cds_check.setToolTip("Records the loaded classes on the first run and maps them on later launches")
+        jvm_layout.addWidget(self.cds_check, 2, 2, 1, 2)
+
+        jvm_layout.addWidget(QLabel("Extra args:"), 3, 0)
+        self.extra_args_input = QLineEdit()
+        self.extra_args_input.setPlaceholderText("Additional JVM arguments")
+        jvm_layout.addWidget(self.extra_args_input, 3, 1, 1, 3)
+        
         # Bottom buttons
         buttons_layout = QHBoxLayout()
         buttons_layout.addStretch(1)  # Push buttons to the right
@@ -304,6 +344,7 @@ class EditInstanceWindow(QDialog):
         # Add all components to main layout
         main_layout.addLayout(top_layout, 0)  # Minimal space for top layout
         main_layout.addLayout(content_layout, 1)  # Give majority of space to content
+        main_layout.addWidget(jvm_frame, 0)
         main_layout.addLayout(buttons_layout, 0)  # Minimal space for buttons
         
         self.versions_list.itemSelectionChanged.connect(self.validate_ok_button)
@@ -342,7 +383,17 @@ class EditInstanceWindow(QDialog):
             self.name_input.setText(self.instance_data['name'])
             self.original_name = self.instance_data['name']
             self.setWindowTitle(f"Edit Instance ({self.original_name})")
-            
+
+        profile = jvm_profiles.normalize(self.instance_data.get('jvm_profile'))
+        self.memory_spin.setValue(profile['memory_mb'])
+        self.collector_combo.setCurrentIndex(jvm_profiles.COLLECTORS.index(profile['collector']))
+        self.preset_combo.setCurrentIndex(jvm_profiles.PRESETS.index(profile['preset']))
+        self.gc_logging_check.setChecked(profile['gc_logging'])
+        self.debug_check.setChecked(profile['debug'])
+        self.cds_check.setChecked(profile['class_data_sharing'])
+        self.extra_args_input.setText(profile['extra_args'])
+        self.memory_hint.setText(jvm_profiles.describe(dict(profile, memory_mb=0), self.instance_data.get('name', '')))
+
         # Set image if available
         if self.selected_image_path and os.path.exists(self.selected_image_path):
             pixmap = QPixmap(self.selected_image_path)
@@ -441,17 +492,12 @@ class EditInstanceWindow(QDialog):
         """Change the active section and update content"""
         from PyQt5.QtCore import QTimer
         import threading
-        import requests
 
         # Helper functions to fetch data
         def fetch_vanilla_versions():
             def fetch():
-                url = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
                 try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    releases = [v["id"] for v in data["versions"]]
+                    releases = meta_cache.minecraft_versions()
                     self.populate_versions(releases)
                     self.validate_ok_button()
                     QTimer.singleShot(0, lambda: self.populate_versions(releases))
@@ -461,11 +507,8 @@ class EditInstanceWindow(QDialog):
 
         def fetch_fabric_versions():
             def fetch():
-                url = "https://meta.fabricmc.net/v2/versions/loader"
                 try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
+                    data = meta_cache.fabric_loaders()
                     versions = [f"Fabric {entry['version']}" for entry in data]
                     self.populate_fabric_versions(versions)
                     self.validate_ok_button()
@@ -707,9 +750,21 @@ class EditInstanceWindow(QDialog):
             "modloader": self.current_section,  # Use modloader field for consistency
             "version": minecraft_version,
             "fabric_version": modloader_version,
-            "image": image_data
+            "image": image_data,
+            "jvm_profile": self.get_jvm_profile()
         }
 
+    def get_jvm_profile(self):
+        return jvm_profiles.normalize({
+            "memory_mb": self.memory_spin.value(),
+            "collector": jvm_profiles.COLLECTORS[self.collector_combo.currentIndex()],
+            "preset": jvm_profiles.PRESETS[self.preset_combo.currentIndex()],
+            "gc_logging": self.gc_logging_check.isChecked(),
+            "debug": self.debug_check.isChecked(),
+            "class_data_sharing": self.cds_check.isChecked(),
+            "extra_args": self.extra_args_input.text().strip(),
+        })
+
 # For standalone testing
 if __name__ == "__main__":
     from PyQt5.QtWidgets import QApplication
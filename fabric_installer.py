@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""In-process vanilla and Fabric installation.
+
+Fabric profiles come straight from meta.fabricmc.net, so the installer jar is
+never downloaded and no JVM is started. Installing a Fabric version fetches
+the Mojang version JSON and the Fabric profile JSON at the same time. The
+client jar and every missing vanilla and Fabric library are then downloaded
+as one concurrent batch through the shared download engine.
+"""
+import concurrent.futures
+import json
+import os
+import sys
+
+import libraries
+import meta_cache
+from downloader import PRIORITY_INSTALL, DownloadCancelled, DownloadError, DownloadTask, get_engine
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+VERSIONS_DIR = os.path.join(GAME_DIR, "versions")
+LIBRARIES_DIR = os.path.join(GAME_DIR, "libraries")
+
+
+class InstallError(Exception):
+    """Raised when a version cannot be installed"""
+
+
+def version_json_path(version_id):
+    return os.path.join(VERSIONS_DIR, version_id, f"{version_id}.json")
+
+
+def latest_release():
+    return meta_cache.version_manifest()["latest"]["release"]
+
+
+def latest_stable_loader():
+    for loader in meta_cache.fabric_loaders():
+        if loader.get("stable"):
+            return loader["version"]
+    raise InstallError("No stable Fabric loader found")
+
+
+def manifest_entry(mc_version):
+    """The version manifest entry for a Minecraft version"""
+    # A cached manifest can predate a new release, so look again with a fresh one
+    for ttl in (meta_cache.MANIFEST_TTL, 0):
+        for entry in meta_cache.version_manifest(ttl).get("versions", []):
+            if entry.get("id") == mc_version:
+                return entry
+    raise InstallError(f"Minecraft version {mc_version} not found")
+
+
+def fetch_vanilla_json(mc_version, priority=PRIORITY_INSTALL):
+    """Download the Mojang version JSON into versions/ (sha1 checked) and return it"""
+    entry = manifest_entry(mc_version)
+    path = version_json_path(mc_version)
+    get_engine().fetch(DownloadTask(entry["url"], path, sha1=entry.get("sha1"), priority=priority))
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def fetch_fabric_profile(mc_version, loader_version):
+    """The Fabric launcher profile for a game and loader version"""
+    return meta_cache.fabric_profile(mc_version, loader_version)
+
+
+def write_profile(profile):
+    """Write a Fabric profile into versions/ the way the installer jar does, returning its id"""
+    version_id = profile["id"]
+    version_dir = os.path.join(VERSIONS_DIR, version_id)
+    os.makedirs(version_dir, exist_ok=True)
+    path = version_json_path(version_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    # The installer also leaves an empty jar next to the profile
+    open(os.path.join(version_dir, f"{version_id}.jar"), "a").close()
+    return version_id
+
+
+def client_jar_task(mc_version, version_data, priority=PRIORITY_INSTALL):
+    client = version_data.get("downloads", {}).get("client")
+    if not client:
+        raise InstallError(f"No client jar listed for {mc_version}")
+    return DownloadTask(client["url"], os.path.join(VERSIONS_DIR, mc_version, f"{mc_version}.jar"),
+                        sha1=client.get("sha1"), size=client.get("size"), priority=priority)
+
+
+def download_artifacts(mc_version, version_datas, log=print, cancel=None, priority=PRIORITY_INSTALL):
+    """Download the client jar and all missing libraries of the given version JSONs concurrently"""
+    engine = get_engine()
+    jar_future = engine.submit(client_jar_task(mc_version, version_datas[0], priority), cancel=cancel)
+
+    libs = []
+    for data in version_datas:
+        libs += libraries.version_libraries(data)
+    missing = [lib for lib in libraries.deduplicate(libs)
+               if not os.path.isfile(os.path.join(LIBRARIES_DIR, lib.path))]
+    failed = libraries.fetch_missing(missing, log, priority=priority)
+
+    try:
+        jar_future.result()
+    except DownloadCancelled:
+        raise
+    except Exception as e:
+        raise InstallError(f"Failed to download client jar: {e}")
+    if cancel and cancel():
+        raise DownloadCancelled(f"Cancelled install of {mc_version}")
+    if failed:
+        raise InstallError(f"Failed to download {len(failed)} libraries")
+
+
+def install_vanilla(mc_version, log=print, cancel=None, priority=PRIORITY_INSTALL):
+    """Install a vanilla version: version JSON, client jar and libraries"""
+    log(f"Installing Minecraft {mc_version}...")
+    try:
+        data = fetch_vanilla_json(mc_version, priority)
+    except (OSError, ValueError, DownloadError) as e:
+        raise InstallError(f"Failed to fetch version JSON for {mc_version}: {e}")
+    download_artifacts(mc_version, [data], log, cancel, priority)
+    log(f"Vanilla Minecraft {mc_version} installed successfully")
+    return mc_version
+
+
+def install_fabric(mc_version, loader_version, log=print, cancel=None, priority=PRIORITY_INSTALL):
+    """Install Fabric for a game version, with its vanilla parent. Returns the Fabric version id."""
+    log(f"Installing Fabric {loader_version} for Minecraft {mc_version}...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="fabric-meta") as pool:
+        vanilla_future = pool.submit(fetch_vanilla_json, mc_version, priority)
+        profile_future = pool.submit(fetch_fabric_profile, mc_version, loader_version)
+        try:
+            vanilla_data = vanilla_future.result()
+            profile = profile_future.result()
+        except (OSError, ValueError, DownloadError) as e:
+            raise InstallError(f"Failed to fetch version metadata: {e}")
+
+    version_id = write_profile(profile)
+    download_artifacts(mc_version, [vanilla_data, profile], log, cancel, priority)
+    log(f"Fabric installed at: {version_id}")
+    return version_id
+
+
+def main(argv):
+    """CLI: fabric_installer.py vanilla [MINECRAFT_VERSION] | fabric [MINECRAFT_VERSION] [FABRIC_VERSION]
+
+    The Minecraft version defaults to the latest release, and the Fabric
+    version to the latest stable loader.
+    """
+    if not argv or argv[0] not in ("vanilla", "fabric"):
+        print("Usage: fabric_installer.py vanilla [MINECRAFT_VERSION] | fabric [MINECRAFT_VERSION] [FABRIC_VERSION]",
+              file=sys.stderr)
+        return 2
+    command, args = argv[0], argv[1:]
+    try:
+        mc_version = args[0] if args and args[0] else latest_release()
+        if command == "vanilla":
+            install_vanilla(mc_version)
+            return 0
+        loader_version = args[1] if len(args) > 1 and args[1] else None
+        if loader_version is None:
+            print("No Fabric version specified. Using latest stable.")
+            loader_version = latest_stable_loader()
+        install_fabric(mc_version, loader_version)
+    except (OSError, ValueError, KeyError, InstallError, DownloadError) as e:
+        print(f"Install failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
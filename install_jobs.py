@@ -0,0 +1,242 @@
+"""Background install jobs.
+
+Instance creation and reinstalls run as InstallJob objects on a small worker
+pool, so the UI thread only connects to their signals. A job reports progress
+and log lines through Qt signals, which are delivered on the UI thread. It can
+be cancelled at any point: its cancel flag is passed to the download engine
+and any script it started is terminated.
+
+Job state is persisted to ``.cache/install_jobs.json``. Jobs that failed, or
+were queued or running when the launcher exited, are reported by
+``JobManager.interrupted()`` so the UI can start them again. The modpack
+installer's journal then skips the files that were already downloaded.
+
+Queued jobs start in priority order, using the same priority levels as the
+download engine, so a reinstall the user is waiting on runs before mod
+installs. A job submitted with the key of a job that is still unfinished is
+not queued again; the existing job is returned instead.
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from downloader import PRIORITY_INSTALL, DownloadCancelled, PriorityExecutor
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+JOBS_PATH = os.path.join(GAME_DIR, ".cache", "install_jobs.json")
+MAX_CONCURRENT_JOBS = 3
+# Minimum time between two progress signals of one job
+PROGRESS_INTERVAL = 0.2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function once the job has been cancelled"""
+
+
+class InstallJob(QObject):
+    """One unit of background install work. work(job) runs on a pool thread and its return value becomes job.result."""
+
+    progressChanged = pyqtSignal(str, int, int)  # status, done, total
+    logMessage = pyqtSignal(str)
+    finished = pyqtSignal(bool, str)  # success, message
+
+    def __init__(self, kind, name, work, params=None, job_id=None, priority=PRIORITY_INSTALL, key=None):
+        super().__init__()
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.name = name
+        self.work = work
+        self.params = params or {}
+        self.priority = priority
+        self.key = key
+        self.state = QUEUED
+        self.status = "Queued"
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.manager = None
+        self._cancelled = threading.Event()
+        self._process = None
+        self._last_progress = 0
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Request cancellation, terminating any script the job is running"""
+        self._cancelled.set()
+        with self._lock:
+            process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self.is_cancelled():
+            raise JobCancelled(f"{self.name} was cancelled")
+
+    def log(self, message):
+        self.logMessage.emit(str(message))
+
+    def progress(self, done, total, status=None):
+        """Report progress, throttled to one signal per PROGRESS_INTERVAL unless the status changes"""
+        self.done, self.total = done, total
+        now = time.monotonic()
+        if status is None and now - self._last_progress < PROGRESS_INTERVAL and done < total:
+            return
+        if status is not None:
+            self.status = status
+        self._last_progress = now
+        self.progressChanged.emit(self.status, done, total)
+
+    def set_status(self, status):
+        self.progress(self.done, self.total, status)
+
+    def run_process(self, args, **kwargs):
+        """Run a command, forwarding its output to the job log. Returns the exit code."""
+        self.check_cancelled()
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, **kwargs)
+        with self._lock:
+            self._process = process
+        try:
+            for line in process.stdout:
+                self.log(line.rstrip("\n"))
+            process.wait()
+        finally:
+            with self._lock:
+                self._process = None
+        self.check_cancelled()
+        return process.returncode
+
+    def run(self):
+        self._set_state(RUNNING)
+        try:
+            self.check_cancelled()
+            self.result = self.work(self)
+        except Exception as e:
+            if self.is_cancelled() or isinstance(e, (JobCancelled, DownloadCancelled)):
+                self._set_state(CANCELLED)
+                self.finished.emit(False, f"{self.name}: install cancelled")
+            else:
+                print(f"Install job {self.name} failed: {e}")
+                self._set_state(FAILED)
+                self.finished.emit(False, f"{self.name}: {e}")
+            return
+        self._set_state(DONE)
+        self.finished.emit(True, f"{self.name}: install complete")
+
+    def _set_state(self, state):
+        self.state = state
+        if self.manager is not None:
+            self.manager.job_changed(self)
+
+    def to_record(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "state": self.state,
+            "params": self.params,
+            "priority": self.priority,
+            "done": self.done,
+            "total": self.total,
+            "updated": time.time(),
+        }
+
+
+class JobManager(QObject):
+    """Runs install jobs on a worker pool and persists their state"""
+
+    jobAdded = pyqtSignal(object)
+
+    def __init__(self, max_workers=MAX_CONCURRENT_JOBS, path=JOBS_PATH):
+        super().__init__()
+        self.path = path
+        self.jobs = {}
+        self._executor = PriorityExecutor(max_workers, thread_name_prefix="install")
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self._records = json.load(f)
+        except (OSError, ValueError):
+            self._records = {}
+
+    def submit(self, job):
+        """Queue a job by priority. Returns the job that will do the work, which may be an earlier duplicate."""
+        with self._lock:
+            if job.key is not None:
+                for existing in self.jobs.values():
+                    if existing.key == job.key and existing.state in (QUEUED, RUNNING):
+                        return existing
+            job.manager = self
+            self.jobs[job.id] = job
+        self.job_changed(job)
+        self.jobAdded.emit(job)
+        self._executor.submit(job.priority, job.run)
+        return job
+
+    def job_for(self, name, kinds=None):
+        """The unfinished job working on an instance name, if any, optionally limited to some job kinds"""
+        with self._lock:
+            for job in self.jobs.values():
+                if job.name == name and job.state in (QUEUED, RUNNING) and (kinds is None or job.kind in kinds):
+                    return job
+        return None
+
+    def active_names(self):
+        with self._lock:
+            return {job.name for job in self.jobs.values() if job.state in (QUEUED, RUNNING)}
+
+    def interrupted(self):
+        """Records of jobs a previous session left queued, running or failed"""
+        with self._lock:
+            return [r for r in self._records.values()
+                    if r["state"] in (QUEUED, RUNNING, FAILED) and r["id"] not in self.jobs]
+
+    def forget(self, job_id):
+        with self._lock:
+            self._records.pop(job_id, None)
+        self.save()
+
+    def job_changed(self, job):
+        with self._lock:
+            if job.state in (DONE, CANCELLED):
+                self._records.pop(job.id, None)
+            else:
+                self._records[job.id] = job.to_record()
+        self.save()
+
+    def save(self):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._records, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save install jobs: {e}")
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Return the process-wide install job manager"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,211 @@
+"""Per-instance JVM profiles.
+
+A profile is stored as ``jvm_profile`` in the instance's config entry. It
+replaces the fixed ``-Xmx2G -Xms512M -XX:+UseG1GC`` every launch used to get.
+
+* Heap: a fixed size in MB, or 0 for automatic. Automatic sizing starts from
+  the number of mods in the instance and is capped by the system's RAM.
+* Collector: G1, ZGC or Shenandoah, or auto. A collector the Java version
+  or build cannot run (Shenandoah before Java 15, or in builds that leave it
+  out) falls back to G1. Auto uses generational ZGC for large heaps on
+  Java 21+, and G1 otherwise.
+* Preset: "standard" keeps the old G1 flags. "aikar" applies Aikar's tuned
+  G1 flags, with the heap fully committed up front.
+* GC logging, which the resource monitor parses, and the LWJGL debug flags
+  are both off by default.
+* Class data sharing (see app_cds) is opt-in.
+"""
+import functools
+import os
+import shlex
+import subprocess
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+INSTANCES_DIR = os.path.join(GAME_DIR, "instances")
+
+COLLECTORS = ("auto", "G1", "ZGC", "Shenandoah")
+PRESETS = ("standard", "aikar")
+
+DEFAULT_PROFILE = {
+    "memory_mb": 0,  # 0 sizes the heap automatically
+    "collector": "auto",
+    "preset": "standard",
+    "gc_logging": False,
+    "debug": False,
+    "class_data_sharing": False,
+    "extra_args": "",
+}
+
+MIN_HEAP_MB = 1024
+VANILLA_HEAP_MB = 2048
+MODDED_BASE_HEAP_MB = 3072
+HEAP_PER_MOD_MB = 32
+MAX_AUTO_HEAP_MB = 16384
+# Never give the game more than this share of physical memory automatically
+MAX_RAM_SHARE = 0.5
+ZGC_AUTO_HEAP_MB = 8192
+# First Java versions where these collectors are production ready and need no unlock flag
+MIN_COLLECTOR_JAVA = {"ZGC": 15, "Shenandoah": 15}
+COLLECTOR_FLAGS = {"ZGC": "-XX:+UseZGC", "Shenandoah": "-XX:+UseShenandoahGC"}
+
+STANDARD_G1_FLAGS = [
+    "-XX:+UseG1GC",
+    "-XX:+ParallelRefProcEnabled",
+    "-XX:+UnlockExperimentalVMOptions",
+]
+DEBUG_FLAGS = [
+    "-Dorg.lwjgl.util.Debug=true",
+    "-Dorg.lwjgl.util.DebugLoader=true",
+]
+
+
+def normalize(profile):
+    """A complete profile from a stored (possibly partial or missing) one"""
+    result = dict(DEFAULT_PROFILE)
+    if isinstance(profile, dict):
+        result.update({key: value for key, value in profile.items() if key in DEFAULT_PROFILE})
+    if result["collector"] not in COLLECTORS:
+        result["collector"] = "auto"
+    if result["preset"] not in PRESETS:
+        result["preset"] = "standard"
+    try:
+        result["memory_mb"] = max(int(result["memory_mb"] or 0), 0)
+    except (TypeError, ValueError):
+        result["memory_mb"] = 0
+    return result
+
+
+def system_memory_mb():
+    """Physical memory in MB, or None if it cannot be read"""
+    if psutil is not None:
+        return psutil.virtual_memory().total // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        pass
+    try:
+        output = subprocess.run(["sysctl", "-n", "hw.memsize"], capture_output=True, text=True, timeout=5).stdout
+        return int(output.strip()) // (1024 * 1024)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def count_mods(instance_name):
+    try:
+        return sum(1 for name in os.listdir(os.path.join(INSTANCES_DIR, instance_name, "mods"))
+                   if name.endswith(".jar"))
+    except OSError:
+        return 0
+
+
+def auto_heap_mb(mod_count, total_mb=None):
+    """Heap size for a mod count, rounded up to 512 MB and capped by system memory"""
+    heap = VANILLA_HEAP_MB if not mod_count else MODDED_BASE_HEAP_MB + mod_count * HEAP_PER_MOD_MB
+    heap = -(-heap // 512) * 512
+    cap = MAX_AUTO_HEAP_MB
+    if total_mb:
+        cap = min(cap, int(total_mb * MAX_RAM_SHARE) // 512 * 512)
+    return max(min(heap, cap), MIN_HEAP_MB)
+
+
+def heap_mb(profile, instance_name):
+    profile = normalize(profile)
+    if profile["memory_mb"]:
+        return profile["memory_mb"]
+    return auto_heap_mb(count_mods(instance_name), system_memory_mb())
+
+
+@functools.lru_cache(maxsize=None)
+def java_supports(java, flag):
+    """Whether a Java binary starts with a collector flag; some builds (e.g. Oracle's) have no Shenandoah"""
+    try:
+        return subprocess.run([java, flag, "-version"], capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def choose_collector(collector, java_version, heap, java=None):
+    """The collector to use, falling back to G1 when the Java version or build cannot run the chosen one"""
+    if collector == "auto":
+        collector = "ZGC" if heap >= ZGC_AUTO_HEAP_MB and java_version >= 21 else "G1"
+    if collector == "G1":
+        return collector
+    if java_version < MIN_COLLECTOR_JAVA[collector]:
+        return "G1"
+    if java is not None and not java_supports(java, COLLECTOR_FLAGS[collector]):
+        print(f"{java} does not support {collector}, using G1")
+        return "G1"
+    return collector
+
+
+def aikar_flags(heap):
+    """Aikar's G1 flags, with the larger young generation settings above 12 GB"""
+    large = heap > 12 * 1024
+    return [
+        "-XX:+UseG1GC",
+        "-XX:+ParallelRefProcEnabled",
+        "-XX:MaxGCPauseMillis=200",
+        "-XX:+UnlockExperimentalVMOptions",
+        "-XX:+DisableExplicitGC",
+        f"-XX:G1NewSizePercent={40 if large else 30}",
+        f"-XX:G1MaxNewSizePercent={50 if large else 40}",
+        f"-XX:G1HeapRegionSize={16 if large else 8}M",
+        f"-XX:G1ReservePercent={15 if large else 20}",
+        "-XX:G1HeapWastePercent=5",
+        "-XX:G1MixedGCCountTarget=4",
+        f"-XX:InitiatingHeapOccupancyPercent={20 if large else 15}",
+        "-XX:G1MixedGCLiveThresholdPercent=90",
+        "-XX:G1RSetUpdatingPauseTimePercent=5",
+        "-XX:SurvivorRatio=32",
+        "-XX:+PerfDisableSharedMem",
+        "-XX:MaxTenuringThreshold=1",
+    ]
+
+
+def collector_flags(collector, preset, java_version, heap):
+    if collector == "ZGC":
+        flags = [COLLECTOR_FLAGS["ZGC"]]
+        # Generational mode is opt-in on 21 and 22 and the only mode from 23 on
+        if 21 <= java_version < 23:
+            flags.append("-XX:+ZGenerational")
+        return flags
+    if collector == "Shenandoah":
+        return [COLLECTOR_FLAGS["Shenandoah"]]
+    if preset == "aikar":
+        return aikar_flags(heap)
+    return list(STANDARD_G1_FLAGS)
+
+
+def jvm_args(profile, java_version, instance_name, java=None):
+    """Memory, collector, logging and debug arguments for one launch. With java, the collector is checked against that binary."""
+    profile = normalize(profile)
+    heap = heap_mb(profile, instance_name)
+    collector = choose_collector(profile["collector"], java_version, heap, java)
+    # Aikar commits the whole heap up front; otherwise it grows from a small start
+    initial = heap if profile["preset"] == "aikar" else min(512, heap)
+    args = [f"-Xmx{heap}M", f"-Xms{initial}M"]
+    args += collector_flags(collector, profile["preset"], java_version, heap)
+    if profile["gc_logging"]:
+        args.append("-Xlog:gc" if java_version >= 9 else "-verbose:gc")
+    if profile["debug"]:
+        args += DEBUG_FLAGS
+    if profile["extra_args"]:
+        try:
+            args += shlex.split(profile["extra_args"])
+        except ValueError:
+            args += profile["extra_args"].split()
+    return args
+
+
+def describe(profile, instance_name):
+    """One line summary, e.g. "Auto: 4608 MB for 48 mods" """
+    profile = normalize(profile)
+    if profile["memory_mb"]:
+        return f"{profile['memory_mb']} MB"
+    mods = count_mods(instance_name)
+    return f"Auto: {auto_heap_mb(mods, system_memory_mb())} MB for {mods} mods"
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""In-process launch engine for vanilla and Fabric instances.
+
+The UI calls launch() directly. fabric.command and launch_vanilla.command are
+thin wrappers around the CLI at the bottom of this file. Everything up to the
+final Java exec (natives, launch plan, assets, arguments) happens in this one
+process, so there are no per-launch interpreters, temp scripts or java -version
+probes.
+"""
+import concurrent.futures
+import os
+import subprocess
+import sys
+import threading
+
+import app_cds
+import assets
+import jvm_profiles
+import launch_plan
+import natives
+from launch_plan import LaunchError
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+INSTANCES_DIR = os.path.join(GAME_DIR, "instances")
+ASSETS_DIR = os.path.join(GAME_DIR, "assets")
+
+# Same colour codes as the old shell helpers so the log viewer renders them unchanged
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+BLUE = "\033[0;34m"
+NC = "\033[0m"
+
+
+class Logger:
+    """[DEBUG]/[INFO]/[WARN]/[ERROR] helpers writing through a single callback"""
+
+    def __init__(self, log=print):
+        self.log = log
+        self._lock = threading.Lock()
+
+    def __call__(self, message):
+        # Natives and assets log from different threads
+        with self._lock:
+            self.log(message)
+
+    def debug(self, message):
+        self(f"{BLUE}[DEBUG]{NC} {message}")
+
+    def info(self, message):
+        self(f"{GREEN}[INFO]{NC} {message}")
+
+    def warn(self, message):
+        self(f"{YELLOW}[WARN]{NC} {message}")
+
+    def error(self, message):
+        self(f"{RED}[ERROR]{NC} {message}")
+
+
+def game_arguments(plan, username, uuid, access_token, game_dir):
+    return [
+        "--username", username,
+        "--version", plan["version_name"],
+        "--gameDir", game_dir,
+        "--assetsDir", ASSETS_DIR,
+        "--assetIndex", plan["asset_index"],
+        "--xuid", "0",
+        "--userType", "msa",
+        "--uuid", uuid,
+        "--accessToken", access_token,
+        "--width", "854",
+        "--height", "480",
+        "--versionType", "release",
+    ]
+
+
+def build_command(plan, username, uuid, access_token, game_dir, fabric=False, profile_args=()):
+    """Full java command line for a resolved plan"""
+    command = [plan["java"]] + plan["jvm_args"] + list(profile_args)
+    command += ["-cp", os.pathsep.join(plan["classpath"]), plan["main_class"]]
+    if fabric:
+        command += ["-DFabricMcEmu=", "net.minecraft.client.main.Main"]
+    return command + game_arguments(plan, username, uuid, access_token, game_dir)
+
+
+def prepare(instance_name, mc_version, fabric_version=None, java_path=None, log=print):
+    """Resolve natives, launch plan and assets for an instance. Returns the plan."""
+    log = log if isinstance(log, Logger) else Logger(log)
+    game_dir = os.path.join(INSTANCES_DIR, instance_name)
+    os.makedirs(game_dir, exist_ok=True)
+
+    log.info("Resolving launch plan...")
+    plan = launch_plan.get_plan(instance_name, mc_version, fabric_version, java_path or None, log=log.debug)
+    if plan.get("cached"):
+        log.info("Using cached launch plan")
+
+    # Natives are prepared on a separate thread while assets are verified
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="natives") as pool:
+        natives_future = pool.submit(
+            natives.ensure_natives, plan["java"], plan["version_dir"], plan["natives_json"], plan["natives_dir"], log
+        )
+
+        if fabric_version:
+            with open(os.path.join(game_dir, "classpath.txt"), "w") as f:
+                f.write(f"Classpath built with {len(plan['classpath'])} elements\n")
+                f.write(":".join(plan["classpath"]) + "\n")
+
+        if plan.get("assets_json"):
+            log.info("Processing game assets with parallel downloader...")
+            success, _ = assets.ensure_assets(plan["assets_json"], ASSETS_DIR, log=log.debug)
+            if success:
+                log.info(f"Assets processed successfully with index: {plan['asset_index']}")
+            else:
+                log.warn("Asset download failed - game may have missing textures/sounds")
+        else:
+            log.warn("No inherited version found, using legacy asset index")
+
+        try:
+            natives_future.result()
+        except natives.NativesError as e:
+            raise LaunchError(str(e))
+
+    log.info("Launch configuration summary:")
+    log.info(f"  Main class: {plan['main_class']}")
+    log.info(f"  Asset index: {plan['asset_index']}")
+    log.info(f"  Classpath elements: {len(plan['classpath'])}")
+    log.info(f"  Java command: {plan['java']}")
+    log.info(f"  Java version: {plan['java_version']}")
+    return plan
+
+
+def launch(instance_name, mc_version, username, uuid, access_token, fabric_version=None, java_path=None,
+           log=print, jvm_profile=None, **popen_kwargs):
+    """Prepare an instance and start Java once. Returns the Popen of the game process."""
+    log = log if isinstance(log, Logger) else Logger(log)
+    plan = prepare(instance_name, mc_version, fabric_version, java_path, log)
+    game_dir = os.path.join(INSTANCES_DIR, instance_name)
+    profile_args = jvm_profiles.jvm_args(jvm_profile, plan["java_version"], instance_name, plan["java"])
+    if jvm_profiles.normalize(jvm_profile)["class_data_sharing"]:
+        profile_args += app_cds.cds_args(plan, instance_name, log.info)
+    log.info(f"JVM profile: {' '.join(profile_args)}")
+    command = build_command(plan, username, uuid, access_token, game_dir, fabric=bool(fabric_version),
+                            profile_args=profile_args)
+
+    log.info("Launching Minecraft with Fabric..." if fabric_version else "Launching Minecraft...")
+    process = subprocess.Popen(command, cwd=game_dir, **popen_kwargs)
+    log.info(f"Launched Minecraft with PID {process.pid}")
+    return process
+
+
+def main(argv):
+    """CLI used by the launch scripts:
+    launch_engine.py vanilla USERNAME UUID MC_VERSION ACCESS_TOKEN INSTANCE_DIR [JAVA_PATH]
+    launch_engine.py fabric USERNAME UUID MC_VERSION FABRIC_VERSION ACCESS_TOKEN INSTANCE_DIR [JAVA_PATH]
+    """
+    log = Logger(lambda line: print(line, flush=True))
+    if len(argv) >= 6 and argv[0] == "vanilla" and all(argv[1:6]):
+        username, uuid, mc_version, access_token, instance_name = argv[1:6]
+        fabric_version = None
+        java_path = argv[6] if len(argv) > 6 else None
+    elif len(argv) >= 7 and argv[0] == "fabric" and all(argv[1:7]):
+        username, uuid, mc_version, fabric_version, access_token, instance_name = argv[1:7]
+        java_path = argv[7] if len(argv) > 7 else None
+    else:
+        log.error("Missing required arguments")
+        print(main.__doc__, file=sys.stderr)
+        return 1
+
+    try:
+        process = launch(instance_name, mc_version, username, uuid, access_token, fabric_version, java_path, log=log)
+    except LaunchError as e:
+        log.error(str(e))
+        return 1
+    # The launcher UI supervises its own games; the pid file is for kill.command
+    with open(os.path.join(INSTANCES_DIR, instance_name, "java.pid"), "w") as f:
+        f.write(f"{process.pid}\n")
+    log.info("Process running in background - check logs for any issues")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
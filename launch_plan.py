@@ -0,0 +1,331 @@
+"""Resolved, cached launch plans for vanilla and Fabric instances.
+
+A plan holds everything that used to be re-derived on every start:
+classpath, main class, asset index, natives directory, JVM arguments and the
+Java binary. Plans are stored per instance, version and loader, and are keyed
+by the hashes of the version JSONs they were built from. A warm launch only has
+to hash those JSONs and stat the classpath before it can exec Java.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import libraries
+import natives
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+LIBRARIES_DIR = os.path.join(GAME_DIR, "libraries")
+VERSIONS_DIR = os.path.join(GAME_DIR, "versions")
+PLAN_DIR = os.path.join(GAME_DIR, ".cache", "launch_plans")
+
+# Bump whenever the plan layout or the way it is built changes
+PLAN_FORMAT = 5
+
+KNOT_CLIENT = "net.fabricmc.loader.impl.launch.knot.KnotClient"
+JAVA_LOCATIONS = [
+    "/usr/bin/java",
+    "/Library/Internet Plug-Ins/JavaAppletPlugin.plugin/Contents/Home/bin/java",
+]
+
+
+class LaunchError(Exception):
+    """Raised when an instance cannot be prepared for launch"""
+
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def plan_path(instance_name, version_name, loader):
+    return os.path.join(PLAN_DIR, instance_name, f"{version_name}-{loader}.json")
+
+
+def fabric_json_paths(mc_version, fabric_version):
+    version_name = f"fabric-loader-{fabric_version}-{mc_version}"
+    version_dir = os.path.join(VERSIONS_DIR, version_name)
+    return (
+        version_name,
+        version_dir,
+        os.path.join(version_dir, f"fabric-loader-{fabric_version}.json"),
+        os.path.join(version_dir, f"{version_name}.json"),
+    )
+
+
+def inherited_json_path(version_json_path):
+    """Path of the version JSON named by inheritsFrom, or None"""
+    try:
+        inherits = read_json(version_json_path).get("inheritsFrom", "")
+    except (OSError, ValueError):
+        return None
+    if not inherits:
+        return None
+    return os.path.join(VERSIONS_DIR, inherits, f"{inherits}.json")
+
+
+def plan_key(json_paths, java_path):
+    """Key a plan on its input JSONs and the Java path it was asked to use"""
+    hasher = hashlib.sha1(f"{PLAN_FORMAT}:{java_path or ''}".encode())
+    for path in json_paths:
+        hasher.update(f"|{path}={file_digest(path)}".encode())
+    return hasher.hexdigest()
+
+
+def find_java(java_path, min_version, log=print):
+    """Locate a Java binary the same way the launch scripts used to"""
+    if java_path:
+        if not os.access(java_path, os.X_OK):
+            raise LaunchError(f"Provided JAVA_PATH is invalid or Java binary not found at: {java_path}")
+        log(f"Using provided Java path: {java_path}")
+        return java_path
+
+    if os.access("/usr/libexec/java_home", os.X_OK):
+        for wanted in ("21", f"{min_version}+"):
+            result = subprocess.run(["/usr/libexec/java_home", "-v", wanted], capture_output=True, text=True)
+            if result.returncode == 0 and result.stdout.strip():
+                java_home = result.stdout.strip()
+                log(f"Found Java {wanted} via java_home: {java_home}")
+                return os.path.join(java_home, "bin", "java")
+
+    locations = list(JAVA_LOCATIONS)
+    if os.environ.get("JAVA_HOME"):
+        locations.append(os.path.join(os.environ["JAVA_HOME"], "bin", "java"))
+    for location in locations:
+        if os.access(location, os.X_OK):
+            log(f"Found Java at: {location}")
+            return location
+
+    on_path = shutil.which("java")
+    if on_path:
+        log("Using Java from PATH")
+        return on_path
+
+    raise LaunchError(f"Java {min_version} or higher installation not found. Please provide a valid JAVA_PATH.")
+
+
+def java_major_version(java_cmd, log=print):
+    """Run java -version once and return the major version number"""
+    result = subprocess.run([java_cmd, "-version"], capture_output=True, text=True)
+    output = result.stderr or result.stdout
+    match = re.search(r'version "(\d+)(?:\.(\d+))?', output)
+    if not match:
+        raise LaunchError(f"Could not determine Java version of {java_cmd}")
+    log(f"Java version: {output.splitlines()[0]}")
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        major = int(match.group(2))
+    return major
+
+
+def java_stamp(java_cmd):
+    """Size and mtime of the resolved Java binary, so upgrades invalidate the plan"""
+    try:
+        st = os.stat(os.path.realpath(java_cmd))
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def resolve_classpath(libs, log=print):
+    """Deduplicate libraries on their Maven coordinates and fetch the missing ones in one batch"""
+    libs = libraries.deduplicate(libs)
+    missing = [lib for lib in libs if not os.path.isabs(lib.path) and not os.path.isfile(os.path.join(LIBRARIES_DIR, lib.path))]
+    failed = set(libraries.fetch_missing(missing, log))
+
+    classpath = []
+    for library in libs:
+        full_path = os.path.join(LIBRARIES_DIR, library.path)
+        if library in failed or not os.path.isfile(full_path):
+            if library.required:
+                raise LaunchError(f"Could not download library {library.coordinate or library.path}")
+            # Continue anyway, some libraries might be optional
+            log(f"Missing library: {library.path}")
+            continue
+        classpath.append(full_path)
+    return classpath
+
+
+def base_jvm_args(natives_dir, java_version, brand):
+    args = [
+        "-XstartOnFirstThread",
+    ]
+    # Heap and collector flags come from the instance's JVM profile at launch time
+    if java_version >= 9:
+        args += [
+            "--add-exports", "java.base/sun.security.util=ALL-UNNAMED",
+            "--add-opens", "java.base/java.util.jar=ALL-UNNAMED",
+        ]
+    args += [
+        f"-Djava.library.path={natives_dir}",
+        f"-Djna.tmpdir={natives_dir}",
+        f"-Dorg.lwjgl.system.SharedLibraryExtractPath={natives_dir}",
+        f"-Dio.netty.native.workdir={natives_dir}",
+        f"-Dminecraft.launcher.brand={brand}",
+        "-Dminecraft.launcher.version=1.0",
+    ]
+    return args
+
+
+def resolve_java(java_path, min_version, log=print):
+    java_cmd = find_java(java_path, min_version, log)
+    java_version = java_major_version(java_cmd, log)
+    if java_version < min_version:
+        raise LaunchError(f"Java version {java_version} is less than required minimum version {min_version}")
+    return java_cmd, java_version
+
+
+def build_vanilla_plan(instance_name, mc_version, java_path=None, log=print):
+    version_dir = os.path.join(VERSIONS_DIR, mc_version)
+    version_json = os.path.join(version_dir, f"{mc_version}.json")
+    if not os.path.isfile(version_json):
+        raise LaunchError(f"Version JSON not found: {version_json}")
+    data = read_json(version_json)
+
+    client_jar = os.path.join(version_dir, f"{mc_version}.jar")
+    if not os.path.isfile(client_jar):
+        raise LaunchError(f"Main Minecraft JAR not found at: {client_jar}")
+
+    classpath = resolve_classpath(libraries.version_libraries(data) + [libraries.Library(client_jar)], log)
+
+    main_class = data.get("mainClass")
+    if not main_class:
+        raise LaunchError("Could not determine main class from version JSON")
+
+    min_java = data.get("javaVersion", {}).get("majorVersion", 8)
+    java_cmd, java_version = resolve_java(java_path, min_java, log)
+    natives_dir = natives.natives_dir_for(version_json)
+
+    return {
+        "version_name": mc_version,
+        "version_dir": version_dir,
+        "main_class": main_class,
+        "classpath": classpath,
+        "asset_index": data.get("assets", "legacy"),
+        "assets_json": version_json,
+        "natives_json": version_json,
+        "natives_dir": natives_dir,
+        "java": java_cmd,
+        "java_version": java_version,
+        "jvm_args": base_jvm_args(natives_dir, java_version, "ReallyBadLauncher"),
+    }, [version_json]
+
+
+def build_fabric_plan(instance_name, mc_version, fabric_version, java_path=None, log=print):
+    version_name, version_dir, fabric_json, original_json = fabric_json_paths(mc_version, fabric_version)
+    try:
+        data = read_json(original_json)
+    except FileNotFoundError:
+        raise LaunchError(f"Fabric JSON file not found at: {original_json}")
+    except ValueError:
+        raise LaunchError(f"Invalid JSON in Fabric file: {original_json}")
+
+    libs = []
+    inherits_json = inherited_json_path(original_json)
+    asset_index = "legacy"
+    if inherits_json:
+        if not os.path.isfile(inherits_json):
+            raise LaunchError(f"Inherited version JSON not found at {inherits_json}")
+        inherited = read_json(inherits_json)
+        libs += libraries.version_libraries(inherited)
+        client_jar = os.path.join(os.path.dirname(inherits_json), os.path.basename(inherits_json)[:-5] + ".jar")
+        libs.append(libraries.Library(client_jar, required=False))
+        asset_index = inherited.get("assetIndex", {}).get("id", inherited.get("assets", "legacy"))
+    else:
+        log("No inheritsFrom found; skipping vanilla base libraries")
+
+    libs += libraries.version_libraries(data, required=False)
+    loader = libraries.MavenCoordinate("net.fabricmc", "fabric-loader", fabric_version)
+    libs.append(libraries.Library(loader.path, loader))
+    classpath = resolve_classpath(libs, log)
+
+    try:
+        fabric_data = read_json(fabric_json)
+    except (OSError, ValueError):
+        fabric_data = {}
+    main_class = fabric_data.get("mainClass", {}).get("client", KNOT_CLIENT)
+    min_java = fabric_data.get("min_java_version", 8)
+
+    java_cmd, java_version = resolve_java(java_path, min_java, log)
+    natives_dir = natives.natives_dir_for(inherits_json or original_json)
+    jvm_args = base_jvm_args(natives_dir, java_version, "Modrinth") + [
+        f"-Dmixin.java.compatibilityLevel=JAVA_{java_version}",
+        "-Dmixin.env.disableCompatibilityLevel=true",
+    ]
+
+    return {
+        "version_name": version_name,
+        "version_dir": version_dir,
+        "main_class": main_class,
+        "classpath": classpath,
+        "asset_index": asset_index,
+        "assets_json": inherits_json,
+        "natives_json": inherits_json or original_json,
+        "natives_dir": natives_dir,
+        "java": java_cmd,
+        "java_version": java_version,
+        "jvm_args": jvm_args,
+    }, [p for p in (original_json, fabric_json, inherits_json) if p]
+
+
+def load_plan(path, key):
+    """Return the stored plan if it matches the key and its files are still on disk"""
+    try:
+        plan = read_json(path)
+    except (OSError, ValueError):
+        return None
+    if plan.get("key") != key or plan.get("java_stamp") != java_stamp(plan.get("java", "")):
+        return None
+    for entry in plan.get("classpath", []):
+        if not os.path.isfile(entry):
+            return None
+    return plan
+
+
+def save_plan(path, plan):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_plan(instance_name, mc_version, fabric_version=None, java_path=None, log=print):
+    """Return the launch plan for an instance, rebuilding it only when its inputs changed"""
+    if fabric_version:
+        version_name, _, fabric_json, original_json = fabric_json_paths(mc_version, fabric_version)
+        inputs = [p for p in (original_json, fabric_json, inherited_json_path(original_json)) if p]
+        loader = "fabric"
+    else:
+        version_name = mc_version
+        inputs = [os.path.join(VERSIONS_DIR, mc_version, f"{mc_version}.json")]
+        loader = "vanilla"
+
+    path = plan_path(instance_name, version_name, loader)
+    key = plan_key(inputs, java_path)
+    plan = load_plan(path, key)
+    if plan:
+        plan["cached"] = True
+        return plan
+
+    log(f"Building launch plan for {instance_name} ({version_name})")
+    if fabric_version:
+        plan, inputs = build_fabric_plan(instance_name, mc_version, fabric_version, java_path, log)
+    else:
+        plan, inputs = build_vanilla_plan(instance_name, mc_version, java_path, log)
+
+    plan["key"] = plan_key(inputs, java_path)
+    plan["java_stamp"] = java_stamp(plan["java"])
+    save_plan(path, plan)
+    plan["cached"] = False
+    return plan
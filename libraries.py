@@ -0,0 +1,251 @@
+"""Library resolution for launch plans.
+
+Libraries are identified by their parsed Maven coordinates rather than by
+guessing from jar filenames. Deduplication is a single pass over a dict keyed
+by group:artifact:classifier that keeps the newest version in first-seen order.
+
+Missing libraries are fetched in one concurrent batch. Each one tries the URL
+or repository from its own JSON entry first and then the known repositories.
+Repositories that answered 404 for a path are remembered for MISS_TTL, so
+later launches skip them.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from natives import rules_allow
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+LIBRARIES_DIR = os.path.join(GAME_DIR, "libraries")
+MISS_CACHE_PATH = os.path.join(GAME_DIR, ".cache", "library_misses.json")
+MISS_TTL = 24 * 60 * 60
+
+LIBRARY_REPOS = [
+    "https://libraries.minecraft.net",
+    "https://repo1.maven.org/maven2",
+    "https://maven.fabricmc.net",
+]
+
+# Qualifier ordering loosely following Maven's ComparableVersion
+_QUALIFIERS = {
+    "alpha": 0, "a": 0,
+    "beta": 1, "b": 1,
+    "milestone": 2, "m": 2,
+    "rc": 3, "cr": 3,
+    "snapshot": 4,
+    "": 5, "ga": 5, "final": 5, "release": 5,
+    "sp": 6,
+}
+_RELEASE = (1, 5, "")
+_TOKEN = re.compile(r"\d+|[a-zA-Z]+")
+
+
+def version_key(version):
+    """Normalised tokens of a Maven version string, see compare_versions"""
+    tokens = []
+    for token in _TOKEN.findall(version or ""):
+        if token.isdigit():
+            tokens.append((2, int(token), ""))
+        else:
+            lowered = token.lower()
+            rank = _QUALIFIERS.get(lowered, 7)
+            # Zeros before a qualifier carry no meaning: 1.0-beta is 1-beta
+            while tokens and tokens[-1] == (2, 0, ""):
+                tokens.pop()
+            tokens.append((1, rank, "" if rank == 5 else lowered))
+    while tokens and tokens[-1] in ((2, 0, ""), _RELEASE):
+        tokens.pop()
+    return tuple(tokens)
+
+
+def compare_versions(a, b):
+    """Return -1, 0 or 1 comparing two Maven version strings"""
+    ka, kb = version_key(a), version_key(b)
+    # Pad the shorter key with the release marker so 1.0 < 1.0.1 and 1.0-rc1 < 1.0
+    length = max(len(ka), len(kb))
+    ka += (_RELEASE,) * (length - len(ka))
+    kb += (_RELEASE,) * (length - len(kb))
+    return (ka > kb) - (ka < kb)
+
+
+class MavenCoordinate:
+    """group:artifact:version[:classifier][@extension]"""
+
+    def __init__(self, group, artifact, version, classifier=None, extension="jar"):
+        self.group = group
+        self.artifact = artifact
+        self.version = version
+        self.classifier = classifier
+        self.extension = extension
+
+    @classmethod
+    def parse(cls, name):
+        """Parse a library name, returning None if it is not a Maven coordinate"""
+        extension = "jar"
+        if "@" in name:
+            name, extension = name.rsplit("@", 1)
+        parts = name.split(":")
+        if len(parts) == 3:
+            return cls(parts[0], parts[1], parts[2], extension=extension)
+        if len(parts) == 4:
+            return cls(parts[0], parts[1], parts[2], parts[3], extension)
+        return None
+
+    @property
+    def key(self):
+        return (self.group, self.artifact, self.classifier)
+
+    @property
+    def path(self):
+        classifier = f"-{self.classifier}" if self.classifier else ""
+        return (f"{self.group.replace('.', '/')}/{self.artifact}/{self.version}/"
+                f"{self.artifact}-{self.version}{classifier}.{self.extension}")
+
+    def __str__(self):
+        classifier = f":{self.classifier}" if self.classifier else ""
+        return f"{self.group}:{self.artifact}:{self.version}{classifier}"
+
+
+class Library:
+    """One classpath entry resolved from a version JSON"""
+
+    def __init__(self, path, coordinate=None, url=None, sha1=None, size=None, repository=None, required=True):
+        self.path = path
+        self.coordinate = coordinate
+        self.url = url
+        self.sha1 = sha1
+        self.size = size
+        self.repository = repository
+        self.required = required
+
+    def __repr__(self):
+        return f"Library({self.coordinate or self.path})"
+
+
+def version_libraries(version_data, required=True):
+    """Libraries of a version JSON that apply to this platform"""
+    libraries = []
+    for lib in version_data.get("libraries", []):
+        if not rules_allow(lib.get("rules")):
+            continue
+        coordinate = MavenCoordinate.parse(lib.get("name", ""))
+
+        if "downloads" in lib:
+            # Legacy natives-only entries have classifiers but no artifact
+            artifact = lib["downloads"].get("artifact")
+            if not artifact or not artifact.get("path"):
+                continue
+            libraries.append(Library(artifact["path"], coordinate, artifact.get("url"), artifact.get("sha1"),
+                                     artifact.get("size"), required=required))
+        elif coordinate:
+            libraries.append(Library(coordinate.path, coordinate, sha1=lib.get("sha1"), size=lib.get("size"),
+                                     repository=lib.get("url"), required=required))
+    return libraries
+
+
+def deduplicate(libraries):
+    """Keep the newest version of each group:artifact:classifier, in first-seen order"""
+    result = []
+    index = {}
+    for library in libraries:
+        coordinate = library.coordinate
+        if coordinate is None:
+            result.append(library)
+            continue
+        position = index.get(coordinate.key)
+        if position is None:
+            index[coordinate.key] = len(result)
+            result.append(library)
+        elif compare_versions(coordinate.version, result[position].coordinate.version) > 0:
+            result[position] = library
+    return result
+
+
+class MissCache:
+    """Persistent (repository, path) -> time of the last 404"""
+
+    def __init__(self, path=MISS_CACHE_PATH, ttl=MISS_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def contains(self, repo, lib_path):
+        seen = self._entries.get(repo, {}).get(lib_path)
+        return seen is not None and time.time() - seen < self.ttl
+
+    def add(self, repo, lib_path):
+        with self._lock:
+            self._entries.setdefault(repo, {})[lib_path] = time.time()
+
+    def save(self):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save library miss cache: {e}")
+
+
+def candidate_urls(library, misses):
+    """(repository, url) pairs to try for a library, its own source first"""
+    candidates = []
+    if library.url:
+        candidates.append((None, library.url))
+    repos = [library.repository.rstrip("/")] if library.repository else []
+    repos += [repo for repo in LIBRARY_REPOS if repo not in repos]
+    for repo in repos:
+        if not misses.contains(repo, library.path):
+            candidates.append((repo, f"{repo}/{library.path}"))
+    # If every repository is remembered as missing, try them all again anyway
+    return candidates or [(repo, f"{repo}/{library.path}") for repo in repos]
+
+
+def is_not_found(error):
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 404
+
+
+def fetch_missing(libs, log=print, priority=None):
+    """Download libraries concurrently, verifying sha1 where known. Returns the libraries that failed."""
+    if not libs:
+        return []
+
+    from downloader import PRIORITY_LAUNCH, DownloadTask, get_engine
+
+    if priority is None:
+        priority = PRIORITY_LAUNCH
+
+    misses = MissCache()
+    tasks = {}
+    sources = {}
+    for library in libs:
+        candidates = candidate_urls(library, misses)
+        urls = [url for _, url in candidates]
+        task = DownloadTask(urls[0], os.path.join(LIBRARIES_DIR, library.path), sha1=library.sha1,
+                            size=library.size, mirrors=urls[1:])
+        tasks[task] = library
+        sources[task] = dict((url, repo) for repo, url in candidates)
+
+    log(f"Downloading {len(tasks)} missing libraries...")
+    _, failed = get_engine().download_all(list(tasks), priority=priority)
+
+    for task, library in tasks.items():
+        for url, error in task.errors:
+            repo = sources[task].get(url)
+            if repo and is_not_found(error):
+                misses.add(repo, library.path)
+    misses.save()
+
+    for task, error in failed:
+        log(f"Failed to download {tasks[task].coordinate or tasks[task].path}: {error}")
+    return [tasks[task] for task, _ in failed]
@@ -0,0 +1,292 @@
+"""Per-instance capture of launch output.
+
+Every launch writes the launcher's and the game's output to a session log in
+``instances/<name>/launcher_logs``. A session is stored as two files:
+
+* ``<session>.logz``: lines grouped into blocks of up to BLOCK_LINES lines or
+  BLOCK_BYTES bytes. Each block is zlib-compressed on its own.
+* ``<session>.idx``: one JSON line per block. It holds the block's offset and
+  compressed length, its first line number and line count, the log levels
+  present in it, and the lines that start a stack trace or crash report.
+
+A SessionReader only decompresses the blocks it is asked for. The log view
+can therefore scroll through a 200 MB session without loading it. A search
+skips every block whose levels do not match the filter, and the stack
+traces are listed straight from the index. Only the newest MAX_SESSIONS
+sessions of an instance are kept.
+"""
+import collections
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import log_format
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+INSTANCES_DIR = os.path.join(GAME_DIR, "instances")
+LOGS_DIRNAME = "launcher_logs"
+LOG_SUFFIX = ".logz"
+INDEX_SUFFIX = ".idx"
+
+BLOCK_LINES = 2048
+BLOCK_BYTES = 256 * 1024
+# A block that has been open this long is written even if it is not full
+FLUSH_INTERVAL = 2.0
+MAX_SESSIONS = 20
+# Decompressed blocks a reader keeps around
+READER_CACHE_BLOCKS = 16
+
+LEVELS = ("FATAL", "ERROR", "WARN", "INFO", "DEBUG", "TRACE")
+LEVEL_BITS = {level: 1 << i for i, level in enumerate(LEVELS)}
+LEVEL_PATTERN = re.compile(r'\b(FATAL|ERROR|WARN|INFO|DEBUG|TRACE)\b')
+TRACE_START_PATTERN = re.compile(
+    r'^(?:Exception in thread |Caused by: |---- Minecraft Crash Report ----|'
+    r'[\w$.]+(?:Exception|Error)(?::|$))')
+TRACE_LINE_PATTERN = re.compile(r'^\s+(?:at |\.\.\. \d+ more)')
+
+
+def logs_dir(instance_name):
+    return os.path.join(INSTANCES_DIR, instance_name, LOGS_DIRNAME)
+
+
+def line_level(line, previous=None):
+    """Log level of a line. Lines without one, such as stack frames, keep the previous line's level."""
+    match = LEVEL_PATTERN.search(log_format.strip(line[:120]))
+    return match.group(1) if match else previous
+
+
+def level_mask(levels):
+    mask = 0
+    for level in levels:
+        mask |= LEVEL_BITS.get(level, 0)
+    return mask
+
+
+def list_sessions(instance_name):
+    """Session ids of an instance, newest first"""
+    try:
+        names = os.listdir(logs_dir(instance_name))
+    except OSError:
+        return []
+    return sorted((n[:-len(LOG_SUFFIX)] for n in names if n.endswith(LOG_SUFFIX)), reverse=True)
+
+
+def prune_sessions(instance_name, keep=MAX_SESSIONS):
+    directory = logs_dir(instance_name)
+    for session_id in list_sessions(instance_name)[keep:]:
+        for suffix in (LOG_SUFFIX, INDEX_SUFFIX):
+            try:
+                os.remove(os.path.join(directory, session_id + suffix))
+            except OSError:
+                pass
+
+
+class LogSession:
+    """Writer for one launch's log. append() may be called from any thread."""
+
+    def __init__(self, instance_name):
+        self.instance_name = instance_name
+        directory = logs_dir(instance_name)
+        os.makedirs(directory, exist_ok=True)
+        self.session_id = time.strftime("%Y-%m-%d_%H-%M-%S")
+        base = os.path.join(directory, self.session_id)
+        suffix = 1
+        while os.path.exists(base + LOG_SUFFIX):
+            suffix += 1
+            base = os.path.join(directory, f"{self.session_id}-{suffix}")
+        self.session_id = os.path.basename(base)
+        self._log_file = open(base + LOG_SUFFIX, "wb")
+        self._index_file = open(base + INDEX_SUFFIX, "w")
+        self._lock = threading.Lock()
+        self._lines = []
+        self._size = 0
+        self._levels = 0
+        self._markers = []
+        self._level = None
+        self._start_level = None
+        self._in_trace = False
+        self._line_count = 0
+        self._opened = time.monotonic()
+        self.closed = False
+        prune_sessions(instance_name)
+
+    def append(self, line):
+        line = line.rstrip("\r\n")
+        with self._lock:
+            if self.closed:
+                return
+            if not self._lines:
+                self._opened = time.monotonic()
+                self._start_level = self._level
+            self._level = line_level(line, self._level)
+            if self._level:
+                self._levels |= LEVEL_BITS[self._level]
+            plain = log_format.strip(line)
+            if TRACE_START_PATTERN.match(plain) and not self._in_trace:
+                self._markers.append(self._line_count)
+            self._in_trace = bool(TRACE_START_PATTERN.match(plain) or TRACE_LINE_PATTERN.match(plain))
+            self._lines.append(line)
+            self._size += len(line) + 1
+            self._line_count += 1
+            if (len(self._lines) >= BLOCK_LINES or self._size >= BLOCK_BYTES
+                    or time.monotonic() - self._opened >= FLUSH_INTERVAL):
+                self._write_block()
+
+    def _write_block(self):
+        if not self._lines:
+            return
+        data = zlib.compress("\n".join(self._lines).encode("utf-8", "replace"), 6)
+        offset = self._log_file.tell()
+        self._log_file.write(data)
+        self._log_file.flush()
+        self._index_file.write(json.dumps({
+            "offset": offset,
+            "length": len(data),
+            "first_line": self._line_count - len(self._lines),
+            "lines": len(self._lines),
+            "levels": self._levels,
+            "start_level": self._start_level,
+            "markers": self._markers,
+        }) + "\n")
+        self._index_file.flush()
+        self._lines = []
+        self._size = 0
+        self._levels = 0
+        self._markers = []
+
+    def flush(self):
+        with self._lock:
+            if not self.closed:
+                self._write_block()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self._write_block()
+            self.closed = True
+            self._log_file.close()
+            self._index_file.close()
+
+
+class SessionReader:
+    """Random access to a saved session. Has the same read interface as log_view.LogBuffer."""
+
+    def __init__(self, instance_name, session_id):
+        self.instance_name = instance_name
+        self.session_id = session_id
+        base = os.path.join(logs_dir(instance_name), session_id)
+        self.log_path = base + LOG_SUFFIX
+        self.index_path = base + INDEX_SUFFIX
+        self.blocks = []
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Read the index again, picking up blocks written since (the session may still be running)"""
+        blocks = []
+        try:
+            with open(self.index_path, "r") as f:
+                for raw in f:
+                    try:
+                        blocks.append(json.loads(raw))
+                    except ValueError:
+                        # The last line may be half written
+                        break
+        except OSError:
+            pass
+        with self._lock:
+            self.blocks = blocks
+        self.total = len(self)
+
+    def __len__(self):
+        if not self.blocks:
+            return 0
+        last = self.blocks[-1]
+        return last["first_line"] + last["lines"]
+
+    def first_index(self):
+        return 0
+
+    def _block(self, number):
+        with self._lock:
+            lines = self._cache.get(number)
+            if lines is not None:
+                self._cache.move_to_end(number)
+                return lines
+            block = self.blocks[number]
+        with open(self.log_path, "rb") as f:
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+        lines = zlib.decompress(data).decode("utf-8", "replace").split("\n")
+        with self._lock:
+            self._cache[number] = lines
+            while len(self._cache) > READER_CACHE_BLOCKS:
+                self._cache.popitem(last=False)
+        return lines
+
+    def _block_for_line(self, line_number):
+        low, high = 0, len(self.blocks) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.blocks[middle]["first_line"] <= line_number:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def lines(self, first, count):
+        """Up to count lines starting at line number first"""
+        first = max(first, 0)
+        end = min(first + count, len(self))
+        result = []
+        if first >= end:
+            return result
+        number = self._block_for_line(first)
+        while first + len(result) < end and number < len(self.blocks):
+            block = self.blocks[number]
+            lines = self._block(number)
+            start = first + len(result) - block["first_line"]
+            result.extend(lines[start:start + end - first - len(result)])
+            number += 1
+        return result
+
+    def markers(self):
+        """Line numbers where a stack trace or crash report starts"""
+        return [line for block in self.blocks for line in block["markers"]]
+
+    def search(self, pattern=None, levels=None, limit=1000, cancel=None):
+        """Yield (line_number, line) of lines matching a regex and/or set of levels, in order"""
+        regex = re.compile(pattern) if pattern else None
+        block_regex = re.compile(pattern, re.MULTILINE) if pattern else None
+        mask = level_mask(levels) if levels else 0
+        found = 0
+        for number, block in enumerate(list(self.blocks)):
+            if cancel and cancel():
+                return
+            # A block whose lines carry none of the wanted levels is skipped without decompressing it
+            if mask and not block["levels"] & mask:
+                continue
+            lines = self._block(number)
+            plain_lines = lines
+            if regex:
+                plain = log_format.strip("\n".join(lines))
+                # Most blocks have no match at all, which one search over the whole block finds out
+                if not block_regex.search(plain):
+                    continue
+                plain_lines = plain.split("\n")
+            level = block["start_level"]
+            for offset, line in enumerate(lines):
+                level = line_level(line, level)
+                if mask and not LEVEL_BITS.get(level, 0) & mask:
+                    continue
+                if regex and not regex.search(plain_lines[offset]):
+                    continue
+                yield block["first_line"] + offset, line
+                found += 1
+                if found >= limit:
+                    return
@@ -0,0 +1,117 @@
+"""ANSI escape handling for game and launcher logs.
+
+``spans(line)`` turns a log line into a tuple of Span(text, color, bold),
+following SGR codes: reset, bold, the 8 and bright colors, 256-color and
+truecolor foregrounds. Colored level tags such as ``[INFO]`` are always bold,
+as the old HTML log view drew them. The log view paints these spans directly.
+
+Most lines have no escape codes at all, and those are returned without any
+parsing. For the others, everything up to the last escape code is parsed
+once and cached. That covers the colored ``[INFO]`` / ``[Render thread/INFO]``
+prefixes Log4j, Fabric and the launch scripts repeat on every line. The
+uncolored rest of the line is then added as a single span.
+"""
+import collections
+import functools
+import re
+
+ANSI_PATTERN = re.compile(r'\x1b\[([0-9;]*)m')
+LEVEL_TAG_PATTERN = re.compile(r'\[(?:[^\]]*/)?(?:TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\]')
+PREFIX_CACHE_SIZE = 4096
+
+# Foreground colors for 30-37 and 90-97
+BASE_COLORS = (
+    '#45475a', '#f38ba8', '#a6e3a1', '#f9e2af', '#89b4fa', '#f5c2e7', '#94e2d5', '#bac2de',
+)
+BRIGHT_COLORS = (
+    '#808080', '#FF6B6B', '#4ECDC4', '#FFE66D', '#6B73FF', '#FF6BFF', '#6BFFFF', '#FFFFFF',
+)
+
+Span = collections.namedtuple("Span", "text color bold")
+
+
+def _xterm_color(n):
+    """Hex color of an xterm 256-color index"""
+    if n < 8:
+        return BASE_COLORS[n]
+    if n < 16:
+        return BRIGHT_COLORS[n - 8]
+    if n < 232:
+        n -= 16
+        levels = [0 if v == 0 else 55 + v * 40 for v in (n // 36, n // 6 % 6, n % 6)]
+        return '#%02x%02x%02x' % tuple(levels)
+    gray = 8 + (n - 232) * 10
+    return '#%02x%02x%02x' % (gray, gray, gray)
+
+
+XTERM_COLORS = tuple(_xterm_color(n) for n in range(256))
+
+
+def apply_sgr(params, color, bold):
+    """The (color, bold) state after one SGR sequence such as "1;31" or "38;5;208" """
+    codes = [int(p) if p else 0 for p in params.split(";")] if params else [0]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            color, bold = None, False
+        elif code == 1:
+            bold = True
+        elif code == 22:
+            bold = False
+        elif 30 <= code <= 37:
+            color = BASE_COLORS[code - 30]
+        elif 90 <= code <= 97:
+            color = BRIGHT_COLORS[code - 90]
+        elif code == 39:
+            color = None
+        elif code in (38, 48) and i + 1 < len(codes):
+            # Extended colors; backgrounds are parsed only to skip their arguments
+            if codes[i + 1] == 5 and i + 2 < len(codes):
+                if code == 38:
+                    color = XTERM_COLORS[codes[i + 2] % 256]
+                i += 2
+            elif codes[i + 1] == 2 and i + 4 < len(codes):
+                if code == 38:
+                    color = '#%02x%02x%02x' % tuple(min(c, 255) for c in codes[i + 2:i + 5])
+                i += 4
+        i += 1
+    return color, bold
+
+
+def _span(text, color, bold):
+    return Span(text, color, bold or (color is not None and LEVEL_TAG_PATTERN.fullmatch(text) is not None))
+
+
+@functools.lru_cache(maxsize=PREFIX_CACHE_SIZE)
+def _parse(text):
+    """Spans of text and the (color, bold) state left at its end"""
+    result = []
+    color, bold = None, False
+    pos = 0
+    for match in ANSI_PATTERN.finditer(text):
+        if match.start() > pos:
+            result.append(_span(text[pos:match.start()], color, bold))
+        color, bold = apply_sgr(match.group(1), color, bold)
+        pos = match.end()
+    if pos < len(text):
+        result.append(_span(text[pos:], color, bold))
+    return tuple(result), color, bold
+
+
+def spans(line):
+    """Spans of one log line"""
+    if "\x1b" not in line:
+        return (Span(line, None, False),) if line else ()
+    # Parse (and cache) up to the last escape code; the rest is plain text in the final state
+    last = ANSI_PATTERN.match(line, line.rfind("\x1b"))
+    end = last.end() if last else len(line)
+    prefix_spans, color, bold = _parse(line[:end])
+    if end < len(line):
+        return prefix_spans + (_span(line[end:], color, bold),)
+    return prefix_spans
+
+
+def strip(line):
+    """A line without its escape codes"""
+    return ANSI_PATTERN.sub("", line) if "\x1b" in line else line
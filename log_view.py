@@ -0,0 +1,340 @@
+"""Game log viewer.
+
+Log lines go into a LogBuffer, a fixed-capacity ring buffer that any thread
+can append to without touching Qt. The LogView widget checks the buffer on a
+timer (every BATCH_INTERVAL ms), so lines arriving in a burst are rendered as
+one batch. Only the lines in the visible part of the view are formatted and
+painted, so the cost of a repaint does not depend on the size of the
+scrollback. Once the buffer is full, the oldest lines are dropped.
+
+LogBrowser opens the sessions saved by log_capture in the same view. It
+searches them on a background thread, so a session is never loaded into the
+widget as a whole.
+"""
+import re
+import threading
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter
+from PyQt5.QtWidgets import (QAbstractScrollArea, QComboBox, QDialog, QHBoxLayout, QLabel, QLineEdit,
+                             QListWidget, QListWidgetItem, QPushButton, QSplitter, QVBoxLayout)
+
+import log_capture
+import log_format
+
+DEFAULT_SCROLLBACK = 20000
+MIN_SCROLLBACK = 1000
+BATCH_INTERVAL = 50  # ms
+TEXT_MARGIN = 6
+SEARCH_LIMIT = 5000
+
+# Level filters offered by the log browser
+LEVEL_FILTERS = [
+    ("All levels", None),
+    ("Errors", ("FATAL", "ERROR")),
+    ("Warnings and errors", ("FATAL", "ERROR", "WARN")),
+    ("Info and above", ("FATAL", "ERROR", "WARN", "INFO")),
+]
+
+class LogBuffer:
+    """Thread-safe ring buffer holding the last `capacity` log lines"""
+
+    def __init__(self, capacity=DEFAULT_SCROLLBACK):
+        self._lock = threading.Lock()
+        self.capacity = max(int(capacity), 1)
+        self._lines = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+        # Lines appended since the buffer was created, used to spot new and dropped lines
+        self.total = 0
+
+    def append(self, line):
+        with self._lock:
+            if self._count < self.capacity:
+                self._lines[(self._start + self._count) % self.capacity] = line
+                self._count += 1
+            else:
+                self._lines[self._start] = line
+                self._start = (self._start + 1) % self.capacity
+            self.total += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def first_index(self):
+        """Absolute number of the oldest line still held"""
+        with self._lock:
+            return self.total - self._count
+
+    def lines(self, first, count):
+        """Up to count lines starting at position first (0 is the oldest line held)"""
+        with self._lock:
+            first = max(first, 0)
+            end = min(first + count, self._count)
+            return [self._lines[(self._start + i) % self.capacity] for i in range(first, end)]
+
+    def set_capacity(self, capacity):
+        """Resize the buffer, keeping the newest lines"""
+        capacity = max(int(capacity), 1)
+        with self._lock:
+            keep = min(self._count, capacity)
+            skip = self._count - keep
+            lines = [self._lines[(self._start + skip + i) % self.capacity] for i in range(keep)]
+            self.capacity = capacity
+            self._lines = lines + [None] * (capacity - keep)
+            self._start = 0
+            self._count = keep
+
+    def clear(self):
+        with self._lock:
+            self._lines = [None] * self.capacity
+            self._start = 0
+            self._count = 0
+
+
+class LogView(QAbstractScrollArea):
+    """Read-only view of a LogBuffer that paints only the visible lines"""
+
+    def __init__(self, buffer, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.text_color = QColor("#FFFFFF")
+        self.placeholder = ""
+        self._seen_total = buffer.total
+        self._first_index = buffer.first_index()
+        self._max_width = 0
+
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        self.setFont(font)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(BATCH_INTERVAL)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+        self._update_scrollbars()
+
+    def set_text_color(self, color):
+        self.text_color = QColor(color)
+        self.viewport().update()
+
+    def setPlaceholderText(self, text):
+        self.placeholder = text
+        self.viewport().update()
+
+    def _line_height(self):
+        return self.fontMetrics().lineSpacing()
+
+    def _visible_lines(self):
+        return max(self.viewport().height() // max(self._line_height(), 1), 1)
+
+    def _update_scrollbars(self):
+        bar = self.verticalScrollBar()
+        bar.setPageStep(self._visible_lines())
+        bar.setRange(0, max(len(self.buffer) - self._visible_lines(), 0))
+        hbar = self.horizontalScrollBar()
+        hbar.setPageStep(self.viewport().width())
+        hbar.setRange(0, max(self._max_width + 2 * TEXT_MARGIN - self.viewport().width(), 0))
+
+    def flush(self):
+        """Render the lines appended since the last batch"""
+        total = self.buffer.total
+        if total == self._seen_total or not self.isVisible():
+            return
+        bar = self.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum()
+        first_index = self.buffer.first_index()
+        dropped = first_index - self._first_index
+        self._seen_total = total
+        self._first_index = first_index
+        self._update_scrollbars()
+        if at_bottom:
+            bar.setValue(bar.maximum())
+        elif dropped:
+            # Keep the lines being read in place while old ones fall off the front
+            bar.setValue(bar.value() - dropped)
+        self.viewport().update()
+
+    def clear(self):
+        self.buffer.clear()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_buffer(self, buffer):
+        """Show another buffer, such as a log_capture.SessionReader"""
+        self.buffer = buffer
+        self._seen_total = -1
+        self._first_index = buffer.first_index()
+        self._max_width = 0
+        self._update_scrollbars()
+        self.verticalScrollBar().setValue(0)
+        self.viewport().update()
+
+    def scroll_to_line(self, line_number):
+        """Scroll so the given line (counted from the oldest line held) is near the top"""
+        self.verticalScrollBar().setValue(max(line_number - 2, 0))
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._seen_total = -1
+        self.flush()
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.fontMetrics()
+        line_height = self._line_height()
+        x0 = TEXT_MARGIN - self.horizontalScrollBar().value()
+
+        if not len(self.buffer):
+            if self.placeholder:
+                color = QColor(self.text_color)
+                color.setAlpha(128)
+                painter.setPen(color)
+                painter.drawText(TEXT_MARGIN, metrics.ascent() + TEXT_MARGIN, self.placeholder)
+            return
+
+        normal_font = self.font()
+        bold_font = QFont(normal_font)
+        bold_font.setBold(True)
+        bold_metrics = QFontMetrics(bold_font)
+
+        first = self.verticalScrollBar().value()
+        y = metrics.ascent()
+        max_width = self._max_width
+        for line in self.buffer.lines(first, self._visible_lines() + 1):
+            x = x0
+            for text, color, bold in log_format.spans(line):
+                painter.setFont(bold_font if bold else normal_font)
+                painter.setPen(QColor(color) if color else self.text_color)
+                painter.drawText(x, y, text)
+                x += (bold_metrics if bold else metrics).horizontalAdvance(text)
+            max_width = max(max_width, x - x0)
+            y += line_height
+        painter.end()
+
+        if max_width > self._max_width:
+            self._max_width = max_width
+            self._update_scrollbars()
+
+
+class LogBrowser(QDialog):
+    """Past launch sessions of an instance, with regex and level search"""
+
+    searchFinished = pyqtSignal(int, object)  # search generation, [(line_number, line)]
+
+    def __init__(self, instance_name, parent=None, stylesheet=None, text_color="#FFFFFF"):
+        super().__init__(parent)
+        self.instance_name = instance_name
+        self.reader = None
+        self._generation = 0
+        self.setWindowTitle(f"Logs - {instance_name}")
+        self.setMinimumSize(900, 600)
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.session_combo = QComboBox()
+        self.session_combo.currentTextChanged.connect(self.open_session)
+        controls.addWidget(QLabel("Session:"))
+        controls.addWidget(self.session_combo, stretch=1)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search (regular expression)...")
+        self.search_input.returnPressed.connect(self.search)
+        controls.addWidget(self.search_input, stretch=2)
+        self.level_combo = QComboBox()
+        for label, _ in LEVEL_FILTERS:
+            self.level_combo.addItem(label)
+        controls.addWidget(self.level_combo)
+        search_button = QPushButton("Search")
+        search_button.clicked.connect(self.search)
+        controls.addWidget(search_button)
+        traces_button = QPushButton("Stack Traces")
+        traces_button.clicked.connect(self.show_stack_traces)
+        controls.addWidget(traces_button)
+        layout.addLayout(controls)
+
+        splitter = QSplitter(Qt.Vertical)
+        self.view = LogView(LogBuffer(1))
+        self.view.set_text_color(text_color)
+        splitter.addWidget(self.view)
+        self.results = QListWidget()
+        self.results.itemClicked.connect(self.jump_to_result)
+        splitter.addWidget(self.results)
+        splitter.setSizes([450, 150])
+        layout.addWidget(splitter, stretch=1)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        if stylesheet:
+            self.setStyleSheet(stylesheet)
+        self.searchFinished.connect(self.show_results)
+        self.session_combo.addItems(log_capture.list_sessions(instance_name))
+        if not self.session_combo.count():
+            self.view.setPlaceholderText("No saved logs for this instance yet")
+
+    def open_session(self, session_id):
+        if not session_id:
+            return
+        self._generation += 1
+        self.reader = log_capture.SessionReader(self.instance_name, session_id)
+        self.view.set_buffer(self.reader)
+        self.results.clear()
+        self.status_label.setText(f"{len(self.reader)} lines")
+
+    def search(self):
+        if self.reader is None:
+            return
+        pattern = self.search_input.text()
+        levels = LEVEL_FILTERS[self.level_combo.currentIndex()][1]
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            self.status_label.setText(f"Invalid pattern: {e}")
+            return
+        self._generation += 1
+        generation = self._generation
+        reader = self.reader
+        reader.reload()
+        self.status_label.setText("Searching...")
+
+        def run():
+            cancel = lambda: generation != self._generation
+            try:
+                matches = list(reader.search(pattern, levels, limit=SEARCH_LIMIT, cancel=cancel))
+            except (OSError, ValueError) as e:
+                print(f"Log search failed: {e}")
+                matches = []
+            self.searchFinished.emit(generation, matches)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def show_stack_traces(self):
+        if self.reader is None:
+            return
+        self._generation += 1
+        self.reader.reload()
+        markers = self.reader.markers()
+        self.show_results(self._generation, [(n, self.reader.lines(n, 1)[0]) for n in markers[:SEARCH_LIMIT]])
+
+    def show_results(self, generation, matches):
+        if generation != self._generation:
+            return
+        self.results.clear()
+        for line_number, line in matches:
+            item = QListWidgetItem(f"{line_number + 1}: {log_format.strip(line)}")
+            item.setData(Qt.UserRole, line_number)
+            self.results.addItem(item)
+        more = " (limit reached)" if len(matches) >= SEARCH_LIMIT else ""
+        self.status_label.setText(f"{len(matches)} matches{more}")
+
+    def jump_to_result(self, item):
+        self.view.scroll_to_line(item.data(Qt.UserRole))
@@ -0,0 +1,152 @@
+"""Cache for game and loader metadata.
+
+Mojang's version manifest and the Fabric loader and game lists are kept under
+``.cache/meta`` and in memory. Within the TTL they are returned without any
+request, so the version pickers fill in immediately. After that they are
+revalidated with ETag / If-Modified-Since, so an unchanged manifest costs a
+304 rather than another full download. If the server cannot be reached, the
+last good copy is used.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+from downloader import get_engine
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+CACHE_DIR = os.path.join(GAME_DIR, ".cache", "meta")
+META_TIMEOUT = 15
+
+VERSION_MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+FABRIC_META_URL = "https://meta.fabricmc.net/v2"
+
+# How long metadata is used without asking the server again
+MANIFEST_TTL = 10 * 60
+FABRIC_LIST_TTL = 10 * 60
+# Profiles of a given loader and game version do not change
+FABRIC_PROFILE_TTL = 7 * 24 * 60 * 60
+
+
+class MetaCache:
+    """Conditional GETs of JSON documents, cached on disk and in memory"""
+
+    def __init__(self, directory=CACHE_DIR, timeout=META_TIMEOUT):
+        self.directory = directory
+        self.timeout = timeout
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._url_locks = {}
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _load(self, url):
+        with self._lock:
+            entry = self._memory.get(url)
+        if entry is not None:
+            return entry
+        try:
+            with open(self._path(url), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._memory[url] = entry
+        return entry
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._memory[url] = entry
+        path = self._path(url)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write metadata cache entry: {e}")
+
+    def cached(self, url):
+        """The last good copy of a document without any request, or None"""
+        entry = self._load(url)
+        return entry["body"] if entry is not None else None
+
+    def get(self, url, ttl):
+        """Return the JSON at url, from cache while fresh, revalidated after ttl, stale if offline"""
+        # One request per URL at a time, so callers racing on an expired entry share the result
+        with self._url_lock(url):
+            entry = self._load(url)
+            now = time.time()
+            if entry is not None and now - entry.get("fetched", 0) < ttl:
+                return entry["body"]
+
+            headers = {}
+            if entry is not None:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            try:
+                response = get_engine().session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304 and entry is not None:
+                    self._store(url, dict(entry, fetched=now))
+                    return entry["body"]
+                response.raise_for_status()
+                body = response.json()
+            except (requests.RequestException, ValueError):
+                if entry is not None:
+                    print(f"Metadata server unreachable, using cached copy of {url}")
+                    return entry["body"]
+                raise
+
+            self._store(url, {
+                "fetched": now,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body": body,
+            })
+            return body
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide metadata cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetaCache()
+        return _cache
+
+
+def version_manifest(ttl=MANIFEST_TTL):
+    return get_cache().get(VERSION_MANIFEST_URL, ttl)
+
+
+def minecraft_versions(ttl=MANIFEST_TTL):
+    """All Minecraft version ids, newest first"""
+    return [v["id"] for v in version_manifest(ttl).get("versions", [])]
+
+
+def fabric_loaders(ttl=FABRIC_LIST_TTL):
+    return get_cache().get(f"{FABRIC_META_URL}/versions/loader", ttl)
+
+
+def fabric_games(ttl=FABRIC_LIST_TTL):
+    return get_cache().get(f"{FABRIC_META_URL}/versions/game", ttl)
+
+
+def fabric_profile(mc_version, loader_version, ttl=FABRIC_PROFILE_TTL):
+    return get_cache().get(f"{FABRIC_META_URL}/versions/loader/{mc_version}/{loader_version}/profile/json", ttl)
@@ -0,0 +1,305 @@
+"""Shared Modrinth API client.
+
+All Modrinth calls go through one pooled ``requests`` session. GET responses
+are stored in an on-disk cache with a per-call TTL and least-recently-used
+eviction. Expired entries are revalidated with ETag / If-Modified-Since, and
+are still served if the API cannot be reached. Requests are paced by a token
+bucket that follows the ``X-Ratelimit-*`` headers Modrinth sends back.
+
+Bulk lookups (``versions``/``projects``) use the ``?ids=`` endpoints in
+concurrent chunks and store every item under its single-item cache key, so a
+later ``version(id)`` or ``project(id)`` is served from cache as well.
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = "https://api.modrinth.com/v2"
+USER_AGENT = "braydenwatt/A-Really-Bad-Fabric-Minecraft-Launcher"
+DEFAULT_TIMEOUT = 10
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+CACHE_DIR = os.path.join(GAME_DIR, ".cache", "modrinth")
+CACHE_MAX_ENTRIES = 2000
+
+# How long responses are served without asking Modrinth again
+SEARCH_TTL = 10 * 60
+PROJECT_TTL = 60 * 60
+PROJECT_VERSIONS_TTL = 30 * 60
+VERSION_TTL = 24 * 60 * 60
+
+# Modrinth's documented default limit
+DEFAULT_RATE_LIMIT = 300
+RATE_WINDOW = 60
+MAX_RETRIES = 3
+
+# Ids per ?ids= request, which keeps URLs well under common length limits
+BULK_CHUNK_SIZE = 100
+BULK_WORKERS = 4
+
+
+class TokenBucket:
+    """Request pacing that refills over RATE_WINDOW and follows the server's X-Ratelimit-* headers"""
+
+    def __init__(self, capacity=DEFAULT_RATE_LIMIT, window=RATE_WINDOW):
+        self.capacity = capacity
+        self.window = window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.window)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.window / self.capacity
+            time.sleep(wait)
+
+    def update(self, headers):
+        """Sync with the X-Ratelimit-Limit / -Remaining / -Reset headers of a response"""
+        try:
+            limit = int(headers["X-Ratelimit-Limit"])
+            remaining = int(headers["X-Ratelimit-Remaining"])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            self.capacity = max(limit, 1)
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+    def pause(self, seconds):
+        """Drain the bucket so nothing is sent for the given number of seconds"""
+        with self._lock:
+            self.tokens = -seconds * self.capacity / self.window
+            self.updated = time.monotonic()
+
+
+class ResponseCache:
+    """One JSON file per request under CACHE_DIR. A file's mtime is its last access, used for LRU eviction."""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write Modrinth cache entry: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % 50 == 1
+        if check:
+            self.evict()
+
+    def touch(self, key, fetched):
+        entry = self.get(key)
+        if entry is not None:
+            entry["fetched"] = fetched
+            self.put(key, entry)
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ModrinthClient:
+    """Cached, rate limited access to the Modrinth v2 API"""
+
+    def __init__(self, cache=None, bucket=None, timeout=DEFAULT_TIMEOUT):
+        self.cache = cache or ResponseCache()
+        self.bucket = bucket or TokenBucket()
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+
+    def _send(self, url, params, headers):
+        for attempt in range(MAX_RETRIES + 1):
+            self.bucket.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            self.bucket.update(response.headers)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+            try:
+                reset = float(response.headers.get("X-Ratelimit-Reset", 1))
+            except ValueError:
+                reset = 1
+            print(f"Modrinth rate limit reached, waiting {reset:.0f}s")
+            self.bucket.pause(reset)
+        return response
+
+    def _url(self, path):
+        return path if path.startswith("http") else f"{API_BASE}{path}"
+
+    def _key(self, path, params=None):
+        return requests.Request("GET", self._url(path), params=params).prepare().url
+
+    def get(self, path, params=None, ttl=PROJECT_TTL):
+        """GET an API path (or full URL) and return the decoded JSON, served from cache while fresh"""
+        url = self._url(path)
+        key = self._key(path, params)
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry is not None and now - entry.get("fetched", 0) < ttl:
+            return entry["body"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self._send(url, params, headers)
+        except requests.RequestException:
+            if entry is not None:
+                print(f"Modrinth unreachable, using cached response for {key}")
+                return entry["body"]
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, now)
+            return entry["body"]
+
+        response.raise_for_status()
+        body = response.json()
+        self.cache.put(key, {
+            "fetched": now,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        })
+        return body
+
+    def search(self, params):
+        return self.get("/search", params=params, ttl=SEARCH_TTL)
+
+    def project(self, project_id):
+        return self.get(f"/project/{project_id}", ttl=PROJECT_TTL)
+
+    def project_versions(self, project_id, params=None):
+        return self.get(f"/project/{project_id}/version", params=params, ttl=PROJECT_VERSIONS_TTL)
+
+    def version(self, version_id):
+        return self.get(f"/version/{version_id}", ttl=VERSION_TTL)
+
+    def _bulk(self, kind, ids, ttl):
+        """Resolve ids through /{kind}s?ids=, returning {id: item}. Ids Modrinth does not know are left out."""
+        results = {}
+        stale = {}
+        missing = []
+        now = time.time()
+        for item_id in dict.fromkeys(ids):
+            entry = self.cache.get(self._key(f"/{kind}/{item_id}"))
+            if entry is not None and now - entry.get("fetched", 0) < ttl:
+                results[item_id] = entry["body"]
+            else:
+                if entry is not None:
+                    stale[item_id] = entry["body"]
+                missing.append(item_id)
+
+        def fetch(chunk):
+            params = {"ids": json.dumps(chunk, separators=(",", ":"))}
+            response = self._send(f"{API_BASE}/{kind}s", params, {})
+            response.raise_for_status()
+            return response.json()
+
+        chunks = [missing[i:i + BULK_CHUNK_SIZE] for i in range(0, len(missing), BULK_CHUNK_SIZE)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=BULK_WORKERS) as pool:
+            futures = {pool.submit(fetch, chunk): chunk for chunk in chunks}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    items = future.result()
+                except requests.RequestException:
+                    chunk = futures[future]
+                    cached = [item_id for item_id in chunk if item_id in stale]
+                    if len(cached) < len(chunk):
+                        raise
+                    print(f"Modrinth unreachable, using cached {kind}s for {len(cached)} ids")
+                    results.update((item_id, stale[item_id]) for item_id in cached)
+                    continue
+                for item in items:
+                    results[item["id"]] = item
+                    self.cache.put(self._key(f"/{kind}/{item['id']}"), {
+                        "fetched": now, "etag": None, "last_modified": None, "body": item,
+                    })
+        return results
+
+    def versions(self, version_ids):
+        """Bulk version lookup, returns {version_id: version}"""
+        return self._bulk("version", version_ids, VERSION_TTL)
+
+    def projects(self, project_ids):
+        """Bulk project lookup, returns {project_id: project}"""
+        return self._bulk("project", project_ids, PROJECT_TTL)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide Modrinth client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ModrinthClient()
+        return _client
@@ -0,0 +1,372 @@
+"""Modrinth modpack (.mrpack) installation.
+
+Every entry of ``modrinth.index.json``'s ``files`` is downloaded through the
+shared download engine at once. Each download is verified against the pack's
+sha1/sha512 and ``fileSize``, and falls back across all of its ``downloads``
+mirrors. Progress is reported in bytes against the sum of the ``fileSize``
+values.
+
+Finished files are recorded in a journal inside the instance. If an install is
+interrupted, the next run skips those files without re-hashing them. The
+journal is removed once every file is in place.
+
+The pack archive itself is never unpacked. ``modrinth.index.json`` is read
+straight out of the zip, and only ``overrides/`` and ``client-overrides/`` are
+streamed into the instance. As the format specifies, overrides are applied
+once the downloads have finished, so they win over index files with the same
+path. The archive is deleted after a successful install.
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import shutil
+import time
+import zipfile
+
+import requests
+
+from downloader import PRIORITY_INSTALL, DownloadTask, get_engine
+from modrinth_client import get_client
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+PACK_DIR = os.path.join(GAME_DIR, ".cache", "mrpack")
+INDEX_NAME = "modrinth.index.json"
+# client-overrides comes last so it wins over overrides
+OVERRIDE_DIRS = ("overrides/", "client-overrides/")
+JOURNAL_NAME = ".mrpack_journal.json"
+JOURNAL_SAVE_INTERVAL = 1.0
+
+
+class MrpackError(Exception):
+    """Raised when a modpack cannot be installed"""
+
+
+def safe_path(instance_dir, rel_path):
+    """Resolve a pack path inside instance_dir, rejecting absolute paths and .. escapes"""
+    root = os.path.realpath(instance_dir)
+    target = os.path.realpath(os.path.join(root, rel_path))
+    if os.path.isabs(rel_path) or not target.startswith(root + os.sep):
+        raise MrpackError(f"Refusing to write outside the instance: {rel_path}")
+    return target
+
+
+def client_files(files):
+    """Pack file entries that apply to the client"""
+    return [f for f in files if f.get("env", {}).get("client") != "unsupported"]
+
+
+def file_task(entry, instance_dir):
+    """DownloadTask for one pack file entry, with the remaining downloads as mirrors"""
+    downloads = entry.get("downloads") or []
+    if not downloads:
+        raise MrpackError(f"No download URL for {entry.get('path')}")
+    hashes = entry.get("hashes", {})
+    return DownloadTask(downloads[0], safe_path(instance_dir, entry["path"]), sha1=hashes.get("sha1"),
+                        sha512=hashes.get("sha512"), size=entry.get("fileSize"), mirrors=downloads[1:])
+
+
+class Journal:
+    """Pack path -> sha1 of the files already installed, saved at most once per JOURNAL_SAVE_INTERVAL"""
+
+    def __init__(self, instance_dir):
+        self.path = os.path.join(instance_dir, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._saved = 0
+        try:
+            with open(self.path, "r") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def is_done(self, entry, dest):
+        """True if the journal has this exact file and it is still on disk with the right size"""
+        if self._entries.get(entry["path"]) != entry.get("hashes", {}).get("sha1"):
+            return False
+        try:
+            return entry.get("fileSize") is None or os.path.getsize(dest) == entry["fileSize"]
+        except OSError:
+            return False
+
+    def record(self, entry):
+        with self._lock:
+            self._entries[entry["path"]] = entry.get("hashes", {}).get("sha1")
+            due = time.monotonic() - self._saved >= JOURNAL_SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            self._saved = time.monotonic()
+            try:
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save modpack journal: {e}")
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def install_files(files, instance_dir, progress=None, cancel=None, log=print, priority=PRIORITY_INSTALL):
+    """Download the pack's files into instance_dir concurrently.
+
+    progress(done_bytes, total_bytes) is called from the download workers. The
+    bytes of files that fail count as done, so progress always ends at the total.
+    Returns the list of (entry, error) that failed.
+    """
+    os.makedirs(instance_dir, exist_ok=True)
+    entries = client_files(files)
+    total = sum(e.get("fileSize") or 0 for e in entries)
+    journal = Journal(instance_dir)
+
+    tasks = {}
+    failed = []
+    done_bytes = 0
+    resumed = 0
+    for entry in entries:
+        try:
+            task = file_task(entry, instance_dir)
+        except (MrpackError, KeyError) as e:
+            failed.append((entry, e))
+            done_bytes += entry.get("fileSize") or 0
+            continue
+        task.priority = priority
+        if journal.is_done(entry, task.dest):
+            done_bytes += entry.get("fileSize") or 0
+            resumed += 1
+        else:
+            tasks[task] = entry
+
+    lock = threading.Lock()
+    state = {"done": done_bytes}
+
+    def report(count):
+        with lock:
+            state["done"] += count
+            done = state["done"]
+        if progress:
+            progress(min(done, total), total)
+
+    if resumed:
+        log(f"Resuming modpack install, {resumed} files already in place")
+    if done_bytes:
+        report(0)
+
+    if tasks:
+        log(f"Downloading {len(tasks)} modpack files...")
+        engine = get_engine()
+        streamed = {task: 0 for task in tasks}
+
+        def task_progress(task):
+            def on_chunk(count):
+                streamed[task] += count
+                report(count)
+            return on_chunk
+
+        futures = {engine.submit(task, task_progress(task), cancel): task for task in tasks}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                task = futures[future]
+                entry = tasks[task]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append((entry, e))
+                else:
+                    journal.record(entry)
+                    log(f"Download complete: {entry['path']}")
+                # Settle the bytes a file did not stream: already valid on disk, or failed
+                report(max((entry.get("fileSize") or 0) - streamed[task], 0))
+        finally:
+            for future in futures:
+                future.cancel()
+            engine.save_index()
+    journal.save()
+
+    for entry, error in failed:
+        log(f"Failed to download {entry.get('path')}: {error}")
+    if not failed:
+        journal.remove()
+    return failed
+
+
+def download_pack(url, sha1=None, size=None):
+    """Download a pack archive into PACK_DIR and return its path"""
+    pack_path = os.path.join(PACK_DIR, hashlib.sha1(url.encode()).hexdigest() + ".mrpack")
+    try:
+        get_engine().fetch(DownloadTask(url, pack_path, sha1=sha1, size=size))
+    except Exception as e:
+        raise MrpackError(f"Failed to download modpack: {e}")
+    return pack_path
+
+
+def read_index(pack_path):
+    """Read modrinth.index.json straight out of the pack archive"""
+    try:
+        with zipfile.ZipFile(pack_path) as pack:
+            with pack.open(INDEX_NAME) as f:
+                return json.load(f)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise MrpackError(f"Invalid modpack {os.path.basename(pack_path)}: {e}")
+
+
+def override_members(pack):
+    """(member, path relative to the instance) for every override file, in apply order"""
+    members = []
+    for prefix in OVERRIDE_DIRS:
+        for member in pack.infolist():
+            if member.filename.startswith(prefix) and not member.is_dir():
+                members.append((member, member.filename[len(prefix):]))
+    return members
+
+
+def extract_overrides(pack_path, instance_dir, progress=None, cancel=None):
+    """Stream the override files into instance_dir. progress(count) gets uncompressed bytes."""
+    with zipfile.ZipFile(pack_path) as pack:
+        for member, rel_path in override_members(pack):
+            if cancel and cancel():
+                raise MrpackError("Modpack install cancelled")
+            try:
+                target = safe_path(instance_dir, rel_path)
+            except MrpackError:
+                target = None
+            if target:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with pack.open(member) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            if progress:
+                progress(member.file_size)
+
+
+def overrides_size(pack_path):
+    with zipfile.ZipFile(pack_path) as pack:
+        return sum(member.file_size for member, _ in override_members(pack))
+
+
+def install_pack(pack_path, instance_dir, progress=None, cancel=None, log=print, priority=PRIORITY_INSTALL):
+    """Install a downloaded pack: files, then overrides on top of them, then remove the archive.
+
+    progress(done_bytes, total_bytes) covers both downloads and extraction.
+    Returns the list of (entry, error) that failed.
+    """
+    index = read_index(pack_path)
+    files = index.get("files", [])
+    os.makedirs(instance_dir, exist_ok=True)
+
+    lock = threading.Lock()
+    state = {"extracted": 0, "downloaded": 0, "download_total": 0}
+    extract_total = overrides_size(pack_path)
+
+    def report():
+        if progress:
+            with lock:
+                done = state["extracted"] + state["downloaded"]
+                total = extract_total + state["download_total"]
+            progress(done, total)
+
+    def on_extract(count):
+        with lock:
+            state["extracted"] += count
+        report()
+
+    def on_download(done, total):
+        with lock:
+            state["downloaded"], state["download_total"] = done, total
+        report()
+
+    failed = install_files(files, instance_dir, on_download, cancel, log, priority)
+
+    log("Extracting modpack overrides...")
+    try:
+        extract_overrides(pack_path, instance_dir, on_extract, cancel)
+    except (OSError, MrpackError, zipfile.BadZipFile) as e:
+        log(f"Failed to extract modpack overrides: {e}")
+        failed.append(({"path": "overrides"}, e))
+
+    if not failed:
+        try:
+            os.remove(pack_path)
+        except OSError:
+            pass
+    return failed
+
+
+def fetch_icon(url, instance_name):
+    """Download a modpack icon into .icons and return the instance image data, or None"""
+    ext = os.path.splitext(url.split("?")[0])[1] or ".png"
+    saved_path = os.path.join(".icons", instance_name.lower().replace(" ", "_") + ext)
+    try:
+        get_engine().fetch(DownloadTask(url, saved_path), skip_existing=False)
+    except Exception as e:
+        print(f"Failed to download modpack icon: {e}")
+        return None
+    return {"original_path": url, "saved_path": saved_path}
+
+
+def dependency_metadata(dependencies, log=print):
+    """Mod list entries for a pack version's dependencies, resolved with two bulk lookups"""
+    version_ids = [dep.get("version_id") for dep in dependencies if dep.get("version_id")]
+    try:
+        versions_by_id = get_client().versions(version_ids)
+        projects_by_id = get_client().projects(
+            [v.get("project_id") for v in versions_by_id.values() if v.get("project_id")]
+        )
+    except requests.RequestException as e:
+        log(f"Error fetching modpack dependency data: {e}")
+        return []
+
+    mods_info = []
+    for version_id in version_ids:
+        version_info = versions_by_id.get(version_id)
+        if not version_info:
+            log(f"Error fetching data for version_id {version_id}: not found")
+            continue
+        project_info = projects_by_id.get(version_info.get("project_id"), {})
+        mods_info.append({
+            "id": version_info.get("id"),
+            "project_id": version_info.get("project_id"),
+            "title": project_info.get("title"),
+            "description": project_info.get("description"),
+            "author": version_info.get("author", "Unknown"),
+            "downloads": project_info.get("downloads"),
+            "version": version_info.get("version_number"),
+            "enabled": True,
+            "icon_url": project_info.get("icon_url"),
+            "filenames": [f.get("filename") for f in version_info.get("files", [])],
+        })
+    return mods_info
+
+
+def resolve_instance_data(selection, log=print):
+    """Complete the add-instance dialog's modpack selection: icon, pack archive, loader versions and mod list"""
+    data = dict(selection)
+    if not data.get("image") and data.get("icon_url"):
+        data["image"] = fetch_icon(data["icon_url"], data["name"])
+
+    if not data.get("pack_url"):
+        raise MrpackError(f"Modpack {data['name']} has no file to download")
+    log(f"Downloading modpack {data['name']}...")
+    pack_path = download_pack(data["pack_url"], data.get("pack_sha1"), data.get("pack_size"))
+    index = read_index(pack_path)
+
+    dependencies = index.get("dependencies", {})
+    if "fabric-loader" in dependencies:
+        data["section"] = "Fabric"
+        data["selected_fabric_version"] = f"Fabric {dependencies['fabric-loader']}"
+    else:
+        data["section"] = "Forge"
+        data["selected_fabric_version"] = ""
+        log("Error: Modpack is not Fabric")
+    data["selected_version"] = dependencies.get("minecraft", "")
+
+    data["mods"] = index.get("files", [])
+    data["mrpack_path"] = pack_path
+    data["mod_data"] = dependency_metadata(data.get("dependencies", []), log)
+    return data
@@ -0,0 +1,258 @@
+"""Native library preparation for launches.
+
+Natives are extracted once per Minecraft version and platform into
+``.cache/natives/<key>``, where the key hashes the vanilla version JSON
+together with the OS and architecture. A ``.complete`` marker is written last,
+so later launches that find it skip all of this.
+
+The native jars are taken from the ``natives``/``classifiers`` entries of the
+version JSON that apply to this platform. They are downloaded in parallel and
+extracted with their ``exclude`` rules. An ``.extracted.json`` file records
+each extracted jar's sha1, so an interrupted extraction resumes where it
+stopped. MinecraftNativesDownloader is only used when the JSON has no arm64
+natives for an Apple Silicon Mac (legacy LWJGL versions).
+"""
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import zipfile
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+LIBRARIES_DIR = os.path.join(GAME_DIR, "libraries")
+NATIVES_CACHE_DIR = os.path.join(GAME_DIR, ".cache", "natives")
+TOOLS_DIR = os.path.join(GAME_DIR, ".cache", "tools")
+
+NATIVES_DOWNLOADER_URL = "https://github.com/MidCoard/MinecraftNativesDownloader/releases/download/1.1/MinecraftNativesDownloader-1.1.jar"
+COMPLETE_MARKER = ".complete"
+EXTRACTED_MANIFEST = ".extracted.json"
+
+
+class NativesError(Exception):
+    """Raised when natives could not be prepared"""
+
+
+def os_name():
+    """Operating system name as used by version JSON rules"""
+    return {"Darwin": "osx", "Linux": "linux", "Windows": "windows"}.get(platform.system(), platform.system().lower())
+
+
+def os_arch():
+    """Architecture as used by version JSON rules (x86, x86_64, arm64)"""
+    machine = platform.machine().lower()
+    if machine in ("amd64", "x86_64"):
+        return "x86_64"
+    if machine in ("i386", "i686", "x86"):
+        return "x86"
+    if machine in ("aarch64", "arm64"):
+        return "arm64"
+    return machine
+
+
+def rules_allow(rules):
+    """Evaluate a version JSON rules list for this platform (feature rules never match)"""
+    if not rules:
+        return True
+
+    allowed = False
+    for rule in rules:
+        os_rule = rule.get("os", {})
+        if "name" in os_rule and os_rule["name"] != os_name():
+            continue
+        if "arch" in os_rule and os_rule["arch"] != os_arch():
+            continue
+        if rule.get("features"):
+            continue
+        allowed = rule.get("action") == "allow"
+    return allowed
+
+
+def native_artifacts(version_data):
+    """Classifier downloads of the native jars that apply to this platform"""
+    bits = "32" if os_arch() == "x86" else "64"
+    artifacts = []
+    for lib in version_data.get("libraries", []):
+        natives = lib.get("natives")
+        if not natives or os_name() not in natives or not rules_allow(lib.get("rules")):
+            continue
+        classifier = natives[os_name()].replace("${arch}", bits)
+        download = lib.get("downloads", {}).get("classifiers", {}).get(classifier)
+        if not download or not download.get("path"):
+            continue
+        artifacts.append({
+            "classifier": classifier,
+            "path": download["path"],
+            "url": download.get("url"),
+            "sha1": download.get("sha1"),
+            "size": download.get("size"),
+            "exclude": lib.get("extract", {}).get("exclude", []),
+        })
+    return artifacts
+
+
+def needs_natives_downloader(artifacts):
+    """Legacy versions only ship x86 mac natives, which do not load on Apple Silicon"""
+    return (
+        os_name() == "osx"
+        and os_arch() == "arm64"
+        and bool(artifacts)
+        and not any("arm64" in a["classifier"] for a in artifacts)
+    )
+
+
+def natives_key(version_json_path):
+    """Content key for the natives of a version JSON on this OS and architecture"""
+    hasher = hashlib.sha1(f"{platform.system()}:{platform.machine()}:{NATIVES_DOWNLOADER_URL}".encode())
+    try:
+        with open(version_json_path, "rb") as f:
+            hasher.update(f.read())
+    except OSError:
+        hasher.update(os.path.basename(version_json_path).encode())
+    return hasher.hexdigest()
+
+
+def natives_dir_for(version_json_path):
+    return os.path.join(NATIVES_CACHE_DIR, natives_key(version_json_path))
+
+
+def is_complete(natives_dir):
+    return os.path.exists(os.path.join(natives_dir, COMPLETE_MARKER))
+
+
+def mark_complete(natives_dir):
+    with open(os.path.join(natives_dir, COMPLETE_MARKER), "w") as f:
+        f.write(f"{platform.system()} {platform.machine()}\n")
+
+
+def extract_jar(jar_path, natives_dir, exclude):
+    """Extract a native jar into natives_dir, skipping excluded prefixes. Returns the extracted names."""
+    extracted = []
+    root = os.path.realpath(natives_dir)
+    with zipfile.ZipFile(jar_path) as jar:
+        for member in jar.infolist():
+            name = member.filename
+            if member.is_dir() or any(name.startswith(prefix) for prefix in exclude):
+                continue
+            target = os.path.realpath(os.path.join(natives_dir, name))
+            if not target.startswith(root + os.sep):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with jar.open(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            extracted.append(name)
+    return extracted
+
+
+def extract_natives(artifacts, natives_dir, log):
+    """Download the native jars in parallel and extract the ones not already extracted"""
+    from downloader import PRIORITY_LAUNCH, DownloadTask, get_engine
+
+    os.makedirs(natives_dir, exist_ok=True)
+    manifest_path = os.path.join(natives_dir, EXTRACTED_MANIFEST)
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    pending = [a for a in artifacts if not a["sha1"] or manifest.get(a["path"]) != a["sha1"]]
+    if not pending:
+        return
+
+    tasks = [
+        DownloadTask(a["url"], os.path.join(LIBRARIES_DIR, a["path"]), sha1=a["sha1"], size=a["size"])
+        for a in pending
+    ]
+    log.info(f"Downloading {len(tasks)} native libraries...")
+    _, failed = get_engine().download_all(tasks, priority=PRIORITY_LAUNCH)
+    if failed:
+        raise NativesError(f"Failed to download natives: {', '.join(os.path.basename(t.dest) for t, _ in failed)}")
+
+    for artifact, task in zip(pending, tasks):
+        names = extract_jar(task.dest, natives_dir, artifact["exclude"])
+        log.debug(f"Extracted {len(names)} files from {os.path.basename(task.dest)}")
+        manifest[artifact["path"]] = artifact["sha1"]
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+
+def downloader_jar(log):
+    """Path of the MinecraftNativesDownloader jar, fetched only the first time it is needed"""
+    jar_path = os.path.join(TOOLS_DIR, os.path.basename(NATIVES_DOWNLOADER_URL))
+    if os.path.isfile(jar_path):
+        return jar_path
+
+    import downloader
+
+    log.info("Downloading MinecraftNativesDownloader...")
+    if not downloader.download_file(NATIVES_DOWNLOADER_URL, jar_path):
+        raise NativesError("Failed to download MinecraftNativesDownloader")
+    return jar_path
+
+
+def run_natives_downloader(java_cmd, version_dir, log):
+    """Run MinecraftNativesDownloader in version_dir and return the directory it produced"""
+    jar_path = downloader_jar(log)
+
+    log.info("Running MinecraftNativesDownloader...")
+    result = subprocess.run([java_cmd, "-jar", jar_path], cwd=version_dir, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+    for line in result.stdout.splitlines():
+        log(line)
+    if result.returncode != 0:
+        raise NativesError("MinecraftNativesDownloader failed to run")
+
+    candidates = [
+        os.path.join(version_dir, "build", "natives", "arm64"),
+        os.path.join(version_dir, "build", "natives", "macos-arm64"),
+        os.path.join(version_dir, "build", "natives", "osx-arm64"),
+        os.path.join(version_dir, "build", "natives"),
+        os.path.join(version_dir, "natives"),
+    ]
+    for source in candidates:
+        if os.path.isdir(source) and os.listdir(source):
+            log.info(f"Found natives at: {source}")
+            return source
+    return None
+
+
+def natives_from_downloader(java_cmd, version_dir, natives_dir, log):
+    source = run_natives_downloader(java_cmd, version_dir, log)
+    if not source:
+        # Nothing is cached so the next launch tries again
+        log.warn("No native libraries found. Proceeding without natives (may cause issues)")
+        os.makedirs(natives_dir, exist_ok=True)
+        return False
+
+    staging = f"{natives_dir}.{os.getpid()}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(source, staging)
+    shutil.rmtree(natives_dir, ignore_errors=True)
+    os.makedirs(os.path.dirname(natives_dir), exist_ok=True)
+    os.replace(staging, natives_dir)
+    return True
+
+
+def ensure_natives(java_cmd, version_dir, version_json_path, natives_dir, log):
+    """Populate natives_dir once; later calls only check its completion marker"""
+    if is_complete(natives_dir):
+        log.info(f"Using cached natives: {natives_dir}")
+        return natives_dir
+
+    try:
+        with open(version_json_path, "r") as f:
+            artifacts = native_artifacts(json.load(f))
+    except (OSError, ValueError) as e:
+        raise NativesError(f"Could not read natives from {version_json_path}: {e}")
+
+    if needs_natives_downloader(artifacts):
+        if not natives_from_downloader(java_cmd, version_dir, natives_dir, log):
+            return natives_dir
+    else:
+        extract_natives(artifacts, natives_dir, log)
+
+    mark_complete(natives_dir)
+    log.info(f"Natives cached at: {natives_dir}")
+    return natives_dir
@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
                              QPushButton, QLabel, QFrame, QToolButton, QMenu, QAction, QScrollArea,
                              QLayout, QSizePolicy, QSplitter)
 from PyQt5.QtGui import QIcon, QPixmap, QColor, QPainter, QPainterPath, QPen
-from PyQt5.QtCore import Qt, QSize, QRect, QPoint, QItemSelection, QRectF
+from PyQt5.QtCore import Qt, QSize, QRect, QPoint, QItemSelection, QRectF, QTimer, pyqtSignal
 import os
 import json
 import subprocess
@@ -12,8 +12,18 @@ from AddInstanceWindow import AddInstanceWindow
 from ManageMods import ManageModsWindow
 from account_window import AccountWindow
 from edit_instance import EditInstanceWindow
-from PyQt5.QtCore import pyqtSignal, QObject
 from settings_window import SetWindow
+import downloader
+import launch_engine
+import mrpack
+import install_jobs
+import version_store
+import fabric_installer
+import log_view
+import log_capture
+import process_supervisor
+import resource_monitor
+import jvm_profiles
 import zipfile
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtWidgets import QProgressDialog, QPlainTextEdit
@@ -23,14 +33,8 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QPalette
 import threading
 import sip
-import requests
 import time
 import re
-import re
-from PyQt5.QtWidgets import QTextEdit, QPlainTextEdit
-from PyQt5.QtGui import QTextCharFormat, QColor, QTextCursor
-from PyQt5.QtCore import Qt
-from PyQt5.QtCore import QMetaObject, Qt, Q_ARG
 
 # Custom FlowLayout for wrapping widgets to new rows
 class FlowLayout(QLayout):
@@ -128,10 +132,9 @@ GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
 if not os.path.exists(GAME_DIR):
     os.mkdir(GAME_DIR)
 
-class LogSignalEmitter(QObject):
-    log_signal = pyqtSignal(str)
-
 class MinecraftLauncherUI(QMainWindow):
+    gameExited = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.themes = {
@@ -220,24 +223,6 @@ class MinecraftLauncherUI(QMainWindow):
                 "selected_border": "#FFC107"       # golden yellow
             },
         }
-        self.ansi_colors = {
-            '30': '#000000',  # Black
-            '31': '#FF0000',  # Red
-            '32': '#00FF00',  # Green
-            '33': '#FFFF00',  # Yellow
-            '34': '#0000FF',  # Blue
-            '35': '#FF00FF',  # Magenta
-            '36': '#00FFFF',  # Cyan
-            '37': '#FFFFFF',  # White
-            '90': '#808080',  # Bright Black (Gray)
-            '91': '#FF6B6B',  # Bright Red
-            '92': '#4ECDC4',  # Bright Green
-            '93': '#FFE66D',  # Bright Yellow
-            '94': '#6B73FF',  # Bright Blue
-            '95': '#FF6BFF',  # Bright Magenta
-            '96': '#6BFFFF',  # Bright Cyan
-            '97': '#FFFFFF',  # Bright White
-        }
         self.setWindowTitle("RBL: Dawn")
         self.current_theme = "dark"
         self.instances = {}
@@ -255,13 +240,22 @@ class MinecraftLauncherUI(QMainWindow):
         self.settings_window = None
         self.account_window = None
         self.account_data = None
-        self.log_emitter = LogSignalEmitter()
-        self.log_emitter.log_signal.connect(self.append_log_to_viewer)
+        self.log_scrollback = log_view.DEFAULT_SCROLLBACK
+        self.log_buffer = log_view.LogBuffer(self.log_scrollback)
         self.log_viewer = None
         self.show_log = False
         self.side = 1
         self.java_path = ''
-        self.active_instances = {}
+        self.download_limit = 0
+        # Instances whose launch is being prepared, before the supervisor owns their process
+        self.launching_instances = set()
+        # Set when unused versions could not be removed because a game was running
+        self.version_gc_pending = False
+        # Exits are reported on the supervisor's reaper thread; queue them onto the UI thread
+        self.gameExited.connect(self.on_game_exited, Qt.QueuedConnection)
+        process_supervisor.get_supervisor().add_exit_listener(self.gameExited.emit)
+        # Mod installs are submitted by the mods dialog; their results are saved here
+        install_jobs.get_manager().jobAdded.connect(self.on_install_job_added)
 
         # UI Components - stored as instance variables for easy access
         self.central_widget = None
@@ -287,6 +281,7 @@ class MinecraftLauncherUI(QMainWindow):
         self.setup_ui()
         self.apply_theme(self.current_theme)
         self.refresh_instances()
+        self.resume_install_jobs()
         
     def load_config(self):
         default_config = {
@@ -303,6 +298,8 @@ class MinecraftLauncherUI(QMainWindow):
                     self.instances_data = config.get('instances')
                     print("INSTANCE DATA ", self.instances_data)
                     self.java_path = config.get('java_path')
+                    self.apply_download_limit(config.get('download_limit', 0))
+                    self.apply_log_scrollback(config.get('log_scrollback', log_view.DEFAULT_SCROLLBACK))
                     return config
             except Exception as e:
                 print("Error loading config:", e)
@@ -325,6 +322,8 @@ class MinecraftLauncherUI(QMainWindow):
         config = {
             "theme": self.current_theme,
             "java_path": self.java_path,
+            "download_limit": self.download_limit,
+            "log_scrollback": self.log_scrollback,
             "instances": self.instances_data,  # Save the full dict, not just keys
             "username": self.username,
             "UUID": self.uuid,
@@ -337,6 +336,9 @@ class MinecraftLauncherUI(QMainWindow):
             print("Error saving config:", e)
 
         print("JAVA PATH ", self.java_path)
+
+        # Keep the version store's references in step with the instances
+        version_store.get_store().sync_refs(self.instances_data, keep=install_jobs.get_manager().active_names())
         
 
     def build_stylesheet(self, colors):
@@ -567,8 +569,17 @@ class MinecraftLauncherUI(QMainWindow):
         self.instance_name.setAlignment(Qt.AlignCenter)
         self.instance_name.setStyleSheet("border-radius: 8px")
 
+        # Live CPU / memory / GC figures of the selected instance while it runs
+        self.resource_label = QLabel("")
+        self.resource_label.setAlignment(Qt.AlignCenter)
+        self.resource_label.hide()
+        self.resource_timer = QTimer(self)
+        self.resource_timer.timeout.connect(self.update_resource_label)
+        self.resource_timer.start(int(resource_monitor.SAMPLE_INTERVAL * 1000))
+
         self.right_layout.addWidget(self.instance_icon, alignment=Qt.AlignCenter)
         self.right_layout.addWidget(self.instance_name)
+        self.right_layout.addWidget(self.resource_label)
 
         # Action buttons
         self.setup_action_buttons()
@@ -582,6 +593,7 @@ class MinecraftLauncherUI(QMainWindow):
             ("Launch", self.launch_instance, ".icons/launch.svg"),
             ("Kill", self.kill_instance, ".icons/status-bad.svg"),
             ("Show/Hide Logs", self.toggle_log_viewer, ".icons/log.svg"),
+            ("Past Logs", self.open_log_browser, ".icons/log.svg"),
             ("Manage Mods", self.install_mods, ".icons/loadermods.svg"),
             ("Edit", self.edit_instance, ".icons/instance-settings.svg"),
             ("Folder", self.open_instance_folder, ".icons/folder.svg"),
@@ -666,43 +678,15 @@ class MinecraftLauncherUI(QMainWindow):
             if child.widget():
                 child.widget().deleteLater()
 
-    def ansi_to_html(self, text):
-        """Clean ANSI to HTML converter that handles your script's format"""
-        # Escape HTML characters first
-        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        # Your script's specific color mappings
-        color_map = {
-            '0;31': '#f38ba8',  # RED for [ERROR]
-            '0;32': '#a6e3a1',  # GREEN for [INFO] 
-            '1;33': '#f9e2af',  # YELLOW for [WARN]
-            '0;34': '#89b4fa',  # BLUE for [DEBUG]
-        }
-        
-        # Simple but effective pattern matching
-        def replace_ansi(match):
-            full_code = match.group(1)
-            if full_code in color_map:
-                return f'<span style="color: {color_map[full_code]}; font-weight: bold;">'
-            elif full_code == '0':  # Reset code
-                return '</span>'
-            return ''  # Ignore unknown codes
-        
-        # Replace ANSI codes with HTML
-        html_text = re.sub(r'\x1b\[([0-9;]*)m', replace_ansi, text)
-        
-        return html_text
-    
     def setup_log_viewer(self):
-        """Setup log viewer that can handle HTML formatting"""
+        """Setup the log viewer over the shared log buffer"""
         if self.log_viewer is None:
-            # Use QTextEdit instead of QPlainTextEdit for HTML support
-            self.log_viewer = QTextEdit()
-            self.log_viewer.setReadOnly(True)
+            self.log_viewer = log_view.LogView(self.log_buffer)
             self.log_viewer.setPlaceholderText("Launch an instance to see logs here...")
+            self.log_viewer.set_text_color(self.themes[self.current_theme]['text'])
             
             style = f"""
-                QTextEdit {{
+                QAbstractScrollArea {{
                     background: {self.themes[self.current_theme]['frame_bg']};
                     color: {self.themes[self.current_theme]['text']};
                     border: none;
@@ -791,6 +775,27 @@ class MinecraftLauncherUI(QMainWindow):
             self.log_viewer.setParent(None)
         self.refresh_instances()
 
+    def update_resource_label(self):
+        """Show the selected instance's latest resource sample next to it"""
+        name = self.selected_instance_name
+        summary = None
+        if name and process_supervisor.get_supervisor().is_running(name):
+            summary = resource_monitor.get_monitor().summary(name)
+        text = resource_monitor.format_summary(summary) if summary else ""
+        self.resource_label.setText(text)
+        self.resource_label.setVisible(bool(text))
+
+    def open_log_browser(self):
+        """Open the saved launch logs of the selected instance"""
+        if not self.selected_instance_name:
+            print("No instance selected")
+            return
+        browser = log_view.LogBrowser(self.selected_instance_name, self,
+                                      stylesheet=self.build_stylesheet(self.themes[self.current_theme]),
+                                      text_color=self.themes[self.current_theme]['text'])
+        browser.setAttribute(Qt.WA_DeleteOnClose)
+        browser.show()
+
     def force_instance_view(self):
         if self.show_log:
             self.show_log = False  # Make sure state reflects the switch
@@ -847,7 +852,8 @@ class MinecraftLauncherUI(QMainWindow):
         base_name = instance_data['name']
         name = base_name
         counter = 1
-        while name in self.instances:
+        installing = install_jobs.get_manager().active_names()
+        while name in self.instances or name in installing:
             name = f"{base_name} ({counter})"
             counter += 1
 
@@ -855,132 +861,148 @@ class MinecraftLauncherUI(QMainWindow):
         instance_data['name'] = name
 
         if instance_data['type'] == "Modrinth":
-            mod_data = instance_data.get('mods', '')
-
-            clean_data = {
-                'name': instance_data.get('name', ''),
-                'modloader': instance_data.get('section', ''),
-                'version': instance_data.get('selected_version', ''),
-                'fabric_version': instance_data.get('selected_fabric_version', ''),
-                'image': instance_data.get('image', ''),
-                'mod_data': instance_data.get('mod_data', ''),
-                'version_number': instance_data.get('version_number', ''),
-                'files': instance_data.get('filenames', '')
-            }
-            
-            self.instances_data[name] = clean_data
+            # The instance is added once the pack has been resolved and installed
+            self.start_install_job("modpack", name, instance_data)
+            return
 
-            INSTANCE_DIR = f"{GAME_DIR}/instances/{name}"
-            MOD_DIR = f"{INSTANCE_DIR}/mods"
-            RESOURCE_DIR = f"{INSTANCE_DIR}/resourcepacks"
+        # Build a clean dict with only JSON-serializable data (update keys as needed)
+        clean_data = {
+            'name': instance_data.get('name', ''),
+            'modloader': instance_data.get('section', ''),
+            'version': instance_data.get('selected_version', ''),
+            'fabric_version': instance_data.get('selected_fabric_version', ''),
+            'image': instance_data.get('image', ''),
+            'modpack_data': instance_data.get('mod_data', ''),
+            'version_number': instance_data.get('version_number', '')
+        }
 
-            self.save_config()
-            self.load_config()
-            self.refresh_instances()  # Only refresh instances instead of full UI
-            
-            if not os.path.exists(INSTANCE_DIR):
-                os.mkdir(INSTANCE_DIR)
-            if not os.path.exists(MOD_DIR):
-                os.mkdir(MOD_DIR)
-            if not os.path.exists(RESOURCE_DIR):
-                os.mkdir(RESOURCE_DIR)
-            modloader = instance_data['section']
-            version = instance_data['selected_version']
-
-            def download_file(url, output_path):
-                try:
-                    response = requests.get(url, stream=True, timeout=15)
-                    response.raise_for_status()  # Raise error for bad responses
-
-                    with open(output_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:  # filter out keep-alive chunks
-                                f.write(chunk)
-
-                    print(f"Download complete: {output_path}")
-                    return True
-
-                except Exception as e:
-                    print(f"Download failed: {e}")
-                    return False
-                
-            for file_entry in mod_data:
-                path = file_entry["path"]
-                sha1 = file_entry["hashes"]["sha1"]
-                download = file_entry["downloads"][0]
-                file_size = file_entry["fileSize"]
-                download_file(download, f'{INSTANCE_DIR}/{path}')
-
-            if modloader == "Fabric":
-                print("Installing fabric... THIS")
-                fabric_version = instance_data['selected_fabric_version']
-                print("Fabric version: ", fabric_version)
-                fabric_version = fabric_version.replace("Fabric", "").strip()
-                install_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "install_fabric.sh")
-                args = [install_script, version, fabric_version, self.java_path]
-                process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                for line in process.stdout:
-                    print(line, end='')
-                process.wait()
-            
+        # Save the cleaned data
+        self.instances_data[name] = clean_data
+
+        INSTANCE_DIR = f"{GAME_DIR}/instances/{name}"
+        self.save_config()
+        self.load_config()
+        self.refresh_instances()  # Only refresh instances instead of full UI
+
+        if not os.path.exists(INSTANCE_DIR):
+            os.mkdir(INSTANCE_DIR)
+        self.start_install_job("instance", name, {
+            'modloader': clean_data['modloader'],
+            'version': clean_data['version'],
+            'fabric_version': clean_data['fabric_version'],
+        })
+
+    def start_install_job(self, kind, name, params, job_id=None):
+        """Run an install in the background, reporting progress in the status bar"""
+        if kind == "modpack":
+            work = lambda job: self.install_modpack(job, params)
         else:
-            # Build a clean dict with only JSON-serializable data (update keys as needed)
-            clean_data = {
-                'name': instance_data.get('name', ''),
-                'modloader': instance_data.get('section', ''),
-                'version': instance_data.get('selected_version', ''),
-                'fabric_version': instance_data.get('selected_fabric_version', ''),
-                'image': instance_data.get('image', ''),
-                'modpack_data': instance_data.get('mod_data', ''),
-                'version_number': instance_data.get('version_number', '')
-            }
+            work = lambda job: self.install_game(job, params['modloader'], params['version'], params.get('fabric_version', ''))
+
+        job = install_jobs.InstallJob(kind, name, work, params, job_id, key=f"{kind}:{name}")
+        job.logMessage.connect(self.on_install_log)
+        job.progressChanged.connect(self.on_install_progress)
+        job.finished.connect(self.on_install_finished)
+        self.statusBar().showMessage(f"{name}: queued")
+        return install_jobs.get_manager().submit(job)
+
+    def resume_install_jobs(self):
+        """Restart installs that failed or were still running when the launcher last closed"""
+        manager = install_jobs.get_manager()
+        for record in manager.interrupted():
+            if record['kind'] not in ("modpack", "instance"):
+                manager.forget(record['id'])
+                continue
+            print(f"Resuming install of {record['name']}")
+            self.start_install_job(record['kind'], record['name'], record['params'], record['id'])
+
+    def install_game(self, job, modloader, version, fabric_version=''):
+        """Install job step: download the game version and, for Fabric, the loader"""
+        store = version_store.get_store()
+        version_ids = version_store.required_versions(modloader, version, fabric_version)
+        store.add_ref(job.name, version_ids)
+        if store.satisfied(modloader, version, fabric_version):
+            job.log(f"{', '.join(version_ids)} already installed, skipping")
+            return None
+
+        if modloader == "Fabric":
+            job.set_status("Installing Fabric")
+            fabric_installer.install_fabric(version, version_store.clean_fabric_version(fabric_version), log=job.log,
+                                            cancel=job.is_cancelled, priority=job.priority)
+        elif modloader == "Vanilla":
+            job.set_status("Downloading Minecraft")
+            fabric_installer.install_vanilla(version, log=job.log, cancel=job.is_cancelled, priority=job.priority)
+        else:
+            return None
+        store.record_install(modloader, version, fabric_version)
+        return None
+
+    def install_modpack(self, job, selection):
+        """Install job for a Modrinth pack. Returns the instance data to save."""
+        name = selection['name']
+        job.set_status("Resolving modpack")
+        instance_data = mrpack.resolve_instance_data(selection, log=job.log)
+        job.check_cancelled()
+
+        INSTANCE_DIR = f"{GAME_DIR}/instances/{name}"
+        os.makedirs(f"{INSTANCE_DIR}/mods", exist_ok=True)
+        os.makedirs(f"{INSTANCE_DIR}/resourcepacks", exist_ok=True)
+
+        job.set_status("Downloading modpack files")
+        failed = mrpack.install_pack(instance_data['mrpack_path'], INSTANCE_DIR, progress=job.progress,
+                                     cancel=job.is_cancelled, log=job.log, priority=job.priority)
+        job.check_cancelled()
+        if failed:
+            # The journal keeps the finished files, so resuming the failed job only fetches these
+            raise mrpack.MrpackError(f"{len(failed)} modpack files failed to download")
+
+        if instance_data['section'] == "Fabric":
+            self.install_game(job, "Fabric", instance_data['selected_version'], instance_data['selected_fabric_version'])
+
+        return {
+            'name': name,
+            'modloader': instance_data.get('section', ''),
+            'version': instance_data.get('selected_version', ''),
+            'fabric_version': instance_data.get('selected_fabric_version', ''),
+            'image': instance_data.get('image', ''),
+            'mod_data': instance_data.get('mod_data', ''),
+            'version_number': instance_data.get('version_number', ''),
+            'files': instance_data.get('filenames', '')
+        }
+
+    def on_install_job_added(self, job):
+        if job.kind == "mods":
+            job.finished.connect(self.on_install_finished)
 
-            # Save the cleaned data
-            self.instances_data[name] = clean_data
+    def on_install_log(self, message):
+        print(f"[{self.sender().name}] {message}")
 
-            INSTANCE_DIR = f"{GAME_DIR}/instances/{name}"
+    def on_install_progress(self, status, done, total):
+        job = self.sender()
+        if total:
+            self.statusBar().showMessage(f"{job.name}: {status} {done * 100 // total}%")
+        else:
+            self.statusBar().showMessage(f"{job.name}: {status}")
+
+    def on_install_finished(self, success, message):
+        job = self.sender()
+        print(message)
+        self.statusBar().showMessage(message, 5000)
+        if success and job.kind == "modpack" and job.result:
+            self.instances_data[job.name] = job.result
             self.save_config()
             self.load_config()
             self.refresh_instances()  # Only refresh instances instead of full UI
-            
-            if not os.path.exists(INSTANCE_DIR):
-                os.mkdir(INSTANCE_DIR)
-            modloader = instance_data['section']
-            version = instance_data['selected_version']
-            if modloader == "Fabric":
-                print("Installing fabric... THIS")
-                fabric_version = instance_data['selected_fabric_version']
-                fabric_version = fabric_version.replace("Fabric", "").strip()
-                install_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "install_fabric.sh")
-                args = [install_script, version, fabric_version, self.java_path]
-                print("Args: ", args)
-                process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                for line in process.stdout:
-                    print(line, end='')
-                process.wait()
-            if modloader == "Vanilla":
-                install_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_vanilla.sh")
-                args = [install_script, version, self.java_path]
-                process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                for line in process.stdout:
-                    print(line, end='')
-                process.wait()
-        
+        elif success and job.kind == "mods" and job.result:
+            instance_data = self.instances_data.get(job.name)
+            if instance_data is None:
+                print(f"Instance '{job.name}' no longer exists, not recording its mods")
+                return
+            mod_data = instance_data.setdefault('mod_data', [])
+            installed = {mod.get('project_id') for mod in mod_data}
+            mod_data.extend(mod for mod in job.result if mod.get('project_id') not in installed)
+            self.save_config()
+
     def edit_instance(self):
         instance_name = self.selected_instance_name
 
@@ -1030,33 +1052,21 @@ class MinecraftLauncherUI(QMainWindow):
             'modloader': new_modloader,
             'version': new_version,
             'fabric_version': updated_data.get('fabric_version', ''),
-            'image': updated_data.get('image', {}).get('saved_path', '')
+            'image': updated_data.get('image', {}).get('saved_path', ''),
+            'jvm_profile': updated_data.get('jvm_profile', jvm_profiles.DEFAULT_PROFILE),
         })
 
         self.save_config()
         self.load_config()
         self.refresh_instances()  # Only refresh instances instead of full UI
+        self.collect_unused_versions()
 
-        # Always reinstall
-        if new_modloader == "Fabric":
-            print("Installing fabric...")
-            fabric_version = updated_data.get('fabric_version', '').replace("Fabric", "").strip()
-            install_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "install_fabric.sh")
-            args = [install_script, new_version, fabric_version, self.java_path]
-        else:  # Vanilla
-            print("Downloading vanilla...")
-            install_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_vanilla.sh")
-            args = [install_script, new_version, self.java_path]
-
-        process = subprocess.Popen(
-            args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True
-        )
-        for line in process.stdout:
-            print(line, end='')
-        process.wait()
+        # Reinstall, which is a no-op when the version store already has this version
+        self.start_install_job("instance", new_name, {
+            'modloader': "Fabric" if new_modloader == "Fabric" else "Vanilla",
+            'version': new_version,
+            'fabric_version': updated_data.get('fabric_version', ''),
+        })
 
     def open_folders(self):
         print("Opening folders panel...")
@@ -1066,7 +1076,9 @@ class MinecraftLauncherUI(QMainWindow):
     def open_settings(self):
         print("Opening settings panel...")
         if self.settings_window is None or not self.settings_window.isVisible():
-            self.settings_window = SetWindow(theme_colors=self.current_theme, java_path=self.java_path)
+            self.settings_window = SetWindow(theme_colors=self.current_theme, java_path=self.java_path,
+                                             download_limit=self.download_limit,
+                                             log_scrollback=self.log_scrollback)
             
             # Connect the signal to a handler function that receives the data
             self.settings_window.settings_updated.connect(self.on_settings_updated)
@@ -1079,6 +1091,21 @@ class MinecraftLauncherUI(QMainWindow):
     def on_settings_updated(self, settings_data):
         self.java_path = settings_data.get('java_path')
         print("UPDATED JAVA TO ", settings_data.get('java_path'))
+        self.apply_download_limit(settings_data.get('download_limit', 0))
+        self.apply_log_scrollback(settings_data.get('log_scrollback', log_view.DEFAULT_SCROLLBACK))
+        self.save_config()
+
+    def apply_download_limit(self, limit_kbps):
+        """Apply the download limit to this process and to the install scripts it starts"""
+        self.download_limit = int(limit_kbps or 0)
+        os.environ[downloader.BANDWIDTH_ENV] = str(self.download_limit)
+        downloader.get_engine().set_bandwidth_limit(self.download_limit * 1024)
+
+    def apply_log_scrollback(self, lines):
+        """Resize the log buffer, keeping its newest lines"""
+        self.log_scrollback = max(int(lines or log_view.DEFAULT_SCROLLBACK), log_view.MIN_SCROLLBACK)
+        if self.log_scrollback != self.log_buffer.capacity:
+            self.log_buffer.set_capacity(self.log_scrollback)
 
     def show_help(self):
         print("Showing help information...")
@@ -1106,27 +1133,14 @@ class MinecraftLauncherUI(QMainWindow):
         self.access_token = data['access_token']
         self.save_config()
 
-    def append_log_to_viewer(self, text):
-        """Append text with ANSI colors converted to HTML"""
-        if self.log_viewer and not sip.isdeleted(self.log_viewer):
-            html_text = self.ansi_to_html(text.strip())
-            print("HTML: ", html_text)
-            # Move cursor to end and insert HTML
-            cursor = self.log_viewer.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            cursor.insertHtml(html_text + '<br>')
-            
-            # Auto-scroll to bottom
-            scrollbar = self.log_viewer.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
-
     def launch_instance(self):
         """Launch the selected instance and show logs"""
         if not self.selected_instance_name:
             print("No instance selected")
             return
         
-        if self.selected_instance_name in self.active_instances:
+        if (self.selected_instance_name in self.launching_instances
+                or process_supervisor.get_supervisor().is_running(self.selected_instance_name)):
             print("Not launching again")
             return
 
@@ -1138,114 +1152,111 @@ class MinecraftLauncherUI(QMainWindow):
 
         self.setup_log_viewer()
 
+        self.launching_instances.add(self.selected_instance_name)
         if modloader == "Fabric":
             self.launch_fabric_instance(version, instance_data)
-            self.active_instances[self.selected_instance_name] = self.selected_instance_name
         else:
             self.launch_vanilla_instance(version)
-            self.active_instances[self.selected_instance_name] = self.selected_instance_name
 
     def launch_fabric_instance(self, version, instance_data):
         """Launch a Fabric instance with process monitoring"""
         fabric_version = instance_data.get('fabric_version', '').replace("Fabric", "").strip()
         print(instance_data)
-        launch_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fabric.command")
-        args = [launch_script, self.username, self.uuid, version, fabric_version, 
-                self.access_token, self.selected_instance_name, self.java_path]
-
-        def run_subprocess():
-            try:
-                process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,  # Line buffered
-                    universal_newlines=True
-                )
-                
-                # Store the process object instead of just the name
-                self.active_instances[self.selected_instance_name] = process
-                
-                for line in process.stdout:
-                    # Emit signal for thread-safe GUI update
-                    self.log_emitter.log_signal.emit(line.strip())
-                    print(line, end='')  # Still print to console
-                    
-                process.wait()
-                self.log_emitter.log_signal.emit(f"\nProcess finished with exit code: {process.returncode}")
-                
-                # Remove from active instances when process completes
-                self.active_instances.pop(self.selected_instance_name, None)
-                
-            except Exception as e:
-                self.log_emitter.log_signal.emit(f"Error launching instance: {str(e)}")
-                # Remove from active instances on error
-                self.active_instances.pop(self.selected_instance_name, None)
-
-        # Start subprocess in separate thread
-        threading.Thread(target=run_subprocess, daemon=True).start()
+        self.run_instance(version, fabric_version)
 
     def launch_vanilla_instance(self, version):
         """Launch a Vanilla instance with process monitoring"""
-        launch_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launch_vanilla.command")
-        args = [launch_script, self.username, self.uuid, version, self.access_token, self.selected_instance_name, self.java_path]
+        self.run_instance(version)
+
+    def run_instance(self, version, fabric_version=None):
+        """Prepare and start an instance through the launch engine, streaming its output to the log viewer"""
+        instance_name = self.selected_instance_name
+
+        try:
+            session = log_capture.LogSession(instance_name)
+        except OSError as e:
+            print(f"Failed to open log session: {e}")
+            session = None
+
+        def record(line):
+            # The log view picks up buffered lines in batches on the UI thread
+            self.log_buffer.append(line)
+            if session:
+                session.append(line)
+            resource_monitor.get_monitor().feed_log_line(instance_name, line)
+
+        def emit(line):
+            record(line)
+            print(line)  # Still print to console
 
         def run_subprocess():
             try:
-                process = subprocess.Popen(
-                    args,
+                process = launch_engine.launch(
+                    instance_name, version, self.username, self.uuid, self.access_token,
+                    fabric_version=fabric_version, java_path=self.java_path, log=emit,
+                    jvm_profile=self.instances_data.get(instance_name, {}).get('jvm_profile'),
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
                     text=True,
-                    bufsize=1,
-                    universal_newlines=True
+                    bufsize=1  # Line buffered
                 )
-                
-                # Store the process object instead of just the name
-                self.active_instances[self.selected_instance_name] = process
-                
+
+                game = process_supervisor.get_supervisor().add(instance_name, process)
+                self.launching_instances.discard(instance_name)
+
                 for line in process.stdout:
-                    self.log_emitter.log_signal.emit(line.strip())
+                    record(line.rstrip())
                     print(line, end='')
-                    
+
+                # stdout is closed, so the game has exited or is about to
                 process.wait()
-                self.log_emitter.log_signal.emit(f"\nProcess finished with exit code: {process.returncode}")
-                
-                # Remove from active instances when process completes  
-                self.active_instances.pop(self.selected_instance_name, None)
-                
+                record("")
+                record(f"Process finished with exit code: {process.returncode} after {int(time.time() - game.started)}s")
+
             except Exception as e:
-                self.log_emitter.log_signal.emit(f"Error launching instance: {str(e)}")
-                # Remove from active instances on error
-                self.active_instances.pop(self.selected_instance_name, None)
+                record(f"Error launching instance: {str(e)}")
+            finally:
+                self.launching_instances.discard(instance_name)
+                if session:
+                    session.close()
 
+        # Start in a separate thread so the UI stays responsive
         threading.Thread(target=run_subprocess, daemon=True).start()
 
-    # Add a method to hide the log viewer
-    def hide_log_viewer(self):
-        """Hide the log viewer and return to normal view"""
-        if self.show_log:
-            self.show_log = False
-            self.refresh_ui
-            
-    def kill_instance(self):
-        if self.selected_instance_name:
-            print(f"Killing instance: {self.selected_instance_name}")
-            kill_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kill.command")
-            args = [kill_script, self.selected_instance_name]
-            process = subprocess.Popen(
-                args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            for line in process.stdout:
-                print(line, end='')
+    def collect_unused_versions(self):
+        """Remove versions no instance uses, deferred while a game may still run an old one"""
+        if self.launching_instances or process_supervisor.get_supervisor().running():
+            self.version_gc_pending = True
+            return
+        self.version_gc_pending = False
+        version_store.get_store().collect_garbage()
 
-            self.active_instances.pop(self.selected_instance_name, None)
-        else:
+    def on_game_exited(self, game):
+        """Runs on the UI thread once the supervisor reports a game exit"""
+        if self.version_gc_pending:
+            self.collect_unused_versions()
+
+    def kill_instance(self):
+        if not self.selected_instance_name:
             print("No instance selected")
+            return
+        supervisor = process_supervisor.get_supervisor()
+        game = supervisor.get(self.selected_instance_name)
+        # Mod installs keep running; Kill only cancels the install of the instance itself
+        job = install_jobs.get_manager().job_for(self.selected_instance_name, kinds=("instance", "modpack"))
+        if game is not None and game.running:
+            if game.kill_at is not None:
+                # Second press while the game is still shutting down
+                print(f"Killing instance: {self.selected_instance_name} (pid {game.pid})")
+                supervisor.kill(self.selected_instance_name)
+            else:
+                print(f"Stopping instance: {self.selected_instance_name} (pid {game.pid})")
+                supervisor.stop(self.selected_instance_name)
+        elif not job:
+            print(f"{self.selected_instance_name} is not running")
+        if job:
+            print(f"Cancelling install of {job.name}")
+            job.cancel()
             
     def open_instance_folder(self):
         if self.selected_instance_name:
@@ -1268,6 +1279,9 @@ class MinecraftLauncherUI(QMainWindow):
         # Collect all files first so we know the total count
         files_to_zip = []
         for root, dirs, files in os.walk(instance_path):
+            if root == instance_path and ".cache" in dirs:
+                # Class data sharing archives only work with this machine's Java and paths
+                dirs.remove(".cache")
             for file in files:
                 files_to_zip.append(os.path.join(root, file))
 
@@ -1518,6 +1532,7 @@ class MinecraftLauncherUI(QMainWindow):
         self.save_config()
         self.load_config()
         self.refresh_instances()
+        self.collect_unused_versions()
 
         print(f"Instance '{name}' deleted.")
 
@@ -1535,7 +1550,7 @@ class MinecraftLauncherUI(QMainWindow):
             stylesheet = self.build_stylesheet(self.themes[theme_name])
             self.setStyleSheet(stylesheet)
             style = f"""
-                QPlainTextEdit {{
+                QAbstractScrollArea {{
                     background: {self.themes[self.current_theme]['frame_bg']};
                     color: {self.themes[self.current_theme]['text']};
                     border: none;
@@ -1564,6 +1579,7 @@ class MinecraftLauncherUI(QMainWindow):
             """
             if self.log_viewer is not None:
                 self.log_viewer.setStyleSheet(style)
+                self.log_viewer.set_text_color(self.themes[self.current_theme]['text'])
     
     def create_instance_section(self, section_name, instance_names, parent_layout):
         """Create a section of instances with a header"""
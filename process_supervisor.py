@@ -0,0 +1,166 @@
+"""Supervisor for running game processes.
+
+The supervisor holds the Popen handle of every game it was given, keyed by
+instance name. It records each game's pid, start time and exit code. One
+reaper thread polls all of them, so no thread sits blocked in wait() for a
+game. stop() sends SIGTERM so the game can save and shut down. If the game
+is still running STOP_TIMEOUT seconds later, the reaper sends SIGKILL.
+
+Exit listeners are called on the reaper thread.
+"""
+import threading
+import time
+
+REAP_INTERVAL = 0.5
+STOP_TIMEOUT = 10.0
+
+
+class GameProcess:
+    """One supervised game process"""
+
+    def __init__(self, instance_name, process):
+        self.instance_name = instance_name
+        self.process = process
+        self.pid = process.pid
+        self.started = time.time()
+        self.ended = None
+        self.exit_code = None
+        self.kill_at = None
+
+    @property
+    def running(self):
+        return self.exit_code is None
+
+    @property
+    def uptime(self):
+        return (self.ended or time.time()) - self.started
+
+    def to_record(self):
+        return {
+            "instance": self.instance_name,
+            "pid": self.pid,
+            "started": self.started,
+            "uptime": self.uptime,
+            "exit_code": self.exit_code,
+        }
+
+
+class ProcessSupervisor:
+    """Owns the game processes and reaps them from a single thread"""
+
+    def __init__(self, interval=REAP_INTERVAL):
+        self.interval = interval
+        self.games = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add_exit_listener(self, callback):
+        """callback(game) is called on the reaper thread once a game has exited"""
+        self._listeners.append(callback)
+
+    def add(self, instance_name, process):
+        """Start supervising a game process. Returns its GameProcess."""
+        game = GameProcess(instance_name, process)
+        with self._lock:
+            previous = self.games.get(instance_name)
+            if previous is not None and previous.running:
+                raise RuntimeError(f"{instance_name} is already running (pid {previous.pid})")
+            self.games[instance_name] = game
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._reap_loop, name="game-reaper", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return game
+
+    def get(self, instance_name):
+        with self._lock:
+            return self.games.get(instance_name)
+
+    def is_running(self, instance_name):
+        game = self.get(instance_name)
+        return game is not None and game.running
+
+    def running(self):
+        with self._lock:
+            return [game for game in self.games.values() if game.running]
+
+    def stop(self, instance_name, timeout=STOP_TIMEOUT):
+        """Ask a game to exit with SIGTERM, escalating to SIGKILL after timeout. Returns False if it was not running."""
+        game = self.get(instance_name)
+        if game is None or not game.running:
+            return False
+        try:
+            game.process.terminate()
+        except OSError as e:
+            print(f"Failed to stop {instance_name}: {e}")
+        with self._lock:
+            if game.kill_at is None:
+                game.kill_at = time.monotonic() + timeout
+        self._wake.set()
+        return True
+
+    def kill(self, instance_name):
+        """SIGKILL a game right away"""
+        game = self.get(instance_name)
+        if game is None or not game.running:
+            return False
+        try:
+            game.process.kill()
+        except OSError as e:
+            print(f"Failed to kill {instance_name}: {e}")
+        self._wake.set()
+        return True
+
+    def stop_all(self, timeout=STOP_TIMEOUT):
+        for game in self.running():
+            self.stop(game.instance_name, timeout)
+
+    def _reap_once(self):
+        exited = []
+        with self._lock:
+            games = [game for game in self.games.values() if game.running]
+        for game in games:
+            code = game.process.poll()
+            if code is not None:
+                game.exit_code = code
+                game.ended = time.time()
+                exited.append(game)
+            elif game.kill_at is not None and time.monotonic() >= game.kill_at:
+                print(f"{game.instance_name} did not exit after SIGTERM, killing pid {game.pid}")
+                game.kill_at = float("inf")
+                try:
+                    game.process.kill()
+                except OSError:
+                    pass
+        for game in exited:
+            for callback in list(self._listeners):
+                try:
+                    callback(game)
+                except Exception as e:
+                    print(f"Exit listener failed for {game.instance_name}: {e}")
+        return len(games) - len(exited)
+
+    def _reap_loop(self):
+        while True:
+            remaining = self._reap_once()
+            with self._lock:
+                if not remaining and not any(game.running for game in self.games.values()):
+                    self._thread = None
+                    return
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor():
+    """Return the process-wide game supervisor"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ProcessSupervisor()
+        return _supervisor
@@ -0,0 +1,271 @@
+"""Resource usage of running games.
+
+A single sampler thread reads every supervised game every SAMPLE_INTERVAL
+seconds. Each read records CPU %, resident memory, thread count and open file
+handles. The values come from a pluggable backend:
+
+* psutil, when it is installed
+* /proc on Linux
+* ``ps`` elsewhere (CPU and memory only)
+
+Samples go into a bounded time series per instance. When the game runs with
+GC logging (``-Xlog:gc`` or the older ``-verbose:gc``), the log lines passed
+to ``feed_log_line`` are parsed. Pause times and heap sizes are then kept
+next to the samples. The time series shows how much of the heap a pack
+really uses, so ``-Xmx`` can be set from data.
+"""
+import collections
+import os
+import re
+import subprocess
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+import log_format
+from process_supervisor import get_supervisor
+
+SAMPLE_INTERVAL = 2.0
+# 10 minutes of samples at the default interval
+HISTORY_SIZE = 300
+GC_HISTORY_SIZE = 500
+
+Sample = collections.namedtuple("Sample", "time cpu rss threads handles")
+GcEvent = collections.namedtuple("GcEvent", "time kind pause_ms heap_before heap_after heap_total")
+
+# -Xlog:gc: "[1.234s][info][gc] GC(12) Pause Young (Normal) (G1 Evacuation Pause) 100M->50M(256M) 3.456ms"
+UNIFIED_GC_PATTERN = re.compile(
+    r'GC\(\d+\) (Pause [\w ()-]+?) (\d+)([KMG])->(\d+)([KMG])\((\d+)([KMG])\) ([\d.]+)ms')
+# -verbose:gc: "[GC (Allocation Failure)  102400K->51200K(262144K), 0.0034567 secs]"
+LEGACY_GC_PATTERN = re.compile(
+    r'\[(Full GC|GC)[^\]]*?(\d+)K->(\d+)K\((\d+)K\),? ([\d.]+) secs\]')
+UNIT_BYTES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_gc_line(line):
+    """A GcEvent for a GC log line, or None"""
+    line = log_format.strip(line)
+    match = UNIFIED_GC_PATTERN.search(line)
+    if match:
+        kind, before, bu, after, au, total, tu, pause = match.groups()
+        return GcEvent(time.time(), kind, float(pause), int(before) * UNIT_BYTES[bu],
+                       int(after) * UNIT_BYTES[au], int(total) * UNIT_BYTES[tu])
+    match = LEGACY_GC_PATTERN.search(line)
+    if match:
+        kind, before, after, total, pause = match.groups()
+        return GcEvent(time.time(), kind, float(pause) * 1000, int(before) * 1024,
+                       int(after) * 1024, int(total) * 1024)
+    return None
+
+
+class PsutilBackend:
+    name = "psutil"
+
+    def __init__(self):
+        self._processes = {}
+
+    def read(self, pid):
+        """(cpu_percent, rss_bytes, threads, handles); values a backend cannot read are None"""
+        process = self._processes.get(pid)
+        if process is None:
+            process = self._processes[pid] = psutil.Process(pid)
+            # The first cpu_percent() call only starts the measurement
+            process.cpu_percent(None)
+        with process.oneshot():
+            cpu = process.cpu_percent(None)
+            rss = process.memory_info().rss
+            threads = process.num_threads()
+            try:
+                handles = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+            except psutil.AccessDenied:
+                handles = None
+        return cpu, rss, threads, handles
+
+    def forget(self, pid):
+        self._processes.pop(pid, None)
+
+
+class ProcfsBackend:
+    """Linux /proc reads. CPU % is the change in utime + stime between two reads."""
+
+    name = "procfs"
+
+    def __init__(self):
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._previous = {}
+
+    def read(self, pid):
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # The command name may contain spaces, so split after its closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu_time = (int(fields[11]) + int(fields[12])) / self._ticks
+        threads = int(fields[17])
+        rss = int(fields[21]) * self._page_size
+        try:
+            handles = len(os.listdir(f"/proc/{pid}/fd"))
+        except OSError:
+            handles = None
+
+        now = time.monotonic()
+        previous = self._previous.get(pid)
+        self._previous[pid] = (now, cpu_time)
+        cpu = None
+        if previous and now > previous[0]:
+            cpu = (cpu_time - previous[1]) / (now - previous[0]) * 100
+        return cpu, rss, threads, handles
+
+    def forget(self, pid):
+        self._previous.pop(pid, None)
+
+
+class PsBackend:
+    """Fallback using ps, which reports CPU and memory only"""
+
+    name = "ps"
+
+    def read(self, pid):
+        output = subprocess.run(["ps", "-o", "%cpu=,rss=", "-p", str(pid)], capture_output=True,
+                                text=True, timeout=5).stdout.split()
+        if len(output) < 2:
+            raise OSError(f"Process {pid} not found")
+        return float(output[0]), int(output[1]) * 1024, None, None
+
+    def forget(self, pid):
+        pass
+
+
+def default_backend():
+    if psutil is not None:
+        return PsutilBackend()
+    if os.path.isdir("/proc/self"):
+        return ProcfsBackend()
+    return PsBackend()
+
+
+class InstanceStats:
+    """Bounded time series of one instance"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.samples = collections.deque(maxlen=HISTORY_SIZE)
+        self.gc_events = collections.deque(maxlen=GC_HISTORY_SIZE)
+        self.peak_rss = 0
+
+    def summary(self):
+        """Latest values and simple aggregates for display"""
+        latest = self.samples[-1] if self.samples else None
+        pauses = [event.pause_ms for event in self.gc_events]
+        return {
+            "pid": self.pid,
+            "cpu": latest.cpu if latest else None,
+            "rss": latest.rss if latest else None,
+            "peak_rss": self.peak_rss,
+            "threads": latest.threads if latest else None,
+            "handles": latest.handles if latest else None,
+            "gc_count": len(pauses),
+            "gc_max_pause_ms": max(pauses) if pauses else None,
+            "gc_avg_pause_ms": sum(pauses) / len(pauses) if pauses else None,
+            "heap_after_gc": self.gc_events[-1].heap_after if self.gc_events else None,
+            "heap_total": self.gc_events[-1].heap_total if self.gc_events else None,
+        }
+
+
+class ResourceMonitor:
+    """Samples every running game of the supervisor from one thread"""
+
+    def __init__(self, supervisor=None, backend=None, interval=SAMPLE_INTERVAL):
+        self.supervisor = supervisor or get_supervisor()
+        self.backend = backend or default_backend()
+        self.interval = interval
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.supervisor.add_exit_listener(lambda game: self.backend.forget(game.pid))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _stats_for(self, instance_name, pid):
+        with self._lock:
+            stats = self.stats.get(instance_name)
+            if stats is None or stats.pid != pid:
+                # A relaunch starts a new series
+                stats = self.stats[instance_name] = InstanceStats(pid)
+            return stats
+
+    def sample(self):
+        """Take one sample of every running game"""
+        for game in self.supervisor.running():
+            stats = self._stats_for(game.instance_name, game.pid)
+            try:
+                cpu, rss, threads, handles = self.backend.read(game.pid)
+            except Exception:
+                # The game exited between the supervisor's check and the read
+                self.backend.forget(game.pid)
+                continue
+            stats.samples.append(Sample(time.time(), cpu, rss, threads, handles))
+            stats.peak_rss = max(stats.peak_rss, rss or 0)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def feed_log_line(self, instance_name, line):
+        """Record a GC event if the line is a GC log line"""
+        if "GC" not in line:
+            return
+        event = parse_gc_line(line)
+        if event is None:
+            return
+        game = self.supervisor.get(instance_name)
+        if game is not None:
+            self._stats_for(instance_name, game.pid).gc_events.append(event)
+
+    def summary(self, instance_name):
+        """Summary of an instance's latest series, or None if it was never sampled"""
+        with self._lock:
+            stats = self.stats.get(instance_name)
+        return stats.summary() if stats else None
+
+
+def format_summary(summary):
+    """Short multi-line text for the right panel"""
+    lines = []
+    if summary.get("cpu") is not None:
+        lines.append(f"CPU {summary['cpu']:.0f}%")
+    if summary.get("rss"):
+        lines.append(f"RAM {summary['rss'] / 1024 ** 2:.0f} MB (peak {summary['peak_rss'] / 1024 ** 2:.0f} MB)")
+    if summary.get("threads") is not None:
+        handles = f", {summary['handles']} files" if summary.get("handles") is not None else ""
+        lines.append(f"{summary['threads']} threads{handles}")
+    if summary.get("gc_count"):
+        lines.append(f"GC {summary['gc_count']}x, max {summary['gc_max_pause_ms']:.0f} ms")
+        if summary.get("heap_total"):
+            lines.append(f"Heap {summary['heap_after_gc'] / 1024 ** 2:.0f}/{summary['heap_total'] / 1024 ** 2:.0f} MB")
+    return "\n".join(lines)
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor():
+    """Return the process-wide resource monitor, started"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = ResourceMonitor()
+            _monitor.start()
+        return _monitor
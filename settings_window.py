@@ -2,17 +2,18 @@ import sys
 import os
 from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                            QLineEdit, QPushButton, QFrame, QMessageBox, QFileDialog,
-                           QGridLayout, QSpacerItem, QSizePolicy)
+                           QGridLayout, QSpacerItem, QSizePolicy, QSpinBox)
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, pyqtSignal
 import shutil
+from log_view import DEFAULT_SCROLLBACK, MIN_SCROLLBACK
 
 class SetWindow(QDialog):
     """Dialog window for application settings"""
     
     settings_updated = pyqtSignal(dict)
     
-    def __init__(self, parent=None, theme_colors=None, java_path=None):
+    def __init__(self, parent=None, theme_colors=None, java_path=None, download_limit=0, log_scrollback=None):
         super().__init__(parent)
         self.setWindowTitle("Settings")
         self.setMinimumSize(600, 200)
@@ -70,6 +71,8 @@ class SetWindow(QDialog):
 
         # Store incoming values
         self.initial_java_path = java_path
+        self.initial_download_limit = download_limit
+        self.initial_log_scrollback = log_scrollback or DEFAULT_SCROLLBACK
 
         # Initialize UI components
         self.init_ui()
@@ -77,6 +80,8 @@ class SetWindow(QDialog):
         # Set defaults if provided
         if self.initial_java_path:
             self.java_path_edit.setText(self.initial_java_path)
+        self.download_limit_spin.setValue(int(self.initial_download_limit or 0))
+        self.log_scrollback_spin.setValue(int(self.initial_log_scrollback))
 
         # Apply theme
         self.current_theme = None
@@ -118,6 +123,25 @@ class SetWindow(QDialog):
         self.auto_detect_btn.clicked.connect(self.auto_detect_java)
         settings_layout.addWidget(self.auto_detect_btn, 1, 0, 1, 2)
 
+        # Download bandwidth limit, shared by every install and launch download
+        settings_layout.addWidget(QLabel("Download Limit:"), 2, 0)
+        self.download_limit_spin = QSpinBox()
+        self.download_limit_spin.setFixedHeight(fixed_height)
+        self.download_limit_spin.setRange(0, 1000000)
+        self.download_limit_spin.setSingleStep(512)
+        self.download_limit_spin.setSuffix(" KB/s")
+        self.download_limit_spin.setSpecialValueText("Unlimited")
+        settings_layout.addWidget(self.download_limit_spin, 2, 1)
+
+        # Lines the log viewer keeps before dropping the oldest
+        settings_layout.addWidget(QLabel("Log Scrollback:"), 3, 0)
+        self.log_scrollback_spin = QSpinBox()
+        self.log_scrollback_spin.setFixedHeight(fixed_height)
+        self.log_scrollback_spin.setRange(MIN_SCROLLBACK, 1000000)
+        self.log_scrollback_spin.setSingleStep(1000)
+        self.log_scrollback_spin.setSuffix(" lines")
+        settings_layout.addWidget(self.log_scrollback_spin, 3, 1)
+
         main_layout.addWidget(settings_frame)
 
         # Add some spacing
@@ -273,7 +297,9 @@ class SetWindow(QDialog):
         
         # Create settings dictionary
         settings_data = {
-            'java_path': java_path
+            'java_path': java_path,
+            'download_limit': self.download_limit_spin.value(),
+            'log_scrollback': self.log_scrollback_spin.value()
         }
         
         # Emit signal for parent window
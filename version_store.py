@@ -0,0 +1,179 @@
+"""Registry of installed game versions.
+
+``versions/installed.json`` records every vanilla and Fabric version the
+launcher has fully installed, together with the sha1 of its version JSON and
+client jar. It also records which instances use each version. An install
+whose versions are all recorded, with their files still matching, is skipped.
+So editing an instance's name or icon no longer downloads anything.
+
+References are rebuilt from the launcher config whenever it is saved.
+``collect_garbage`` deletes the recorded versions that no instance uses
+anymore. Version directories the registry does not know about are never
+touched.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+GAME_DIR = os.path.expanduser("~/Library/Application Support/ReallyBadLauncher")
+VERSIONS_DIR = os.path.join(GAME_DIR, "versions")
+STORE_PATH = os.path.join(VERSIONS_DIR, "installed.json")
+
+
+def fabric_version_id(mc_version, fabric_version):
+    return f"fabric-loader-{fabric_version}-{mc_version}"
+
+
+def clean_fabric_version(fabric_version):
+    """Loader version from the "Fabric 0.15.0" strings stored in the config"""
+    return (fabric_version or "").replace("Fabric", "").strip()
+
+
+def required_versions(modloader, mc_version, fabric_version=None):
+    """Version ids an instance needs, most specific first"""
+    if not mc_version:
+        return []
+    fabric_version = clean_fabric_version(fabric_version)
+    if modloader == "Fabric" and fabric_version:
+        return [fabric_version_id(mc_version, fabric_version), mc_version]
+    return [mc_version]
+
+
+def version_files(version_id):
+    """The version JSON and jar of a version directory that exist on disk"""
+    version_dir = os.path.join(VERSIONS_DIR, version_id)
+    files = []
+    for name in (f"{version_id}.json", f"{version_id}.jar"):
+        if os.path.isfile(os.path.join(version_dir, name)):
+            files.append(f"{version_id}/{name}")
+    return files
+
+
+class VersionStore:
+    """installed.json: {"versions": {id: {...}}, "refs": {instance: [ids]}}"""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.versions = data.get("versions", {})
+        self.refs = data.get("refs", {})
+
+    def save(self):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"versions": self.versions, "refs": self.refs}, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save version store: {e}")
+
+    def is_installed(self, version_id):
+        """True if the version was recorded and its files still match their recorded hashes"""
+        from downloader import get_engine
+
+        with self._lock:
+            entry = self.versions.get(version_id)
+        if not entry or not entry.get("files"):
+            return False
+        engine = get_engine()
+        for rel_path, sha1 in entry["files"].items():
+            path = os.path.join(VERSIONS_DIR, rel_path)
+            if not os.path.isfile(path) or engine.file_hash(path) != sha1:
+                return False
+        return True
+
+    def satisfied(self, modloader, mc_version, fabric_version=None):
+        ids = required_versions(modloader, mc_version, fabric_version)
+        return bool(ids) and all(self.is_installed(version_id) for version_id in ids)
+
+    def record(self, version_id, kind, inherits=None):
+        """Record a freshly installed version with the hashes of its files"""
+        from downloader import get_engine
+
+        engine = get_engine()
+        files = {rel_path: engine.file_hash(os.path.join(VERSIONS_DIR, rel_path))
+                 for rel_path in version_files(version_id)}
+        if not files:
+            return False
+        with self._lock:
+            self.versions[version_id] = {"type": kind, "inherits": inherits, "files": files,
+                                         "installed": time.time()}
+        self.save()
+        return True
+
+    def record_install(self, modloader, mc_version, fabric_version=None):
+        """Record the versions an install just produced"""
+        recorded = self.record(mc_version, "vanilla")
+        fabric_version = clean_fabric_version(fabric_version)
+        if modloader == "Fabric" and fabric_version:
+            recorded = self.record(fabric_version_id(mc_version, fabric_version), "fabric", mc_version) and recorded
+        return recorded
+
+    def add_ref(self, instance_name, ids):
+        with self._lock:
+            self.refs[instance_name] = list(ids)
+        self.save()
+
+    def sync_refs(self, instances_data, keep=()):
+        """Rebuild references from the launcher config, keeping the ones of instances still installing"""
+        refs = {}
+        for name, data in (instances_data or {}).items():
+            if isinstance(data, dict):
+                ids = required_versions(data.get("modloader"), data.get("version"), data.get("fabric_version"))
+                if ids:
+                    refs[name] = ids
+        with self._lock:
+            for name in keep:
+                if name not in refs and name in self.refs:
+                    refs[name] = self.refs[name]
+            changed = refs != self.refs
+            self.refs = refs
+        if changed:
+            self.save()
+
+    def unreferenced(self):
+        """Recorded versions that no instance uses, directly or through inheritsFrom"""
+        with self._lock:
+            used = set()
+            for ids in self.refs.values():
+                for version_id in ids:
+                    while version_id and version_id not in used:
+                        used.add(version_id)
+                        version_id = self.versions.get(version_id, {}).get("inherits")
+            return [version_id for version_id in self.versions if version_id not in used]
+
+    def collect_garbage(self, log=print):
+        """Delete the recorded versions nothing references. Returns the removed ids."""
+        removed = []
+        for version_id in self.unreferenced():
+            version_dir = os.path.join(VERSIONS_DIR, version_id)
+            log(f"Removing unused version {version_id}")
+            shutil.rmtree(version_dir, ignore_errors=True)
+            with self._lock:
+                self.versions.pop(version_id, None)
+            removed.append(version_id)
+        if removed:
+            self.save()
+        return removed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide version store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VersionStore()
+        return _store